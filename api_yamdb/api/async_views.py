@@ -0,0 +1,91 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import URLPattern
+
+from api.metrics import current_timings
+from api.middleware import SAFE_METHODS
+from api.profiling import profiled
+
+# Имена маршрутов router_v1, чтение которых под ASGI идёт через пул
+ASYNC_READ_URL_NAMES = (
+    'category-list',
+    'genre-list',
+    'title-list',
+    'title-detail',
+    'review-list',
+)
+
+# Пул потоков для чтения. Его размер ограничивает число одновременных
+# запросов к БД (и подключений: у каждого потока своё) в одном процессе
+READ_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_READ_WORKERS,
+    thread_name_prefix='async-read',
+)
+
+
+def render_in_thread(view, request, *args, **kwargs):
+    """Выполняет и рендерит DRF-представление в потоке пула."""
+    close_old_connections()
+    try:
+        response = profiled(request, view, request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            started = time.perf_counter()
+            response.render()
+            timings = current_timings.get()
+            if timings is not None:
+                timings.render += time.perf_counter() - started
+        return response
+    finally:
+        close_old_connections()
+
+
+def profiled_view(view, request, *args, **kwargs):
+    return profiled(request, view, request, *args, **kwargs)
+
+
+def async_read_view(view):
+    """
+    Async-обёртка над синхронным DRF-представлением.
+
+    Безопасные запросы выполняются в READ_EXECUTOR, и пока поток ждёт
+    базу, цикл событий обслуживает другие запросы. Запись идёт через
+    sync_to_async(thread_sensitive=True), как у обычных синхронных
+    представлений под ASGI.
+    """
+    write_view = sync_to_async(
+        partial(profiled_view, view), thread_sensitive=True
+    )
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return await write_view(request, *args, **kwargs)
+        # Контекст копируется, чтобы в потоке были видны contextvars
+        # запроса (например, выбор реплики в ReplicaMiddleware)
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            READ_EXECUTOR,
+            partial(context.run, render_in_thread, view, request,
+                    *args, **kwargs),
+        )
+    return wrapper
+
+
+def async_read_urls(urlpatterns):
+    """Заменяет представления из ASYNC_READ_URL_NAMES на async-обёртки."""
+    return [
+        URLPattern(
+            pattern.pattern,
+            async_read_view(pattern.callback),
+            pattern.default_args,
+            pattern.name,
+        ) if pattern.name in ASYNC_READ_URL_NAMES else pattern
+        for pattern in urlpatterns
+    ]
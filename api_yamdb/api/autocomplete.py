@@ -0,0 +1,306 @@
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from api.metrics import current_timings
+from reviews.models import Title
+
+# Общая версия индекса в кэше Django и журнал изменений: по ключу
+# CHANGE_KEY.format(версия) — id изменённого произведения. Процесс
+# с устаревшим снимком перечитывает только изменённые произведения
+VERSION_KEY = 'autocomplete:version'
+CHANGE_KEY = 'autocomplete:change:{}'
+# Раз в столько секунд индекс сверяется с базой: порядок по
+# популярности меняется с каждым отзывом
+MAX_AGE = 300
+# Больше изменений дешевле перечитать целиком
+MAX_CHANGES = 1000
+# Сколько подсказок возвращать
+AUTOCOMPLETE_COUNT = 10
+# Результаты для префиксов, под которые попадает больше ключей,
+# запоминаются. Таких префиксов не больше, чем ключей / LARGE_RANGE
+# на каждую длину, а поиск по ним дороже всего
+LARGE_RANGE = 1000
+
+NON_WORD = re.compile(r'[\W_]+')
+# Запрос, набранный не в той раскладке: «ljv» -> «дом», «ghbdtn» ->
+# «привет» и обратно
+LATIN_KEYS = 'qwertyuiop[]asdfghjkl;\'zxcvbnm,.`'
+CYRILLIC_KEYS = 'йцукенгшщзхъфывапролджэячсмитьбюё'
+KEYBOARD_LAYOUT = str.maketrans(
+    LATIN_KEYS + CYRILLIC_KEYS, CYRILLIC_KEYS + LATIN_KEYS
+)
+
+_snapshots = {}
+
+
+class FoldTable(dict):
+    """
+    Таблица str.translate, заполняемая по мере встречи символов:
+    латинская буква без диакритики (é -> e), ё -> е. Остальные
+    кириллические буквы не меняются: й не превращается в и.
+    """
+
+    def __missing__(self, code):
+        char = chr(code)
+        base = unicodedata.normalize('NFKD', char)[0]
+        if char == 'ё':
+            base = 'е'
+        elif not base.isascii():
+            base = char
+        self[code] = base
+        return base
+
+
+FOLD_TABLE = FoldTable()
+
+
+def normalize(text):
+    """Слова текста без регистра, диакритики и знаков препинания."""
+    return NON_WORD.sub(' ', text.casefold().translate(FOLD_TABLE)).split()
+
+
+def index_keys(name):
+    """Ключи названия: хвосты с начала каждого слова."""
+    words = normalize(name)
+    return {' '.join(words[start:]) for start in range(len(words))}
+
+
+def popular_titles():
+    return Title.objects.filter(is_hidden=False).order_by(
+        F('trending_score').desc(nulls_last=True), 'name'
+    )
+
+
+def count_cache_query():
+    timings = current_timings.get()
+    if timings is not None:
+        timings.cache_queries += 1
+
+
+class TitleIndex(ABC):
+    """
+    Индекс названий видимых произведений в памяти процесса.
+
+    Наследники строят структуру поиска в build() и меняют её по одному
+    произведению в add() и remove(). Снимки всех индексов обновляются
+    по общему журналу изменений, а раз в MAX_AGE сверяются с базой.
+
+    Снимок общий для потоков процесса (пул ASGI, потоковый WSGI):
+    изменения и поиск идут под self.lock, иначе поиск между шагами
+    изменения видит несогласованные массивы. Запросы к базе — вне
+    блокировки.
+    """
+
+    def __init__(self, version):
+        self.lock = threading.RLock()
+        self.version = version
+        rows = list(popular_titles().values_list('id', 'name'))
+        count_cache_query()
+        self.names = dict(rows)
+        self.build()
+        self.synced(rows)
+
+    @abstractmethod
+    def build(self):
+        """Строит структуру поиска по self.names."""
+
+    @abstractmethod
+    def add(self, pk, name):
+        """Добавляет произведение в структуру поиска."""
+
+    @abstractmethod
+    def remove(self, pk, name):
+        """Убирает произведение из структуры поиска."""
+
+    def synced(self, rows):
+        """rows — (id, название) всех видимых произведений по популярности."""
+        self.loaded = time.monotonic()
+
+    def is_fresh(self):
+        return time.monotonic() - self.loaded < MAX_AGE
+
+    def update(self, pk, name, is_hidden):
+        """Обновляет одно произведение; name=None — удалено."""
+        with self.lock:
+            self.change(pk, name, is_hidden)
+
+    def change(self, pk, name, is_hidden):
+        old = self.names.pop(pk, None)
+        if old is not None:
+            self.remove(pk, old)
+        if name is not None and not is_hidden:
+            self.names[pk] = name
+            self.add(pk, name)
+
+    def apply_changes(self, pks, version):
+        rows = {
+            pk: (name, is_hidden) for pk, name, is_hidden in
+            Title.objects.filter(pk__in=pks).values_list(
+                'id', 'name', 'is_hidden'
+            )
+        }
+        count_cache_query()
+        with self.lock:
+            for pk in pks:
+                self.change(pk, *rows.get(pk, (None, True)))
+            self.version = version
+
+    def refresh(self):
+        """
+        Сверяет названия с базой одним запросом и обновляет только
+        изменившиеся: изменения могли пройти мимо журнала (LocMemCache
+        в нескольких процессах, update() в обход сигналов).
+        """
+        rows = list(popular_titles().values_list('id', 'name'))
+        count_cache_query()
+        current = dict(rows)
+        with self.lock:
+            for pk in self.names.keys() - current.keys():
+                self.change(pk, None, True)
+            for pk, name in rows:
+                if self.names.get(pk) != name:
+                    self.change(pk, name, False)
+            self.synced(rows)
+
+
+class PrefixIndex(TitleIndex):
+    """
+    Отсортированный массив ключей названий с поиском префикса bisect.
+
+    Ключи — нормализованные хвосты названий с начала каждого слова,
+    поэтому «вой» находит «Война и мир» и «Звёздные войны». Рядом
+    хранятся id произведений (array) и ранг популярности; для частых
+    префиксов лучшие результаты запоминаются.
+    """
+
+    def build(self):
+        entries = sorted(
+            (key, pk) for pk, name in self.names.items()
+            for key in index_keys(name)
+        )
+        self.keys = [key for key, _ in entries]
+        self.ids = array('q', (pk for _, pk in entries))
+
+    def synced(self, rows):
+        """Ранги по популярности: rows — от самого популярного."""
+        super().synced(rows)
+        self.ranks = {pk: rank for rank, (pk, _) in enumerate(rows)}
+        self.next_rank = len(self.ranks)
+        self.top = {}
+
+    def range(self, prefix):
+        return (
+            bisect_left(self.keys, prefix),
+            bisect_left(self.keys, prefix + '\U0010ffff'),
+        )
+
+    def search(self, prefix, count):
+        """id произведений с ключом на prefix, по популярности."""
+        if prefix in self.top:
+            return self.top[prefix][:count]
+        start, stop = self.range(prefix)
+        found = heapq.nsmallest(
+            max(count, AUTOCOMPLETE_COUNT), set(self.ids[start:stop]),
+            key=self.ranks.__getitem__,
+        )
+        if stop - start > LARGE_RANGE:
+            self.top[prefix] = found
+        return found[:count]
+
+    def remove(self, pk, name):
+        for key in index_keys(name):
+            start = bisect_left(self.keys, key)
+            stop = bisect_right(self.keys, key, start)
+            for position in range(start, stop):
+                if self.ids[position] == pk:
+                    del self.keys[position]
+                    del self.ids[position]
+                    break
+
+    def add(self, pk, name):
+        # Новые произведения — последние по популярности до сверки
+        if pk not in self.ranks:
+            self.ranks[pk] = self.next_rank
+            self.next_rank += 1
+        for key in index_keys(name):
+            start = bisect_left(self.keys, key)
+            stop = bisect_right(self.keys, key, start)
+            position = start + bisect_left(self.ids[start:stop], pk)
+            self.keys.insert(position, key)
+            self.ids.insert(position, pk)
+
+    def change(self, pk, name, is_hidden):
+        super().change(pk, name, is_hidden)
+        self.top.clear()
+
+
+def get_index(index_class=PrefixIndex):
+    """Снимок индекса index_class этого процесса, согласованный с базой."""
+    version = cache.get(VERSION_KEY, 0)
+    index = _snapshots.get(index_class)
+    if index is None:
+        index = _snapshots[index_class] = index_class(version)
+    elif index.version != version:
+        keys = [
+            CHANGE_KEY.format(number)
+            for number in range(index.version + 1, version + 1)
+        ]
+        changes = cache.get_many(keys) if len(keys) <= MAX_CHANGES else {}
+        if 0 < len(keys) == len(changes):
+            index.apply_changes(set(changes.values()), version)
+        else:
+            index = _snapshots[index_class] = index_class(version)
+    if not index.is_fresh():
+        index.refresh()
+    return index
+
+
+def autocomplete(query, count=AUTOCOMPLETE_COUNT):
+    """
+    [(id, название), ...] произведений, слово названия которых
+    начинается с query. Если ничего не нашлось, query пробуется
+    в другой раскладке клавиатуры.
+    """
+    prefix = ' '.join(normalize(query))
+    if not prefix:
+        return []
+    switched = ' '.join(normalize(query.casefold().translate(
+        KEYBOARD_LAYOUT
+    )))
+    index = get_index()
+    with index.lock:
+        found = index.search(prefix, count)
+        if not found and switched and switched != prefix:
+            found = index.search(switched, count)
+        return [(pk, index.names[pk]) for pk in found]
+
+
+def publish_change(pk):
+    try:
+        version = cache.incr(VERSION_KEY)
+    except ValueError:
+        version = 1
+        cache.set(VERSION_KEY, version, timeout=None)
+    cache.set(CHANGE_KEY.format(version), pk, timeout=MAX_AGE * 2)
+
+
+def title_changed(title, deleted=False):
+    """
+    Обновляет индексы процесса сразу, а остальным процессам сообщает
+    об изменении после фиксации транзакции.
+    """
+    for index in list(_snapshots.values()):
+        index.update(
+            title.pk, None if deleted else title.name, title.is_hidden
+        )
+    transaction.on_commit(lambda: publish_change(title.pk))
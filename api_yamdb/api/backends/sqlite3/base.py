@@ -0,0 +1,40 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+# Режимы начала транзакции в SQLite
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite с настраиваемым режимом начала транзакции.
+
+    OPTIONS['transaction_mode'] = 'IMMEDIATE' заставляет transaction.atomic
+    брать блокировку записи сразу. В режиме DEFERRED транзакция, которая
+    сначала читает, а потом пишет, получает "database is locked" без
+    ожидания busy timeout, если другой процесс успел записать раньше.
+    """
+
+    @property
+    def transaction_mode(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        if mode is None:
+            return None
+        if mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f'Неизвестный transaction_mode SQLite: {mode}. '
+                f'Допустимые значения: {", ".join(TRANSACTION_MODES)}.'
+            )
+        return mode.upper()
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.transaction_mode  # проверяем значение до подключения
+        # sqlite3.connect не знает этот параметр
+        params.pop('transaction_mode', None)
+        return params
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode is None:
+            return super()._start_transaction_under_autocommit()
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
@@ -0,0 +1,124 @@
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+# Бэкенды кэша, которые ничего не кэшируют
+DUMMY_CACHE_BACKEND = 'django.core.cache.backends.dummy.DummyCache'
+# Бэкенды кэша в памяти процесса: версии справочников (api.dictionaries)
+# и журнал индекса названий (api.autocomplete) не видны другим воркерам
+LOCAL_CACHE_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache',)
+BROWSABLE_API_RENDERER = 'rest_framework.renderers.BrowsableAPIRenderer'
+
+# Middleware, без которых не работает админка (вместо admin.E408-E410)
+ADMIN_MIDDLEWARE = (
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+)
+
+
+def check_debug():
+    if settings.DEBUG:
+        return [Warning(
+            'DEBUG = True: каждый SQL-запрос сохраняется '
+            'в connection.queries, память процесса растёт под нагрузкой.',
+            hint='Отключите DEBUG в профиле production.',
+            id='api.W001',
+        )]
+    return []
+
+
+def check_databases():
+    warnings = []
+    for alias, database in settings.DATABASES.items():
+        if not database.get('CONN_MAX_AGE'):
+            warnings.append(Warning(
+                f'База `{alias}`: CONN_MAX_AGE = 0, подключение '
+                'открывается заново на каждый запрос.',
+                id='api.W002',
+            ))
+        if database['ENGINE'].endswith('sqlite3') and (
+            str(settings.SQLITE_PRAGMAS.get('journal_mode')).upper() != 'WAL'
+        ):
+            warnings.append(Warning(
+                f'База `{alias}`: SQLite без WAL, запись блокирует чтение.',
+                hint="Добавьте journal_mode='WAL' в SQLITE_PRAGMAS.",
+                id='api.W003',
+            ))
+    return warnings
+
+
+def check_templates():
+    warnings = []
+    for template in settings.TEMPLATES:
+        loaders = template.get('OPTIONS', {}).get('loaders')
+        cached = template.get('APP_DIRS') is False and loaders and any(
+            isinstance(loader, (list, tuple))
+            and loader[0].endswith('cached.Loader')
+            for loader in loaders
+        )
+        if not cached:
+            warnings.append(Warning(
+                'Шаблоны загружаются без cached.Loader.',
+                id='api.W004',
+            ))
+    return warnings
+
+
+def check_cache_and_renderers():
+    warnings = []
+    if settings.CACHES['default']['BACKEND'] == DUMMY_CACHE_BACKEND:
+        warnings.append(Warning(
+            'Кэш по умолчанию — DummyCache, данные не кэшируются.',
+            id='api.W005',
+        ))
+    elif settings.CACHES['default']['BACKEND'] in LOCAL_CACHE_BACKENDS:
+        warnings.append(Warning(
+            'Кэш по умолчанию хранится в памяти процесса: изменения '
+            'справочников и названий доходят до других воркеров только '
+            'при перечитывании, до 5 минут.',
+            hint='Укажите общий кэш в DJANGO_CACHE_BACKEND '
+                 '(Memcached, Redis).',
+            id='api.W007',
+        ))
+    renderers = settings.REST_FRAMEWORK.get('DEFAULT_RENDERER_CLASSES', (
+        BROWSABLE_API_RENDERER,
+    ))
+    if BROWSABLE_API_RENDERER in renderers:
+        warnings.append(Warning(
+            'Включён BrowsableAPIRenderer: HTML-формы рендерятся '
+            'на каждый запрос из браузера.',
+            id='api.W006',
+        ))
+    return warnings
+
+
+@register()
+def performance_settings_check(app_configs, **kwargs):
+    """
+    Предупреждает о настройках, вредных для производительности.
+    Выполняется только для профиля production: в development
+    DEBUG и прочее включены намеренно.
+    """
+    if settings.SETTINGS_PROFILE != 'production':
+        return []
+    return (
+        check_debug()
+        + check_databases()
+        + check_templates()
+        + check_cache_and_renderers()
+    )
+
+
+@register()
+def browser_middleware_check(app_configs, **kwargs):
+    """Проверяет, что админка получает нужные ей middleware."""
+    return [
+        Error(
+            f'{middleware} нужен админке, но его нет '
+            'ни в MIDDLEWARE, ни в BROWSER_MIDDLEWARE.',
+            id='api.E001',
+        )
+        for middleware in ADMIN_MIDDLEWARE
+        if middleware not in settings.MIDDLEWARE
+        and middleware not in getattr(settings, 'BROWSER_MIDDLEWARE', ())
+    ]
@@ -0,0 +1,103 @@
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Уровни сжатия подобраны для динамических ответов:
+# максимальные уровни в разы медленнее при выигрыше в единицы процентов
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+CACHE_KEY_PREFIX = 'compressed'
+
+
+def compress_gzip(data):
+    # mtime=0: одинаковый вход даёт одинаковые байты
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_brotli(data):
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+
+def compress_zstd(data):
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+
+# Доступные кодеки: значение Content-Encoding -> функция сжатия.
+# brotli и zstd подключаются, только если установлены их библиотеки
+CODECS = dict(gzip=compress_gzip)
+if brotli is not None:
+    CODECS['br'] = compress_brotli
+if zstandard is not None:
+    CODECS['zstd'] = compress_zstd
+
+
+def parse_accept_encoding(header):
+    """Разбирает Accept-Encoding в словарь кодек -> q."""
+    accepted = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def negotiate_encoding(header):
+    """
+    Выбирает кодек по Accept-Encoding.
+
+    Из кодеков с наибольшим q берётся первый по порядку
+    settings.COMPRESSION_CODECS; None — если сжимать нечем.
+    """
+    accepted = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for codec in settings.COMPRESSION_CODECS:
+        if codec not in CODECS:
+            continue
+        quality = accepted.get(codec, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = codec, quality
+    return best
+
+
+def compress(content, codec, cached=False):
+    """
+    Сжимает content кодеком codec.
+
+    С cached=True результат кэшируется в COMPRESSION_CACHE_ALIAS по хэшу
+    содержимого, поэтому одна и та же страница сжимается один раз
+    на время COMPRESSION_CACHE_TIMEOUT. Кэшировать стоит только ответы,
+    одинаковые для всех клиентов: личные ответы в кэше лишь вытесняют
+    общие.
+    """
+    if not cached:
+        return CODECS[codec](content)
+    cache = caches[settings.COMPRESSION_CACHE_ALIAS]
+    key = ':'.join((
+        CACHE_KEY_PREFIX, codec, hashlib.sha256(content).hexdigest()
+    ))
+    compressed = cache.get(key)
+    if compressed is None:
+        compressed = CODECS[codec](content)
+        cache.set(key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+    return compressed
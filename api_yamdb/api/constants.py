@@ -12,7 +12,37 @@ TITLE_FIELDS = (
     'genre',
     'rating',
 )
+# Краткие данные произведения в похожих и рекомендациях
+SHORT_TITLE_FIELDS = ('id', 'name', 'year', 'category', 'score')
 
 READ_ONLY_ID_AUTHOR_PUB_DATE = ('id', 'author', 'pub_date')
 
 USER_FIELDS = ('username', 'email', 'first_name', 'last_name', 'bio', 'role')
+
+# =====================================
+# Повтор транзакций при блокировке SQLite
+# =====================================
+LOCK_RETRY_ATTEMPTS = 5
+LOCK_RETRY_BASE_DELAY = 0.05  # секунды, удваивается с каждой попыткой
+LOCK_RETRY_MAX_DELAY = 1.0
+LOCK_ERROR_MESSAGES = ('database is locked', 'database table is locked')
+
+# =====================================
+# Метрики
+# =====================================
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# =====================================
+# Популярные произведения
+# =====================================
+TRENDING_COUNT = 20
+
+# =====================================
+# Подсказки названий
+# =====================================
+MAX_AUTOCOMPLETE_QUERY = 100
+
+# =====================================
+# Поиск с опечатками
+# =====================================
+MAX_SEARCH_QUERY = 100
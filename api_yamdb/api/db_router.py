@@ -0,0 +1,39 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Читать ли с основной базы. Вне запросов к API (команды, админка,
+# фоновые задачи) всё идёт в основную базу; ReplicaMiddleware
+# разрешает реплики только для безопасных запросов
+read_from_primary = ContextVar('read_from_primary', default=True)
+
+
+class ReplicaRouter:
+    """
+    Отправляет чтение на реплики из settings.DATABASE_REPLICAS,
+    а запись — в основную базу.
+
+    После первой записи чтение до конца запроса идёт с основной базы:
+    реплика может ещё не содержать только что записанные данные.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if read_from_primary.get() or not replicas:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        read_from_primary.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,142 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from api.utils import retry_on_lock
+from reviews.models import (Category, Comment, DeletionJob, Review, Title,
+                            TitleGenre)
+
+User = get_user_model()
+
+# Модель объекта по типу задачи
+TARGET_MODELS = {
+    DeletionJob.Target.TITLE: Title,
+    DeletionJob.Target.CATEGORY: Category,
+    DeletionJob.Target.USER: User,
+}
+
+
+def title_stages(pk):
+    """Этапы удаления произведения: (queryset, обработка пачки)."""
+    return (
+        (Comment.objects.filter(review__title_id=pk), delete_batch),
+        (Review.objects.filter(title_id=pk), delete_batch),
+        (TitleGenre.objects.filter(title_id=pk), delete_batch),
+    )
+
+
+def category_stages(pk):
+    return (
+        (Title.objects.filter(category_id=pk), detach_category_batch),
+    )
+
+
+def user_stages(pk):
+    # Наборы не пересекаются, чтобы прогресс сходился с оценкой
+    return (
+        (Comment.objects.filter(review__author_id=pk), delete_batch),
+        (Comment.objects.filter(author_id=pk).exclude(review__author_id=pk),
+         delete_batch),
+        (Review.objects.filter(author_id=pk), delete_batch),
+    )
+
+
+STAGES = {
+    DeletionJob.Target.TITLE: title_stages,
+    DeletionJob.Target.CATEGORY: category_stages,
+    DeletionJob.Target.USER: user_stages,
+}
+
+
+def delete_batch(queryset):
+    queryset.delete()
+
+
+def detach_category_batch(queryset):
+    # Аналог on_delete=SET_NULL у Title.category
+    queryset.update(category=None)
+
+
+def count_dependents(target, pk):
+    """Оценка числа зависимых записей для прогресса задачи."""
+    return sum(queryset.count() for queryset, _ in STAGES[target](pk))
+
+
+def schedule_deletion(obj):
+    """
+    Скрывает объект и ставит его удаление в очередь.
+    Скрытый объект не виден в API; пользователь к тому же
+    деактивируется и не проходит аутентификацию.
+    """
+    target = next(
+        target for target, model in TARGET_MODELS.items()
+        if isinstance(obj, model)
+    )
+    with transaction.atomic():
+        obj.is_hidden = True
+        update_fields = ['is_hidden']
+        if target == DeletionJob.Target.USER:
+            obj.is_active = False
+            update_fields.append('is_active')
+        obj.save(update_fields=update_fields)
+        return DeletionJob.objects.create(
+            target=target,
+            object_id=obj.pk,
+            object_repr=str(obj)[:256],
+            total=count_dependents(target, obj.pk),
+        )
+
+
+@retry_on_lock()
+def process_batch(job, queryset, handler, batch_size):
+    """
+    Обрабатывает одну пачку и сохраняет прогресс в той же транзакции.
+    Возвращает размер пачки; 0 — этап завершён.
+    """
+    ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+    if ids:
+        handler(queryset.model.objects.filter(pk__in=ids))
+        DeletionJob.objects.filter(pk=job.pk).update(
+            processed=F('processed') + len(ids), updated=timezone.now()
+        )
+    return len(ids)
+
+
+@retry_on_lock()
+def finish_deletion(job):
+    TARGET_MODELS[job.target].objects.filter(pk=job.object_id).delete()
+    job.status = DeletionJob.Status.DONE
+    job.finished = timezone.now()
+    job.save(update_fields=['status', 'finished', 'updated'])
+
+
+def claim_job(job):
+    """Берёт задачу в работу; False, если её уже взял другой воркер."""
+    return bool(DeletionJob.objects.filter(
+        pk=job.pk, status=DeletionJob.Status.PENDING
+    ).update(status=DeletionJob.Status.RUNNING, updated=timezone.now()))
+
+
+def run_deletion(job, batch_size=None):
+    """
+    Удаляет зависимые записи пачками, затем сам объект.
+
+    Этапы выбирают ещё не удалённые записи, поэтому прерванную
+    задачу можно запустить повторно.
+    """
+    batch_size = batch_size or settings.DELETION_BATCH_SIZE
+    try:
+        for queryset, handler in STAGES[job.target](job.object_id):
+            while True:
+                processed = process_batch(job, queryset, handler, batch_size)
+                if not processed:
+                    break
+                job.processed += processed
+        finish_deletion(job)
+    except Exception as error:
+        job.status = DeletionJob.Status.FAILED
+        job.error = repr(error)
+        job.save(update_fields=['status', 'error', 'updated'])
+        raise
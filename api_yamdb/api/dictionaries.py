@@ -0,0 +1,135 @@
+import time
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from api.metrics import current_timings
+
+# Общая для процессов версия справочников (категорий и жанров) в кэше
+# Django. Каждый процесс держит свой снимок и перечитывает его, когда
+# версия меняется
+VERSION_KEY = 'dictionaries:version'
+# Снимок перечитывается и без смены версии не реже, чем раз в столько
+# секунд: bulk_create и правки в обход моделей не посылают сигналов
+MAX_AGE = 300
+
+_snapshots = {}
+
+
+class Dictionary:
+    """
+    Снимок справочника: slug -> (id, название) и id -> (slug, название).
+
+    Справочники маленькие и меняются редко, поэтому читаются целиком
+    одним запросом. Неизвестные slug проверяются в базе: если они там
+    есть, снимок устарел и сбрасывается.
+    """
+
+    def __init__(self, model, version):
+        self.model = model
+        self.version = version
+        self.loaded = time.monotonic()
+        # Скрытые до фонового удаления записи (см. api.deletion)
+        # не находятся по slug, а в представлении выводятся как null
+        self.can_hide = any(
+            field.name == 'is_hidden' for field in model._meta.fields
+        )
+        fields = ('id', 'slug', 'name') + (
+            ('is_hidden',) if self.can_hide else ()
+        )
+        rows = list(model.objects.values_list(*fields))
+        timings = current_timings.get()
+        if timings is not None:
+            timings.cache_queries += 1
+        self.by_id = {}
+        self.by_slug = {}
+        self.hidden = set()
+        self.add_rows(rows)
+
+    def is_fresh(self, version):
+        return (
+            self.version == version
+            and time.monotonic() - self.loaded < MAX_AGE
+        )
+
+    def visible(self):
+        queryset = self.model.objects.all()
+        return queryset.filter(is_hidden=False) if self.can_hide else queryset
+
+    def add_rows(self, rows):
+        for pk, slug, name, *hidden in rows:
+            self.by_id[pk] = (slug, name)
+            if any(hidden):
+                self.hidden.add(pk)
+            else:
+                self.by_slug[slug] = (pk, name)
+
+    def get_ids(self, slugs):
+        """
+        id записей по списку slug (без повторов, в порядке списка)
+        и список неизвестных slug. Slug, которых нет в снимке,
+        проверяются в базе одним запросом.
+        """
+        slugs = list(dict.fromkeys(slugs))
+        missing = [slug for slug in slugs if slug not in self.by_slug]
+        if missing:
+            rows = list(self.visible().filter(
+                slug__in=missing
+            ).values_list('id', 'slug', 'name'))
+            if rows:
+                self.add_rows(rows)
+                invalidate_dictionaries()
+        return (
+            [self.by_slug[slug][0] for slug in slugs if slug in self.by_slug],
+            [slug for slug in slugs if slug not in self.by_slug],
+        )
+
+    def get_id(self, slug):
+        """id записи по slug или None, если записи нет."""
+        ids, _ = self.get_ids([slug])
+        return ids[0] if ids else None
+
+    def get_row(self, pk):
+        """(slug, название) записи; запись новее снимка читается из базы."""
+        if pk in self.by_id:
+            return self.by_id[pk]
+        invalidate_dictionaries()
+        return self.model.objects.values_list('slug', 'name').get(pk=pk)
+
+    def get_instance(self, pk):
+        """Экземпляр модели по id без запроса к базе."""
+        return self.model.from_db(
+            DEFAULT_DB_ALIAS, ['id', 'slug', 'name'], [pk, *self.get_row(pk)]
+        )
+
+    def represent(self, pk):
+        """Представление записи в API: название и slug."""
+        if pk in self.hidden:
+            return None
+        slug, name = self.get_row(pk)
+        return dict(name=name, slug=slug)
+
+
+def get_dictionary(model):
+    version = cache.get(VERSION_KEY, 0)
+    dictionary = _snapshots.get(model)
+    if dictionary is None or not dictionary.is_fresh(version):
+        dictionary = _snapshots[model] = Dictionary(model, version)
+    return dictionary
+
+
+def bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+
+
+def invalidate_dictionaries():
+    """
+    Сбрасывает снимки процесса сразу, а версию для остальных
+    процессов меняет после фиксации транзакции: иначе они могут
+    перечитать справочник до того, как изменения станут видны.
+    """
+    _snapshots.clear()
+    transaction.on_commit(bump_version)
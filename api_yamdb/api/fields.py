@@ -1,6 +1,9 @@
 from django.core.validators import RegexValidator
 from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.relations import MANY_RELATION_KWARGS
 
+from api.dictionaries import get_dictionary
 from api.validators import NotMeValidator
 from users import constants as cu
 
@@ -18,3 +21,67 @@ USERNAME_FIELD = serializers.CharField(
         NotMeValidator(),
     ],
 )
+
+
+# =====================================
+# Поля категорий и жанров из кэша справочников
+# =====================================
+class DictionarySlugField(serializers.SlugRelatedField):
+    """SlugRelatedField, который ищет slug в кэше справочников."""
+
+    def __init__(self, **kwargs):
+        super().__init__(slug_field='slug', **kwargs)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = dict(child_relation=cls(*args, **kwargs))
+        for key in MANY_RELATION_KWARGS:
+            if key in kwargs:
+                list_kwargs[key] = kwargs[key]
+        return DictionaryManySlugField(**list_kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        dictionary = get_dictionary(self.queryset.model)
+        pk = dictionary.get_id(data)
+        if pk is None:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=data)
+        return dictionary.get_instance(pk)
+
+
+class DictionaryManySlugField(serializers.ManyRelatedField):
+    """
+    Список slug справочника. Неизвестные slug проверяются в базе одним
+    запросом slug__in, и об ошибке сообщается сразу для всех.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        child = self.child_relation
+        if not all(isinstance(slug, str) for slug in data):
+            child.fail('invalid')
+        dictionary = get_dictionary(child.queryset.model)
+        ids, unknown = dictionary.get_ids(data)
+        if unknown:
+            message = child.error_messages['does_not_exist']
+            raise ValidationError([
+                message.format(slug_name=child.slug_field, value=slug)
+                for slug in unknown
+            ])
+        return [dictionary.get_instance(pk) for pk in ids]
+
+
+class DictionaryField(serializers.Field):
+    """Категория или жанр по id: название и slug из кэша справочников."""
+
+    def __init__(self, model, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.model = model
+
+    def to_representation(self, value):
+        return get_dictionary(self.model).represent(value)
@@ -1,18 +1,54 @@
 import django_filters
+from django.db.models import Case, IntegerField, When
 
-from reviews.models import Title
+from api import constants as ca
+from api.dictionaries import get_dictionary
+from api.fuzzy import search_titles
+from reviews.models import Category, Genre, Title
 
 
 class TitleFilter(django_filters.FilterSet):
-    """Фильтрация произведений."""
+    """
+    Фильтрация произведений.
 
-    genre = django_filters.CharFilter(field_name='genre__slug')
-    category = django_filters.CharFilter(field_name='category__slug')
+    Slug категории и жанра переводится в id по кэшу справочников,
+    поэтому запрос не соединяется с их таблицами. search — поиск
+    по названию с опечатками (api.fuzzy), по убыванию сходства.
+    """
+
+    genre = django_filters.CharFilter(method='filter_genre')
+    category = django_filters.CharFilter(method='filter_category')
     name = django_filters.CharFilter(
         field_name='name',
         lookup_expr='icontains',
     )
+    search = django_filters.CharFilter(
+        method='filter_search', max_length=ca.MAX_SEARCH_QUERY
+    )
 
     class Meta:
         model = Title
-        fields = ('genre', 'category', 'year', 'name')
+        fields = ('genre', 'category', 'year', 'name', 'search')
+
+    @staticmethod
+    def filter_by_slug(queryset, model, lookup, slug):
+        pk = get_dictionary(model).get_id(slug)
+        if pk is None:
+            return queryset.none()
+        return queryset.filter(**{lookup: pk})
+
+    def filter_genre(self, queryset, name, value):
+        return self.filter_by_slug(queryset, Genre, 'titlegenre__genre', value)
+
+    def filter_category(self, queryset, name, value):
+        return self.filter_by_slug(queryset, Category, 'category', value)
+
+    def filter_search(self, queryset, name, value):
+        pks = [pk for pk, _ in search_titles(value)]
+        if not pks:
+            return queryset.none()
+        order = Case(
+            *(When(pk=pk, then=position) for position, pk in enumerate(pks)),
+            output_field=IntegerField(),
+        )
+        return queryset.filter(pk__in=pks).order_by(order)
@@ -0,0 +1,107 @@
+"""
+Поиск произведений по названию с опечатками: инвертированный индекс
+триграмм в памяти процесса, без расширений SQLite.
+
+Сходство — как similarity() в pg_trgm: доля общих триграмм среди всех
+триграмм запроса и названия, |Q ∩ T| / |Q ∪ T|. Из сходства не меньше
+SIMILARITY_THRESHOLD следует |Q ∩ T| >= SIMILARITY_THRESHOLD * |Q|,
+поэтому кандидаты собираются только из самых редких триграмм запроса
+(префиксная фильтрация), а остальные триграммы лишь проверяют их.
+"""
+import math
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from api.autocomplete import TitleIndex, get_index, normalize
+
+# Порог сходства, как pg_trgm.similarity_threshold
+SIMILARITY_THRESHOLD = 0.3
+# Сколько самых похожих произведений возвращать
+SEARCH_COUNT = 100
+
+
+def trigrams(text):
+    """
+    Триграммы слов текста. Слово дополняется двумя пробелами слева и
+    одним справа: начало слова весит больше, а короткие слова тоже
+    дают триграммы.
+    """
+    grams = set()
+    for word in normalize(text):
+        padded = f'  {word} '
+        grams.update(
+            padded[start:start + 3] for start in range(len(word) + 1)
+        )
+    return grams
+
+
+class TrigramIndex(TitleIndex):
+    """
+    Списки id произведений (array, по возрастанию) для каждой триграммы
+    и число триграмм каждого названия.
+    """
+
+    def build(self):
+        postings = defaultdict(list)
+        self.sizes = {}
+        for pk in sorted(self.names):
+            grams = trigrams(self.names[pk])
+            self.sizes[pk] = len(grams)
+            for gram in grams:
+                postings[gram].append(pk)
+        self.postings = {
+            gram: array('q', pks) for gram, pks in postings.items()
+        }
+
+    def add(self, pk, name):
+        grams = trigrams(name)
+        self.sizes[pk] = len(grams)
+        for gram in grams:
+            pks = self.postings.setdefault(gram, array('q'))
+            pks.insert(bisect_left(pks, pk), pk)
+
+    def remove(self, pk, name):
+        del self.sizes[pk]
+        for gram in trigrams(name):
+            pks = self.postings[gram]
+            del pks[bisect_left(pks, pk)]
+            if not pks:
+                del self.postings[gram]
+
+    def search(self, query, count=SEARCH_COUNT,
+               threshold=SIMILARITY_THRESHOLD):
+        """[(id, сходство), ...] по убыванию сходства, затем по названию."""
+        grams = trigrams(query)
+        if not grams:
+            return []
+        empty = array('q')
+        lists = sorted(
+            (self.postings.get(gram, empty) for gram in grams), key=len
+        )
+        least = math.ceil(threshold * len(grams))
+        # Название без общих триграмм с первыми len(grams) - least + 1
+        # редкими списками не наберёт least общих
+        prefix = len(grams) - least + 1
+        common = Counter()
+        for pks in lists[:prefix]:
+            common.update(pks)
+        # Частые триграммы только проверяют кандидатов; пересечение
+        # и подсчёт идут на C, без цикла по спискам
+        for pks in lists[prefix:]:
+            common.update(common.keys() & pks)
+        found = []
+        for pk, hits in common.items():
+            if hits >= least:
+                score = hits / (len(grams) + self.sizes[pk] - hits)
+                if score >= threshold:
+                    found.append((pk, score))
+        found.sort(key=lambda item: (-item[1], self.names[item[0]]))
+        return found[:count]
+
+
+def search_titles(query, count=SEARCH_COUNT):
+    """[(id, сходство), ...] произведений, похожих на query."""
+    index = get_index(TrigramIndex)
+    with index.lock:
+        return index.search(query, count)
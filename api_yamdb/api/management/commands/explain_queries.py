@@ -0,0 +1,152 @@
+import re
+from urllib.parse import quote
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import resolve, reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.urls import router_v1
+from reviews.models import Review
+
+User = get_user_model()
+
+# Строка плана SQLite для полного обхода таблицы: «SCAN reviews_title»
+# (в старых версиях «SCAN TABLE reviews_title»). Обход по индексу
+# выглядит как «SCAN ... USING INDEX» или «SEARCH ...»
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+
+
+def route_kwargs(review):
+    """Параметры вложенных маршрутов из существующего отзыва."""
+    return dict(title_id=review.title_id, review_id=review.id)
+
+
+def list_requests(review):
+    """
+    URL списков всех вьюсетов router_v1, фильтров, поиска с опечатками
+    и популярных произведений: все они должны идти по индексу. Поиск
+    по подстроке (search справочников, name) не проверяется: для него
+    индекс не применим.
+    """
+    kwargs = route_kwargs(review)
+    urls = []
+    for prefix, viewset, basename in router_v1.registry:
+        if not hasattr(viewset, 'list'):
+            continue
+        names = re.findall(r'\(\?P<(\w+)>', prefix)
+        urls.append(reverse(
+            f'{basename}-list', kwargs={name: kwargs[name] for name in names}
+        ))
+    title = review.title
+    titles = reverse('title-list')
+    urls.extend([
+        f'{titles}?year={title.year}',
+        f'{titles}?category={title.category.slug}',
+        f'{titles}?genre={title.genre.first().slug}',
+        f'{titles}?search={quote(title.name)}',
+        f'{titles}trending/',
+        f'{titles}trending/?category={title.category.slug}',
+    ])
+    return urls
+
+
+class QueryCollector:
+    """Обёртка execute, запоминающая SELECT-запросы с параметрами."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            self.queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    """
+    Команда для проверки планов SQL-запросов списков API.
+    Выполняет запрос каждого списка, снимает для его SQL-запросов
+    EXPLAIN QUERY PLAN и завершается с ошибкой, если какой-то запрос
+    обходит таблицу целиком. Нужен хотя бы один отзыв (у произведения
+    с категорией и жанром): из него берутся id вложенных маршрутов.
+    Примеры:
+      1) Проверить все списки:
+         python manage.py explain_queries
+      2) Показать планы всех запросов:
+         python manage.py explain_queries -v 2
+      3) Разрешить полный обход маленьких таблиц:
+         python manage.py explain_queries --allow reviews_category
+    """
+
+    help = 'Проверка планов SQL-запросов списков API на полный обход таблиц'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--allow',
+            action='append',
+            default=[],
+            metavar='TABLE',
+            help='Таблица, полный обход которой допустим',
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        connection = connections[DEFAULT_DB_ALIAS]
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN есть только в SQLite.')
+        review = Review.objects.filter(
+            title__category__isnull=False, title__genre__isnull=False
+        ).select_related('title__category').first()
+        if review is None:
+            raise CommandError(
+                'Нет отзыва на произведение с категорией и жанром: '
+                'загрузите данные (import_csv или generate_dataset).'
+            )
+        # Пользователь только для проверки прав, в базу не пишется
+        admin = User(username='explain', role='admin', is_superuser=True)
+        factory = APIRequestFactory()
+        tables = set(connection.introspection.table_names())
+        full_scans = []
+        for url in list_requests(review):
+            collector = QueryCollector()
+            request = factory.get(url)
+            force_authenticate(request, user=admin)
+            match = resolve(request.path_info)
+            with connection.execute_wrapper(collector):
+                response = match.func(request, *match.args, **match.kwargs)
+            if response.status_code != 200:
+                raise CommandError(f'{url}: ответ {response.status_code}.')
+            for sql, params in collector.queries:
+                for table in self.explain(connection, url, sql, params):
+                    # Подзапросы в FROM тоже попадают в план как SCAN
+                    if table in tables and table not in options['allow']:
+                        full_scans.append(f'{url}: {table}\n  {sql}')
+        if full_scans:
+            raise CommandError(
+                'Полный обход таблиц:\n' + '\n'.join(full_scans)
+            )
+        self.stdout.write(self.style.SUCCESS('Полных обходов таблиц нет.'))
+
+    def explain(self, connection, url, sql, params):
+        """Печатает план запроса и возвращает таблицы с полным обходом."""
+        with connection.cursor() as cursor:
+            # Модуль sqlite3 кэширует подготовленные запросы, а план
+            # EXPLAIN не перестраивается после изменения схемы (например,
+            # migrate в том же процессе). Версия схемы в тексте запроса
+            # не даёт взять устаревший план из кэша
+            cursor.execute('PRAGMA schema_version')
+            version = cursor.fetchone()[0]
+            cursor.execute(
+                f'EXPLAIN QUERY PLAN {sql} /* schema {version} */', params
+            )
+            details = [row[3] for row in cursor.fetchall()]
+        if self.verbosity > 1:
+            self.stdout.write(f'{url}\n  {sql}')
+            for detail in details:
+                self.stdout.write(f'    {detail}')
+        return [
+            match.group(1) for match in map(FULL_SCAN.match, details)
+            if match
+        ]
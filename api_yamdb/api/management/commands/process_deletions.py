@@ -0,0 +1,96 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.deletion import claim_job, run_deletion
+from reviews.models import DeletionJob
+
+# Пауза между проверками очереди, секунд
+POLL_INTERVAL = 5
+
+
+class Command(BaseCommand):
+    """
+    Воркер фонового удаления (см. api.deletion).
+    Берёт задачи в статусе pending по одной и удаляет зависимые
+    записи пачками. Несколько воркеров не возьмут одну задачу дважды.
+    Примеры:
+      1) Обработать очередь и завершиться:
+         python manage.py process_deletions --once
+      2) Работать постоянно, проверяя очередь раз в 10 секунд:
+         python manage.py process_deletions --interval 10
+      3) Повторить упавшую задачу:
+         python manage.py process_deletions --job 42
+    """
+
+    help = 'Фоновое удаление произведений, категорий и пользователей'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Обработать текущую очередь и завершиться',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=POLL_INTERVAL,
+            help='Пауза между проверками очереди, секунд',
+        )
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            help='Размер пачки. По умолчанию: DELETION_BATCH_SIZE',
+        )
+        parser.add_argument(
+            '--job',
+            type=int,
+            help='Выполнить (или повторить) одну задачу по id',
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        if options['job']:
+            self.retry(options['job'])
+            return
+        while True:
+            processed = self.process_queue()
+            if options['once']:
+                break
+            if not processed:
+                sleep(options['interval'])
+
+    def retry(self, pk):
+        job = DeletionJob.objects.filter(pk=pk).first()
+        if job is None:
+            raise CommandError(f'Задача {pk} не найдена.')
+        if job.status == DeletionJob.Status.DONE:
+            raise CommandError(f'Задача {pk} уже выполнена.')
+        DeletionJob.objects.filter(pk=pk).update(
+            status=DeletionJob.Status.PENDING, error=''
+        )
+        job.refresh_from_db()
+        self.run(job)
+
+    def process_queue(self):
+        """Выполняет все задачи из очереди; возвращает их число."""
+        count = 0
+        pending = DeletionJob.objects.filter(
+            status=DeletionJob.Status.PENDING
+        ).order_by('created')
+        for job in pending:
+            count += self.run(job)
+        return count
+
+    def run(self, job):
+        if not claim_job(job):
+            return 0
+        try:
+            run_deletion(job, self.batch_size)
+        except Exception as error:
+            self.stderr.write(f'  {job}: {error!r}')
+            return 1
+        self.stdout.write(
+            f'  {job}: удалено {job.processed} зависимых записей'
+        )
+        return 1
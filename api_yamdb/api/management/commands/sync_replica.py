@@ -0,0 +1,61 @@
+import sqlite3
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Сколько страниц копировать за шаг: между шагами основная база
+# доступна для записи
+BACKUP_PAGES = 1024
+
+
+class Command(BaseCommand):
+    """
+    Команда для копирования основной базы SQLite в реплики.
+    Копия делается через backup API SQLite и согласована даже
+    при одновременной записи в основную базу.
+    Примеры:
+      1) Обновить все реплики из settings.DATABASE_REPLICAS:
+         python manage.py sync_replica
+      2) Обновить одну реплику:
+         python manage.py sync_replica replica1
+    """
+
+    help = 'Копирование основной базы SQLite в реплики'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'aliases',
+            nargs='*',
+            help='Реплики для обновления. По умолчанию: все',
+        )
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or settings.DATABASE_REPLICAS
+        if not aliases:
+            raise CommandError(
+                'Реплики не настроены: задайте DJANGO_DB_REPLICAS.'
+            )
+        unknown = set(aliases) - set(settings.DATABASE_REPLICAS)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные реплики: {", ".join(sorted(unknown))}.'
+            )
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError('Копирование поддерживается только для SQLite.')
+        source.ensure_connection()
+        for alias in aliases:
+            started = perf_counter()
+            # Подключения к реплике в этом процессе держат старую копию
+            connections[alias].close()
+            target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+            try:
+                source.connection.backup(target, pages=BACKUP_PAGES)
+            finally:
+                target.close()
+            self.stdout.write(
+                f'  {alias}: {perf_counter() - started:.2f} с'
+            )
+        self.stdout.write(self.style.SUCCESS('Реплики обновлены!'))
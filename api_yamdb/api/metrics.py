@@ -0,0 +1,163 @@
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+
+from api.query_inspection import inspect_query
+
+# Границы корзин гистограмм, секунды (как у клиентов Prometheus)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Гистограммы: имя метрики -> атрибут RequestTimings и описание
+HISTOGRAMS = dict(
+    yamdb_request_duration_seconds=('total', 'Время обработки запроса'),
+    yamdb_db_duration_seconds=('db', 'Время SQL-запросов за запрос'),
+    yamdb_serializer_duration_seconds=('serializer', 'Время сериализации'),
+    yamdb_render_duration_seconds=('render', 'Время рендеринга ответа'),
+)
+QUERIES_METRIC = 'yamdb_db_queries_total'
+
+
+class RequestTimings:
+    """Замеры одного запроса, секунды."""
+
+    def __init__(self):
+        self.total = 0.0
+        self.db = 0.0
+        self.queries = 0
+        # Запросы заполнения кэшей процесса (api.dictionaries): входят
+        # в Server-Timing, но не в бюджеты запросов вьюсетов
+        self.cache_queries = 0
+        self.serializer = 0.0
+        self.render = 0.0
+        self.render_started = None
+        # Глубина вложенных вызовов to_representation: учитывается
+        # только верхний уровень, вложенные сериализаторы уже внутри него
+        self.serializer_depth = 0
+        # Запрос и счётчик отпечатков SQL для поиска N+1
+        # (см. api.query_inspection)
+        self.request = None
+        self.fingerprints = None
+
+    @property
+    def view(self):
+        """Имя представления; известно после разрешения URL."""
+        match = getattr(self.request, 'resolver_match', None)
+        return match.view_name if match else None
+
+
+# Замеры текущего запроса; None вне ServerTimingMiddleware
+current_timings = ContextVar('current_timings', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Обёртка execute_wrapper: считает SQL-запросы и их время."""
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = perf_counter() - started
+        timings.db += duration
+        timings.queries += 1
+        inspect_query(timings, sql, duration)
+
+
+class TimedRepresentationMixin:
+    """Учитывает время to_representation в замерах запроса."""
+
+    def to_representation(self, instance):
+        timings = current_timings.get()
+        if timings is None:
+            return super().to_representation(instance)
+        timings.serializer_depth += 1
+        started = perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            timings.serializer_depth -= 1
+            if not timings.serializer_depth:
+                timings.serializer += perf_counter() - started
+
+
+class Histogram:
+    """Гистограмма с накопленным числом наблюдений по корзинам."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ('+Inf',), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_sum{{{labels}}} {self.sum}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+class MetricsRegistry:
+    """Гистограммы по маршрутам в памяти процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.queries = {}
+
+    def observe(self, route, method, timings):
+        key = (route, method)
+        with self.lock:
+            for name, (attribute, _) in HISTOGRAMS.items():
+                self.histograms.setdefault(
+                    (name, key), Histogram()
+                ).observe(getattr(timings, attribute))
+            self.queries[key] = self.queries.get(key, 0) + timings.queries
+
+    def clear(self):
+        with self.lock:
+            self.histograms.clear()
+            self.queries.clear()
+
+    def render(self):
+        """Метрики в текстовом формате Prometheus."""
+        with self.lock:
+            lines = []
+            for name, (_, help_text) in HISTOGRAMS.items():
+                lines += [f'# HELP {name} {help_text}.',
+                          f'# TYPE {name} histogram']
+                for (metric, (route, method)), histogram in sorted(
+                    self.histograms.items()
+                ):
+                    if metric == name:
+                        lines.extend(histogram.lines(
+                            name, f'route="{route}",method="{method}"'
+                        ))
+            lines += [f'# HELP {QUERIES_METRIC} Число SQL-запросов.',
+                      f'# TYPE {QUERIES_METRIC} counter']
+            for (route, method), count in sorted(self.queries.items()):
+                lines.append(
+                    f'{QUERIES_METRIC}{{route="{route}",method="{method}"}} '
+                    f'{count}'
+                )
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def server_timing(timings):
+    """Значение заголовка Server-Timing."""
+    return ', '.join((
+        f'db;dur={timings.db * 1000:.1f};desc="{timings.queries} queries"',
+        f'serialize;dur={timings.serializer * 1000:.1f}',
+        f'render;dur={timings.render * 1000:.1f}',
+        f'total;dur={timings.total * 1000:.1f}',
+    ))
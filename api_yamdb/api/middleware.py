@@ -0,0 +1,326 @@
+import asyncio
+import time
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.module_loading import import_string
+
+from api.compression import compress, negotiate_encoding
+from api.db_router import read_from_primary
+from api.metrics import (RequestTimings, current_timings, registry,
+                         server_timing)
+from api.profiling import (PROFILE_RESPONSE_HEADER, is_admin_request,
+                           profile_flag, profiled, save_profile,
+                           start_profiler)
+from api.query_inspection import report_n_plus_one, start_inspection
+
+# Запросы, которые можно обслужить с реплики
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+REPLICA_PATH_PREFIX = '/api/'
+
+# Клиент, только что писавший в базу, получает в ответе время
+# (unix timestamp), до которого его чтение идёт с основной базы.
+# Браузеры возвращают его в cookie, остальные клиенты — в заголовке
+PRIMARY_UNTIL_COOKIE = 'primary_until'
+PRIMARY_UNTIL_HEADER = 'X-Primary-Until'
+# Заголовок запроса, явно требующий чтения с основной базы
+READ_PRIMARY_HEADER = 'X-Read-Primary'
+
+# Типы содержимого, которые имеет смысл сжимать
+COMPRESSIBLE_CONTENT_TYPES = ('application/json', 'text/', 'application/xml')
+
+
+class InlineMiddlewareMixin(MiddlewareMixin):
+    """
+    MiddlewareMixin, который под ASGI вызывает process_request
+    и process_response прямо в цикле событий, без перехода в общий
+    поток sync_to_async(thread_sensitive=True). Только для middleware,
+    чьи обработчики не обращаются к БД, сети и диску.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.inline_acall(request)
+        return super().__call__(request)
+
+    async def inline_acall(self, request):
+        response = None
+        if hasattr(self, 'process_request'):
+            response = self.process_request(request)
+        response = response or await self.get_response(request)
+        if hasattr(self, 'process_response'):
+            response = self.process_response(request, response)
+        return response
+
+
+def pinned_to_primary(request):
+    """Проверяет, должен ли запрос читать с основной базы."""
+    if request.headers.get(READ_PRIMARY_HEADER):
+        return True
+    until = request.headers.get(PRIMARY_UNTIL_HEADER) or request.COOKIES.get(
+        PRIMARY_UNTIL_COOKIE
+    )
+    try:
+        return float(until) > time.time()
+    except (TypeError, ValueError):
+        return False
+
+
+class ReplicaMiddleware(InlineMiddlewareMixin):
+    """
+    Выбирает базу для чтения в запросах к API (см. ReplicaRouter).
+    Без реплик в settings.DATABASE_REPLICAS ничего не делает.
+    """
+
+    def process_request(self, request):
+        if settings.DATABASE_REPLICAS and request.path.startswith(
+            REPLICA_PATH_PREFIX
+        ):
+            read_from_primary.set(
+                request.method not in SAFE_METHODS
+                or pinned_to_primary(request)
+            )
+
+    def process_response(self, request, response):
+        if not settings.DATABASE_REPLICAS:
+            return response
+        read_from_primary.set(True)
+        if request.path.startswith(REPLICA_PATH_PREFIX) and (
+            request.method not in SAFE_METHODS
+        ):
+            until = str(round(time.time() + settings.REPLICA_PIN_SECONDS, 3))
+            response[PRIMARY_UNTIL_HEADER] = until
+            response.set_cookie(
+                PRIMARY_UNTIL_COOKIE,
+                until,
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class BrowserMiddleware(MiddlewareMixin):
+    """
+    Пропускает запрос через settings.BROWSER_MIDDLEWARE, если его путь
+    не начинается с одного из settings.LEAN_PATH_PREFIXES.
+
+    Сессии, CSRF и сообщения нужны только админке и страницам для
+    браузера; API аутентифицируется по JWT и обходит эту цепочку.
+    Middleware из BROWSER_MIDDLEWARE должны поддерживать и sync,
+    и async режим (как MiddlewareMixin), чтобы цепочка работала под ASGI.
+
+    Django вызывает process_view, process_template_response
+    и process_exception только у классов из MIDDLEWARE, поэтому
+    диспетчер вызывает их у цепочки сам: на process_view
+    CsrfViewMiddleware проверяет токен.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.browser_chain = get_response
+        self.browser_middleware = []
+        for path in reversed(settings.BROWSER_MIDDLEWARE):
+            middleware = import_string(path)(self.browser_chain)
+            self.browser_middleware.insert(0, middleware)
+            self.browser_chain = convert_exception_to_response(middleware)
+
+    def __call__(self, request):
+        if self.is_lean(request):
+            return self.get_response(request)
+        return self.browser_chain(request)
+
+    @staticmethod
+    def is_lean(request):
+        return request.path.startswith(settings.LEAN_PATH_PREFIXES)
+
+    def hooks(self, request, name, reverse=False):
+        """Обработчики name цепочки в порядке вызова Django."""
+        if self.is_lean(request):
+            return []
+        middleware = self.browser_middleware
+        if reverse:
+            middleware = reversed(middleware)
+        return [
+            getattr(instance, name) for instance in middleware
+            if hasattr(instance, name)
+        ]
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        for hook in self.hooks(request, 'process_view'):
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    def process_template_response(self, request, response):
+        for hook in self.hooks(
+            request, 'process_template_response', reverse=True
+        ):
+            response = hook(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        for hook in self.hooks(request, 'process_exception', reverse=True):
+            response = hook(request, exception)
+            if response is not None:
+                return response
+        return None
+
+
+def is_compressible(response):
+    """Проверяет, можно ли сжать ответ."""
+    content_type = response.get('Content-Type', '')
+    return (
+        not response.streaming
+        and not response.has_header('Content-Encoding')
+        and len(response.content) >= settings.COMPRESSION_MIN_SIZE
+        and content_type.startswith(COMPRESSIBLE_CONTENT_TYPES)
+    )
+
+
+def is_shared(request, response):
+    """
+    Проверяет, что ответ одинаков для всех клиентов: GET без токена
+    и сессии, не помеченный как private.
+    """
+    return (
+        request.method in ('GET', 'HEAD')
+        and 'HTTP_AUTHORIZATION' not in request.META
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and not response.cookies
+        and 'private' not in response.get('Cache-Control', '')
+    )
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Сжимает ответы не меньше COMPRESSION_MIN_SIZE байт кодеком,
+    выбранным по Accept-Encoding (см. api.compression). Сжатые
+    общие ответы кэшируются.
+
+    Под ASGI сжатие идёт в отдельном потоке: оно занимает процессор
+    и обращается к кэшу, поэтому не выполняется ни в цикле событий,
+    ни в общем потоке sync_to_async(thread_sensitive=True), где
+    выполняются запросы к БД.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.threaded_acall(request)
+        return super().__call__(request)
+
+    async def threaded_acall(self, request):
+        response = await self.get_response(request)
+        return await sync_to_async(
+            self.process_response, thread_sensitive=False
+        )(request, response)
+
+    def process_response(self, request, response):
+        if not is_compressible(response):
+            return response
+        # Ответ зависит от Accept-Encoding, даже если он не сжат
+        patch_vary_headers(response, ('Accept-Encoding',))
+        codec = negotiate_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if codec is None:
+            return response
+        compressed = compress(
+            response.content, codec, cached=is_shared(request, response)
+        )
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = codec
+        # Сжатое представление отличается побайтно: ETag становится слабым
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+
+def finish_render(timings, response):
+    timings.render += time.perf_counter() - timings.render_started
+
+
+class ServerTimingMiddleware(InlineMiddlewareMixin):
+    """
+    Замеряет время SQL, сериализации и рендеринга запроса
+    (см. api.metrics), пишет его в заголовок Server-Timing
+    и в гистограммы по маршрутам.
+    """
+
+    def process_request(self, request):
+        request.timings = RequestTimings()
+        request.timings_started = time.perf_counter()
+        request.timings.request = request
+        start_inspection(request.timings)
+        current_timings.set(request.timings)
+
+    def process_template_response(self, request, response):
+        timings = getattr(request, 'timings', None)
+        if timings is not None:
+            timings.render_started = time.perf_counter()
+            response.add_post_render_callback(partial(finish_render, timings))
+        return response
+
+    def process_response(self, request, response):
+        timings = getattr(request, 'timings', None)
+        if timings is None:
+            return response
+        current_timings.set(None)
+        timings.total = time.perf_counter() - request.timings_started
+        report_n_plus_one(timings)
+        match = request.resolver_match
+        registry.observe(
+            match.view_name if match else 'unmatched', request.method, timings
+        )
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = server_timing(timings)
+        return response
+
+
+def finish_profile(request, response):
+    profiler = getattr(request, 'profiler', None)
+    if profiler is None or not profiler.getstats():
+        return response
+    duration = time.perf_counter() - request.profile_started
+    response[PROFILE_RESPONSE_HEADER] = save_profile(
+        request, response, duration
+    )
+    return response
+
+
+class ProfilerMiddleware(MiddlewareMixin):
+    """
+    Профилирует запрос администратора с заголовком X-Profile
+    или параметром ?profile (см. api.profiling).
+
+    Остальные запросы платят только за проверку заголовка и параметра.
+    Под ASGI профилируются маршруты из api.async_views: представление
+    выполняется в потоке пула, и профилировщик включается там.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.acall(request)
+        if profile_flag(request) and is_admin_request(request):
+            start_profiler(request)
+        response = profiled(request, self.get_response, request)
+        return finish_profile(request, response)
+
+    async def acall(self, request):
+        if profile_flag(request) and await sync_to_async(is_admin_request)(
+            request
+        ):
+            start_profiler(request)
+        response = await self.get_response(request)
+        if getattr(request, 'profiler', None) is None:
+            return response
+        return await sync_to_async(finish_profile)(request, response)
@@ -0,0 +1,119 @@
+import cProfile
+import json
+import re
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+# Запрос профилируется, если передан заголовок или параметр запроса
+# и пользователь — администратор
+PROFILE_REQUEST_HEADER = 'HTTP_X_PROFILE'
+PROFILE_QUERY_PARAM = 'profile'
+# Заголовок ответа с именем сохранённого профиля
+PROFILE_RESPONSE_HEADER = 'X-Profile-Id'
+
+PROFILE_NAME = re.compile(r'^\d+-[0-9a-f]{8}$')
+PROFILE_SUFFIX = '.prof'
+META_SUFFIX = '.json'
+
+
+def profile_flag(request):
+    """Проверяет, просит ли запрос профилирования (без обращения к БД)."""
+    return bool(
+        request.META.get(PROFILE_REQUEST_HEADER)
+        or PROFILE_QUERY_PARAM in request.GET
+    )
+
+
+def is_admin_request(request):
+    """Аутентифицирует запрос по JWT и проверяет роль администратора."""
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except (AuthenticationFailed, InvalidToken):
+        return False
+    return authenticated is not None and authenticated[0].is_admin
+
+
+def profiled(request, func, *args, **kwargs):
+    """Вызывает func под профилировщиком запроса, если он включён."""
+    profiler = getattr(request, 'profiler', None)
+    if profiler is None:
+        return func(*args, **kwargs)
+    profiler.enable()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profiler.disable()
+
+
+def profiles_dir():
+    path = Path(settings.PROFILES_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def save_profile(request, response, duration):
+    """Сохраняет профиль запроса и удаляет устаревшие; возвращает имя."""
+    name = f'{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}'
+    directory = profiles_dir()
+    request.profiler.dump_stats(directory / f'{name}{PROFILE_SUFFIX}')
+    match = request.resolver_match
+    (directory / f'{name}{META_SUFFIX}').write_text(json.dumps(dict(
+        name=name,
+        created=time.time(),
+        method=request.method,
+        path=request.get_full_path(),
+        view=match.view_name if match else None,
+        status=response.status_code,
+        duration_ms=round(duration * 1000, 1),
+    ), ensure_ascii=False))
+    prune_profiles()
+    return name
+
+
+def remove_profile(name):
+    for suffix in (PROFILE_SUFFIX, META_SUFFIX):
+        (profiles_dir() / f'{name}{suffix}').unlink(missing_ok=True)
+
+
+def list_profiles():
+    """Метаданные сохранённых профилей, новые первыми."""
+    profiles = []
+    for path in profiles_dir().glob(f'*{META_SUFFIX}'):
+        try:
+            profiles.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return sorted(profiles, key=lambda meta: meta['created'], reverse=True)
+
+
+def prune_profiles():
+    """
+    Оставляет не больше PROFILE_RETENTION_COUNT профилей
+    не старше PROFILE_RETENTION_DAYS дней.
+    """
+    oldest = time.time() - settings.PROFILE_RETENTION_DAYS * 24 * 60 * 60
+    for number, meta in enumerate(list_profiles()):
+        if (
+            number >= settings.PROFILE_RETENTION_COUNT
+            or meta['created'] < oldest
+        ):
+            remove_profile(meta['name'])
+
+
+def profile_file(name):
+    """Путь к файлу профиля или None, если профиля нет."""
+    if not PROFILE_NAME.match(name):
+        return None
+    path = profiles_dir() / f'{name}{PROFILE_SUFFIX}'
+    return path if path.exists() else None
+
+
+def start_profiler(request):
+    request.profiler = cProfile.Profile()
+    request.profile_started = time.perf_counter()
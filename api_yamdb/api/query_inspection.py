@@ -0,0 +1,79 @@
+import logging
+import re
+from collections import Counter
+
+from django.conf import settings
+
+logger = logging.getLogger('api.queries')
+
+# Списки плейсхолдеров IN (%s, %s, ...) разной длины — один запрос
+IN_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+# Литералы, которые могут попасть в SQL без параметров
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(Exception):
+    """Представление выполнило больше SQL-запросов, чем объявлено."""
+
+
+def fingerprint(sql):
+    """
+    Отпечаток SQL-запроса: запросы, отличающиеся только значениями
+    параметров, дают одинаковый отпечаток.
+    """
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = NUMBER_LITERAL.sub('?', sql)
+    sql = IN_LIST.sub('(%s...)', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+def inspect_query(timings, sql, duration):
+    """Учитывает отпечаток запроса и пишет в лог медленные запросы."""
+    if timings.fingerprints is not None:
+        timings.fingerprints[fingerprint(sql)] += 1
+    slow_query_ms = settings.SLOW_QUERY_MS
+    if slow_query_ms is not None and duration * 1000 >= slow_query_ms:
+        logger.warning(
+            'Медленный запрос (%.1f мс) во view %s: %s',
+            duration * 1000, timings.view, sql,
+        )
+
+
+def start_inspection(timings):
+    if settings.QUERY_INSPECTION:
+        timings.fingerprints = Counter()
+
+
+def report_n_plus_one(timings):
+    """Пишет в лог запросы, повторённые за запрос не меньше N раз."""
+    if not timings.fingerprints:
+        return []
+    repeated = [
+        (sql, count) for sql, count in timings.fingerprints.most_common()
+        if count >= settings.N_PLUS_ONE_THRESHOLD
+    ]
+    for sql, count in repeated:
+        logger.warning(
+            'Возможный N+1 во view %s: %d одинаковых запросов: %s',
+            timings.view, count, sql,
+        )
+    return repeated
+
+
+def check_query_budget(view, queries):
+    """
+    Сравнивает число запросов с бюджетом view.query_budgets[action].
+    Действие при превышении задаёт settings.QUERY_BUDGET_ACTION.
+    """
+    budget = getattr(view, 'query_budgets', {}).get(view.action)
+    if budget is None or queries <= budget:
+        return
+    message = (
+        f'{view.__class__.__name__}.{view.action}: {queries} SQL-запросов '
+        f'при бюджете {budget}.'
+    )
+    if settings.QUERY_BUDGET_ACTION == 'raise':
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
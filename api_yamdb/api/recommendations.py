@@ -0,0 +1,105 @@
+import time
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+
+from api.metrics import current_timings
+from reviews.models import Review, TitleEmbedding, UserEmbedding
+
+# Версия векторов в кэше Django: команда train_recommendations меняет
+# её после сохранения, и процессы перечитывают векторы произведений
+VERSION_KEY = 'recommendations:version'
+# Снимок перечитывается и без смены версии не реже, чем раз в столько
+# секунд: новые и скрытые произведения (см. api.deletion)
+MAX_AGE = 300
+# Сколько произведений рекомендовать
+RECOMMENDATIONS_COUNT = 20
+
+_snapshots = {}
+
+
+class TitleVectors:
+    """Векторы всех видимых произведений одной матрицей float32."""
+
+    def __init__(self, version):
+        self.version = version
+        self.loaded = time.monotonic()
+        rows = list(TitleEmbedding.objects.filter(
+            title__is_hidden=False
+        ).values_list('title_id', 'vector'))
+        timings = current_timings.get()
+        if timings is not None:
+            timings.cache_queries += 1
+        self.ids = np.array([pk for pk, _ in rows], dtype=np.int64)
+        self.matrix = np.array(
+            [np.frombuffer(vector, dtype=np.float32) for _, vector in rows],
+            dtype=np.float32,
+        )
+
+    def is_fresh(self, version):
+        return (
+            self.version == version
+            and time.monotonic() - self.loaded < MAX_AGE
+        )
+
+
+def get_title_vectors():
+    version = cache.get(VERSION_KEY, 0)
+    vectors = _snapshots.get(TitleEmbedding)
+    if vectors is None or not vectors.is_fresh(version):
+        vectors = _snapshots[TitleEmbedding] = TitleVectors(version)
+    return vectors
+
+
+def bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+
+
+def invalidate_recommendations():
+    """
+    Сбрасывает снимок процесса сразу, а версию для остальных процессов
+    меняет после фиксации транзакции с новыми векторами.
+    """
+    _snapshots.clear()
+    transaction.on_commit(bump_version)
+
+
+def user_vector(user, dimension):
+    """
+    Вектор пользователя. У пользователя без вектора (новый или без
+    оценок) прогноз — средняя оценка со смещением произведения.
+    """
+    vector = UserEmbedding.objects.filter(user=user).values_list(
+        'vector', flat=True
+    ).first()
+    if vector is not None:
+        return np.frombuffer(vector, dtype=np.float32)
+    vector = np.zeros(dimension, dtype=np.float32)
+    vector[-2] = 1
+    return vector
+
+
+def recommend(user, count=RECOMMENDATIONS_COUNT):
+    """
+    [(id произведения, прогноз оценки), ...] по убыванию прогноза,
+    без произведений, на которые пользователь уже написал отзыв.
+    """
+    titles = get_title_vectors()
+    if not len(titles.ids):
+        return []
+    scores = titles.matrix @ user_vector(user, titles.matrix.shape[1])
+    reviewed = Review.objects.filter(author=user).values_list(
+        'title_id', flat=True
+    )
+    scores[np.isin(titles.ids, list(reviewed))] = -np.inf
+    count = min(count, len(scores))
+    best = np.argpartition(-scores, count - 1)[:count]
+    best = best[np.argsort(-scores[best], kind='stable')]
+    return [
+        (int(titles.ids[index]), float(scores[index]))
+        for index in best if np.isfinite(scores[index])
+    ]
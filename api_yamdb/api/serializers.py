@@ -5,18 +5,28 @@ from rest_framework.relations import SlugRelatedField
 
 from api import constants as ca
 from api import utils
-from api.fields import USERNAME_FIELD
+from api.dictionaries import get_dictionary
+from api.fields import (USERNAME_FIELD, DictionaryField,
+                        DictionarySlugField)
+from api.metrics import TimedRepresentationMixin
 from api.utils import validate_not_empty, validate_year_not_exceed_current
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (Category, Comment, DeletionJob, Genre, Review,
+                            SimilarTitle, Title, TitleGenre)
+from reviews.trending import current_score
 from users import constants as cu
 
 User = get_user_model()
 
 
+class TimedModelSerializer(TimedRepresentationMixin,
+                           serializers.ModelSerializer):
+    """ModelSerializer с учётом времени сериализации в Server-Timing."""
+
+
 # =====================================
 # Category Serializers
 # =====================================
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedModelSerializer):
     """Сериализатор для модели категории."""
 
     class Meta:
@@ -25,7 +35,7 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ca.READ_ONLY_ID
 
 
-class CategoryListCreateSerializer(serializers.ModelSerializer):
+class CategoryListCreateSerializer(TimedModelSerializer):
     """Сериализатор для списка и создания категорий без поля id."""
 
     class Meta:
@@ -36,7 +46,7 @@ class CategoryListCreateSerializer(serializers.ModelSerializer):
 # =====================================
 # Genre Serializers
 # =====================================
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedModelSerializer):
     """Сериализатор для модели жанра."""
 
     class Meta:
@@ -45,7 +55,7 @@ class GenreSerializer(serializers.ModelSerializer):
         read_only_fields = ca.READ_ONLY_ID
 
 
-class GenreListCreateSerializer(serializers.ModelSerializer):
+class GenreListCreateSerializer(TimedModelSerializer):
     """Сериализатор для списка и создания жанров без поля id."""
 
     class Meta:
@@ -56,17 +66,15 @@ class GenreListCreateSerializer(serializers.ModelSerializer):
 # =====================================
 # Title Serializers
 # =====================================
-class TitleWriteSerializer(serializers.ModelSerializer):
+class TitleWriteSerializer(TimedModelSerializer):
     """Сериализатор для создания и редактирования Title."""
 
-    category = serializers.SlugRelatedField(
-        slug_field='slug',
+    category = DictionarySlugField(
         queryset=Category.objects.all(),
         required=True,
     )
-    genre = serializers.SlugRelatedField(
+    genre = DictionarySlugField(
         many=True,
-        slug_field='slug',
         queryset=Genre.objects.all(),
         required=True,
     )
@@ -81,6 +89,33 @@ class TitleWriteSerializer(serializers.ModelSerializer):
     def validate_genre(self, value):
         return validate_not_empty(value, 'жанров')
 
+    def create(self, validated_data):
+        genres = validated_data.pop('genre')
+        title = super().create(validated_data)
+        TitleGenre.objects.bulk_create(
+            TitleGenre(title=title, genre=genre) for genre in genres
+        )
+        return title
+
+    def update(self, instance, validated_data):
+        genres = validated_data.pop('genre', None)
+        title = super().update(instance, validated_data)
+        if genres is not None:
+            self.update_genres(title, {genre.pk for genre in genres})
+        return title
+
+    @staticmethod
+    def update_genres(title, genre_ids):
+        """Удаляет и добавляет только изменившиеся связи с жанрами."""
+        links = TitleGenre.objects.filter(title=title)
+        current = set(links.values_list('genre_id', flat=True))
+        if current - genre_ids:
+            links.filter(genre_id__in=current - genre_ids).delete()
+        TitleGenre.objects.bulk_create(
+            TitleGenre(title=title, genre_id=genre_id)
+            for genre_id in genre_ids - current
+        )
+
     def validate_year(self, value):
         return validate_year_not_exceed_current(value)
 
@@ -88,17 +123,27 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         return TitleReadSerializer(instance, context=self.context).data
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(TimedModelSerializer):
     """Сериализатор для чтения с вложенными сериализаторами и рейтингом."""
 
-    category = CategoryListCreateSerializer(read_only=True)
-    genre = GenreListCreateSerializer(many=True, read_only=True)
+    category = DictionaryField(Category, source='category_id')
+    genre = serializers.SerializerMethodField()
     rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Title
         fields = ca.TITLE_FIELDS
 
+    def get_genre(self, title):
+        # Связи с жанрами предзагружены во вьюсете, названия и slug
+        # берутся из кэша справочников
+        genres = get_dictionary(Genre)
+        return sorted(
+            (genres.represent(link.genre_id)
+             for link in title.titlegenre_set.all()),
+            key=lambda genre: genre['name'],
+        )
+
     def to_representation(self, instance):
         representation = super().to_representation(instance)
         if representation.get('description') is None:
@@ -108,6 +153,42 @@ class TitleReadSerializer(serializers.ModelSerializer):
         return representation
 
 
+class TrendingTitleSerializer(TitleReadSerializer):
+    """Произведение с текущей популярностью."""
+
+    trending = serializers.SerializerMethodField()
+
+    class Meta(TitleReadSerializer.Meta):
+        fields = ca.TITLE_FIELDS + ('trending',)
+
+    def get_trending(self, title):
+        return round(current_score(title.trending_score), 3)
+
+
+class SimilarTitleSerializer(TimedModelSerializer):
+    """Похожее произведение: краткие данные и сходство."""
+
+    id = serializers.IntegerField(source='similar_id')
+    name = serializers.CharField(source='similar.name')
+    year = serializers.IntegerField(source='similar.year')
+    category = DictionaryField(Category, source='similar.category_id')
+
+    class Meta:
+        model = SimilarTitle
+        fields = ca.SHORT_TITLE_FIELDS
+
+
+class RecommendedTitleSerializer(TimedModelSerializer):
+    """Рекомендованное произведение: краткие данные и прогноз оценки."""
+
+    category = DictionaryField(Category, source='category_id')
+    score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Title
+        fields = ca.SHORT_TITLE_FIELDS
+
+
 # ==============================
 # Базовые сериализаторы для аутентификации и регистрации
 # ==============================
@@ -150,7 +231,7 @@ class TokenSerializer(BaseAuthSerializer):
 # ==============================
 # Сериализаторы профиля
 # ==============================
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(TimedModelSerializer):
     """Сериализатор для модели пользователя."""
 
     username = USERNAME_FIELD
@@ -164,7 +245,7 @@ class ProfileSerializer(serializers.ModelSerializer):
         return utils.already_use(attrs)
 
 
-class ForAdminSerializer(serializers.ModelSerializer):
+class ForAdminSerializer(TimedModelSerializer):
     """Сериализатор модели пользователя с правами администратора."""
 
     username = USERNAME_FIELD
@@ -180,7 +261,7 @@ class ForAdminSerializer(serializers.ModelSerializer):
 # ==============================
 # Review и Comment Serializers
 # ==============================
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedModelSerializer):
     """Сериализатор для модели отзыва."""
 
     author = SlugRelatedField(read_only=True, slug_field='username')
@@ -207,7 +288,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedModelSerializer):
     """Сериализатор для модели комментария."""
 
     author = SlugRelatedField(read_only=True, slug_field='username')
@@ -216,3 +297,14 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
         read_only_fields = ca.READ_ONLY_ID_AUTHOR_PUB_DATE
+
+
+class DeletionJobSerializer(serializers.ModelSerializer):
+    """Статус фонового удаления."""
+
+    class Meta:
+        model = DeletionJob
+        fields = ('id', 'target', 'object_id', 'object_repr', 'status',
+                  'total', 'processed', 'error', 'created', 'updated',
+                  'finished')
+        read_only_fields = fields
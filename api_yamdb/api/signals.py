@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.autocomplete import title_changed
+from api.dictionaries import invalidate_dictionaries
+from api.metrics import record_query
+from reviews import constants as cr
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.trending import record_activity
+
+
+@receiver(connection_created)
+def set_sqlite_pragmas(sender, connection, **kwargs):
+    """Выполняет settings.SQLITE_PRAGMAS на новом подключении к SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    """
+    Подключает учёт SQL-запросов для Server-Timing и метрик. Список
+    execute_wrappers переживает close(), поэтому при переподключении
+    (CONN_MAX_AGE=0, close_old_connections) обёртка не добавляется снова.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Genre)
+def invalidate_dictionary_cache(sender, **kwargs):
+    """Сбрасывает кэш справочников при изменении категории или жанра."""
+    invalidate_dictionaries()
+
+
+@receiver(post_save, sender=Title)
+def update_autocomplete_on_save(sender, instance, **kwargs):
+    """Обновляет в индексе подсказок новое или изменённое произведение."""
+    title_changed(instance)
+
+
+@receiver(post_delete, sender=Title)
+def update_autocomplete_on_delete(sender, instance, **kwargs):
+    """Убирает из индекса подсказок удалённое произведение."""
+    title_changed(instance, deleted=True)
+
+
+@receiver(post_save, sender=Review)
+def record_review_activity(sender, instance, created, **kwargs):
+    """Новый отзыв повышает популярность произведения."""
+    if created:
+        record_activity(
+            instance.title_id, cr.TRENDING_REVIEW_WEIGHT, instance.pub_date
+        )
+
+
+@receiver(post_save, sender=Comment)
+def record_comment_activity(sender, instance, created, **kwargs):
+    """Новый комментарий повышает популярность произведения."""
+    if created:
+        record_activity(
+            instance.review.title_id, cr.TRENDING_COMMENT_WEIGHT,
+            instance.pub_date,
+        )
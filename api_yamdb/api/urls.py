@@ -2,6 +2,7 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from api import views as v
+from api.async_views import async_read_urls
 
 router_v1 = DefaultRouter()
 router_v1.register('categories', v.CategoryViewSet, basename='category')
@@ -18,6 +19,7 @@ router_v1.register(
     basename='comment'
 )
 router_v1.register('users', v.UsersViewSet, basename='users')
+router_v1.register('deletions', v.DeletionJobViewSet, basename='deletion')
 
 auth_url = [
     (path('signup/', v.SignUpView.as_view(),
@@ -26,7 +28,23 @@ auth_url = [
           name='token')),
 ]
 
+service_urls = [
+    path('v1/metrics/', v.MetricsView.as_view(), name='metrics'),
+    path('v1/profiles/', v.ProfileListView.as_view(), name='profiles'),
+    path('v1/profiles/<str:name>/', v.ProfileDownloadView.as_view(),
+         name='profile'),
+]
+
 urlpatterns = [
+    *service_urls,
     path('v1/auth/', include(auth_url)),
     path('v1/', include(router_v1.urls)),
 ]
+
+# Маршруты для ASGI (см. api_yamdb/urls_asgi.py): чтение каталога
+# и отзывов выполняется в пуле потоков, не занимая цикл событий
+async_urlpatterns = [
+    *service_urls,
+    path('v1/auth/', include(auth_url)),
+    path('v1/', include(async_read_urls(router_v1.urls))),
+]
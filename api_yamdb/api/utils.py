@@ -1,10 +1,17 @@
+import random
+import time
 from datetime import datetime
+from functools import wraps
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db import transaction
 from rest_framework.serializers import ValidationError
 
+from api import constants as ca
+
 User = get_user_model()
 
 
@@ -69,3 +76,42 @@ def update_instance_fields(instance, validated_data: dict):
         setattr(instance, attr, value)
     instance.save()
     return instance
+
+
+def is_lock_error(error):
+    """Проверяет, что ошибка БД вызвана блокировкой SQLite."""
+    return any(message in str(error) for message in ca.LOCK_ERROR_MESSAGES)
+
+
+def retry_on_lock(
+    attempts=ca.LOCK_RETRY_ATTEMPTS,
+    base_delay=ca.LOCK_RETRY_BASE_DELAY,
+    max_delay=ca.LOCK_RETRY_MAX_DELAY,
+    using=DEFAULT_DB_ALIAS,
+):
+    """
+    Выполняет функцию в транзакции и повторяет её при блокировке БД.
+
+    Пауза между попытками случайная от 0 до base_delay * 2**попытка
+    (но не больше max_delay), чтобы конкурирующие процессы
+    не повторяли запись одновременно. Неудачная попытка откатывается
+    целиком, поэтому повтор безопасен. Внутри внешней транзакции
+    повтор невозможен, и функция выполняется один раз.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if connections[using].in_atomic_block:
+                return func(*args, **kwargs)
+            for attempt in range(attempts):
+                try:
+                    with transaction.atomic(using=using):
+                        return func(*args, **kwargs)
+                except OperationalError as error:
+                    if not is_lock_error(error) or attempt == attempts - 1:
+                        raise
+                time.sleep(random.uniform(
+                    0, min(max_delay, base_delay * 2 ** attempt)
+                ))
+        return wrapper
+    return decorator
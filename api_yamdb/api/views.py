@@ -1,8 +1,9 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Avg
+from django.db.models import Avg, OuterRef, Subquery
+from django.http import FileResponse, Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, status, viewsets
+from rest_framework import filters, mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import (AllowAny, IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
@@ -10,21 +11,28 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
+from api import constants as ca
 from api import permissions as pms
 from api import serializers as sz
+from api.autocomplete import autocomplete
 from api.filters import TitleFilter
-from api.utils import send_activation_email
-from api.viewsets import ListCreateDestroyViewSet
-from reviews.models import Category, Genre, Review, Title
+from api.metrics import registry
+from api.profiling import list_profiles, profile_file
+from api.recommendations import recommend
+from api.utils import retry_on_lock, send_activation_email
+from api.viewsets import (AsyncDestroyMixin, ListCreateDestroyViewSet,
+                          QueryBudgetMixin)
+from reviews.models import (Category, DeletionJob, Genre, Review,
+                            SimilarTitle, Title)
 from users.authentication import generate_jwt_token
 
 User = get_user_model()
 
 
-class CategoryViewSet(ListCreateDestroyViewSet):
+class CategoryViewSet(AsyncDestroyMixin, ListCreateDestroyViewSet):
     """Вьюсет для управления категориями."""
 
-    queryset = Category.objects.order_by('name')
+    queryset = Category.objects.filter(is_hidden=False).order_by('name')
     serializer_class = sz.CategoryListCreateSerializer
     lookup_field = 'slug'
 
@@ -37,10 +45,17 @@ class GenreViewSet(ListCreateDestroyViewSet):
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(AsyncDestroyMixin, QueryBudgetMixin,
+                   viewsets.ModelViewSet):
     """Вьюсет для управления произведениями."""
 
     permission_classes = [pms.IsAdminOrReadOnly]
+    # Пользователь, count, произведения, связи с жанрами; для похожих —
+    # пользователь и списки. Категории и жанры — из кэша справочников
+    # (api.dictionaries)
+    query_budgets = dict(
+        list=4, retrieve=3, autocomplete=1, trending=3, similar=2
+    )
     filter_backends = [DjangoFilterBackend]
     filterset_class = TitleFilter
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
@@ -51,12 +66,51 @@ class TitleViewSet(viewsets.ModelViewSet):
         return sz.TitleWriteSerializer
 
     def get_queryset(self):
-        queryset = Title.objects.order_by('name').annotate(
-            rating=Avg('reviews_set__score'))
+        # Рейтинг — коррелированным подзапросом, а не JOIN с GROUP BY:
+        # так он считается только для строк страницы, а COUNT пагинации
+        # не агрегирует отзывы всех произведений
+        rating = Review.objects.filter(title=OuterRef('pk')).values(
+            'title'
+        ).annotate(rating=Avg('score')).values('rating')
+        queryset = Title.objects.filter(is_hidden=False).order_by(
+            'name'
+        ).annotate(
+            rating=Subquery(rating)
+        ).prefetch_related('titlegenre_set')
         return queryset
 
-
-class ReviewViewSet(viewsets.ModelViewSet):
+    @action(detail=False, pagination_class=None)
+    def autocomplete(self, request):
+        # Подсказки из индекса префиксов в памяти процесса: без запросов
+        # к базе, кроме перечитывания индекса
+        query = request.query_params.get('q', '')[:ca.MAX_AUTOCOMPLETE_QUERY]
+        return Response([
+            dict(id=pk, name=name) for pk, name in autocomplete(query)
+        ])
+
+    @action(detail=False, pagination_class=None)
+    def trending(self, request):
+        # Первые строки индекса по trending_score (в категории — по
+        # индексу category, trending_score); фильтры — как у списка
+        titles = self.filter_queryset(self.get_queryset()).filter(
+            trending_score__isnull=False
+        ).order_by('-trending_score')[:ca.TRENDING_COUNT]
+        return Response(sz.TrendingTitleSerializer(titles, many=True).data)
+
+    @action(detail=True, pagination_class=None)
+    def similar(self, request, pk=None):
+        # Списки рассчитывает команда build_similar_titles, здесь —
+        # один запрос к ним вместе с похожими произведениями
+        similar = SimilarTitle.objects.filter(
+            title_id=pk, title__is_hidden=False, similar__is_hidden=False
+        ).select_related('similar').order_by('-score')
+        similar = list(similar)
+        if not similar:
+            get_object_or_404(Title, pk=pk, is_hidden=False)
+        return Response(sz.SimilarTitleSerializer(similar, many=True).data)
+
+
+class ReviewViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
     """Вьюсет для управления отзывами."""
 
     serializer_class = sz.ReviewSerializer
@@ -66,19 +120,27 @@ class ReviewViewSet(viewsets.ModelViewSet):
     ]
     http_method_names = ['get', 'post', 'patch', 'delete']
     queryset = Review.objects.order_by('-pub_date')
+    # Пользователь, произведение, count, отзывы с авторами
+    query_budgets = dict(list=4, retrieve=3)
 
     def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+        return get_object_or_404(
+            Title, pk=self.kwargs.get('title_id'), is_hidden=False
+        )
 
     def get_queryset(self):
-        return self.get_title().reviews_set.order_by('-pub_date')
+        # Отзывы пользователя в очереди на удаление скрыты вместе с ним
+        return self.get_title().reviews_set.filter(
+            author__is_hidden=False
+        ).select_related('author').order_by('-pub_date')
 
+    @retry_on_lock()
     def perform_create(self, serializer):
         title = self.get_title()
         serializer.save(title=title, author=self.request.user)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
     """Вьюсет для управления комментариями."""
 
     serializer_class = sz.CommentSerializer
@@ -87,17 +149,24 @@ class CommentViewSet(viewsets.ModelViewSet):
         pms.IsAuthorOrModeratorOrAdmin,
     ]
     http_method_names = ['get', 'post', 'patch', 'delete']
+    # Пользователь, отзыв, count, комментарии с авторами
+    query_budgets = dict(list=4, retrieve=3)
 
     def get_review(self):
         return get_object_or_404(
             Review,
             pk=self.kwargs.get('review_id'),
             title__id=self.kwargs.get('title_id'),
+            title__is_hidden=False,
+            author__is_hidden=False,
         )
 
     def get_queryset(self):
-        return self.get_review().comments.order_by('-pub_date')
+        return self.get_review().comments.filter(
+            author__is_hidden=False
+        ).select_related('author').order_by('-pub_date')
 
+    @retry_on_lock()
     def perform_create(self, serializer):
         serializer.save(review=self.get_review(), author=self.request.user)
 
@@ -133,18 +202,23 @@ class TokenView(APIView):
         serializer = sz.TokenSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         username = serializer.validated_data['username']
-        user = get_object_or_404(User, username=username)
-        user.is_active = True
-        user.save()
+        user = get_object_or_404(User, username=username, is_hidden=False)
+        self.activate(user)
         token = generate_jwt_token(user)
         user.clear_code()
         return Response({'token': token}, status=status.HTTP_200_OK)
 
+    @staticmethod
+    @retry_on_lock()
+    def activate(user):
+        user.is_active = True
+        user.save()
+
 
-class UsersViewSet(ModelViewSet):
+class UsersViewSet(AsyncDestroyMixin, ModelViewSet):
     """Вьюсет для управления пользователей."""
 
-    queryset = User.objects.all().order_by('username')
+    queryset = User.objects.filter(is_hidden=False).order_by('username')
     permission_classes = [IsAuthenticated, pms.IsAdminOnly]
     serializer_class = sz.ForAdminSerializer
     lookup_field = 'username'
@@ -174,3 +248,70 @@ class UsersViewSet(ModelViewSet):
             return Response(serializer.data, status=status.HTTP_200_OK)
         serializer = self.serializer_class(request.user)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(
+        detail=False,
+        permission_classes=[IsAuthenticated],
+        url_path='me/recommendations',
+        pagination_class=None,
+    )
+    def recommendations(self, request):
+        # Векторы обучает команда train_recommendations, здесь —
+        # одно умножение матрицы произведений на вектор пользователя
+        scores = dict(recommend(request.user))
+        titles = Title.objects.filter(
+            pk__in=scores, is_hidden=False
+        ).in_bulk()
+        recommended = []
+        for pk, score in scores.items():
+            if pk in titles:
+                titles[pk].score = round(score, 2)
+                recommended.append(titles[pk])
+        return Response(
+            sz.RecommendedTitleSerializer(recommended, many=True).data
+        )
+
+
+class MetricsView(APIView):
+    """Метрики процесса в текстовом формате Prometheus для администраторов."""
+
+    permission_classes = [IsAuthenticated, pms.IsAdminOnly]
+    http_method_names = ['get']
+
+    def get(self, request):
+        return HttpResponse(
+            registry.render(), content_type=ca.PROMETHEUS_CONTENT_TYPE
+        )
+
+
+class ProfileListView(APIView):
+    """Список сохранённых профилей запросов, новые первыми."""
+
+    permission_classes = [IsAuthenticated, pms.IsAdminOnly]
+    http_method_names = ['get']
+
+    def get(self, request):
+        return Response(list_profiles())
+
+
+class ProfileDownloadView(APIView):
+    """Скачивание профиля в формате pstats (cProfile)."""
+
+    permission_classes = [IsAuthenticated, pms.IsAdminOnly]
+    http_method_names = ['get']
+
+    def get(self, request, name):
+        path = profile_file(name)
+        if path is None:
+            raise Http404
+        return FileResponse(
+            open(path, 'rb'), as_attachment=True, filename=path.name
+        )
+
+
+class DeletionJobViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """Статус фонового удаления для администраторов."""
+
+    queryset = DeletionJob.objects.all()
+    serializer_class = sz.DeletionJobSerializer
+    permission_classes = [IsAuthenticated, pms.IsAdminOnly]
@@ -1,6 +1,13 @@
-from rest_framework import filters, mixins, viewsets
+from django.conf import settings
+from django.urls import reverse
+from rest_framework import filters, mixins, status, viewsets
+from rest_framework.response import Response
 
 from api import permissions as pms
+from api.deletion import schedule_deletion
+from api.metrics import current_timings
+from api.query_inspection import check_query_budget
+from api.serializers import DeletionJobSerializer
 
 
 class ListCreateDestroyViewSet(
@@ -14,3 +21,47 @@ class ListCreateDestroyViewSet(
     permission_classes = [pms.IsAdminOrReadOnly]
     filter_backends = [filters.SearchFilter]
     search_fields = ['name']
+
+
+class QueryBudgetMixin:
+    """
+    Проверяет число SQL-запросов действия по бюджету
+    query_budgets = {действие: максимум запросов}.
+    Считаются запросы всего запроса, включая аутентификацию,
+    кроме заполнения кэша справочников.
+    """
+
+    query_budgets = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        timings = current_timings.get()
+        if timings is not None and response.status_code < 400:
+            check_query_budget(
+                self, timings.queries - timings.cache_queries
+            )
+        return response
+
+
+class AsyncDestroyMixin:
+    """
+    DELETE в фоне (см. api.deletion): объект скрывается, а зависимые
+    записи удаляет воркер. Ответ 202 с задачей и её адресом в Location.
+    Режим задаёт settings.ASYNC_DELETION или параметр ?async=true|false.
+    """
+
+    def use_async_deletion(self):
+        value = self.request.query_params.get('async')
+        if value is None:
+            return settings.ASYNC_DELETION
+        return value.lower() in ('1', 'true', 'yes')
+
+    def destroy(self, request, *args, **kwargs):
+        if not self.use_async_deletion():
+            return super().destroy(request, *args, **kwargs)
+        job = schedule_deletion(self.get_object())
+        return Response(
+            DeletionJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers=dict(Location=reverse('deletion-detail', args=[job.pk])),
+        )
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+# Маршруты с async-представлениями для чтения каталога и отзывов
+os.environ.setdefault('DJANGO_ROOT_URLCONF', 'api_yamdb.urls_asgi')
 
 application = get_asgi_application()
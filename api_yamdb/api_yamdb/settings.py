@@ -9,8 +9,14 @@ SECRET_KEY = os.getenv(
     'DJANGO_SECRET_KEY', 'p&l%385148kslhtyn^##a1)ilz@4zqj=rq&agdol^##zgl9(vs'
 )
 
+# Профиль настроек: development (по умолчанию) или production.
+# Выбирается переменной окружения DJANGO_SETTINGS_PROFILE
+SETTINGS_PROFILE = os.getenv('DJANGO_SETTINGS_PROFILE', 'development')
+PRODUCTION = SETTINGS_PROFILE == 'production'
+
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# С DEBUG = True каждый SQL-запрос сохраняется в connection.queries
+DEBUG = not PRODUCTION
 
 ALLOWED_HOSTS = ['*']
 
@@ -33,16 +39,81 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.ServerTimingMiddleware',
+    'api.middleware.ProfilerMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'api.middleware.ReplicaMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'api.middleware.BrowserMiddleware',
+]
+
+# Middleware только для админки и страниц для браузера: запросы с путями
+# из LEAN_PATH_PREFIXES их обходят (см. api.middleware.BrowserMiddleware)
+BROWSER_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+LEAN_PATH_PREFIXES = ('/api/',)
+
+# Сжатие ответов (см. api.middleware.CompressionMiddleware).
+# Кодеки в порядке предпочтения; br и zstd — если установлены
+# пакеты brotli и zstandard
+COMPRESSION_CODECS = ('br', 'zstd', 'gzip')
+# Ответы меньше этого размера, байт, не сжимаются
+COMPRESSION_MIN_SIZE = int(os.getenv('DJANGO_COMPRESSION_MIN_SIZE', 1024))
+# Сколько секунд хранить сжатые байты в кэше
+COMPRESSION_CACHE_TIMEOUT = 300
+# Отдельный кэш для сжатых ответов: крупные тела не вытесняют
+# из кэша по умолчанию справочники и журнал индексов
+COMPRESSION_CACHE_ALIAS = 'compression'
+
+# Заголовок Server-Timing с временем SQL, сериализации и рендеринга
+# (см. api.middleware.ServerTimingMiddleware). В production выключен:
+# время и число SQL-запросов подсказывают, какие запросы дорогие.
+# Гистограммы метрик собираются независимо от него
+SERVER_TIMING = os.getenv('DJANGO_SERVER_TIMING', str(DEBUG)) == 'True'
+
+# Инспекция SQL (см. api.query_inspection): поиск N+1 по отпечаткам
+# запросов и проверка query_budgets вьюсетов
+QUERY_INSPECTION = os.getenv('DJANGO_QUERY_INSPECTION', str(DEBUG)) == 'True'
+# Сколько одинаковых запросов за запрос считать N+1
+N_PLUS_ONE_THRESHOLD = 3
+# Запросы дольше этого, мс, пишутся в лог api.queries
+SLOW_QUERY_MS = float(os.getenv('DJANGO_SLOW_QUERY_MS', 100))
+# При превышении бюджета запросов: 'raise' — исключение, 'log' — лог
+QUERY_BUDGET_ACTION = 'raise' if DEBUG else 'log'
+
+# Профилирование запросов администратора по заголовку X-Profile или
+# параметру ?profile (см. api.profiling). Хранятся не больше
+# PROFILE_RETENTION_COUNT профилей и не дольше PROFILE_RETENTION_DAYS дней
+PROFILES_DIR = os.getenv('DJANGO_PROFILES_DIR', BASE_DIR / 'tmp/profiles')
+PROFILE_RETENTION_COUNT = 50
+PROFILE_RETENTION_DAYS = 7
+
+# Фоновое удаление (см. api.deletion): DELETE произведения, категории
+# или пользователя скрывает объект и возвращает 202 с задачей, а зависимые
+# записи удаляет воркер process_deletions пачками по DELETION_BATCH_SIZE.
+# Режим для отдельного запроса задаёт параметр ?async=true|false
+ASYNC_DELETION = os.getenv('DJANGO_ASYNC_DELETION', 'False') == 'True'
+DELETION_BATCH_SIZE = int(os.getenv('DJANGO_DELETION_BATCH_SIZE', 500))
+
+# Период полураспада популярности произведений (см. reviews.trending):
+# активность этой давности весит вдвое меньше новой. После изменения
+# пересчитайте популярность командой rebuild_trending
+TRENDING_HALF_LIFE_HOURS = float(
+    os.getenv('DJANGO_TRENDING_HALF_LIFE_HOURS', 24)
+)
+
+# Проверки админки ищут сессии, аутентификацию и сообщения в MIDDLEWARE,
+# а они подключены через BrowserMiddleware
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
 
-ROOT_URLCONF = 'api_yamdb.urls'
+# Под ASGI используется api_yamdb.urls_asgi (см. asgi.py)
+ROOT_URLCONF = os.getenv('DJANGO_ROOT_URLCONF', 'api_yamdb.urls')
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 TEMPLATES = [
@@ -61,18 +132,92 @@ TEMPLATES = [
     },
 ]
 
+if PRODUCTION:
+    # Шаблоны компилируются один раз на процесс
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+ASGI_APPLICATION = 'api_yamdb.asgi.application'
+
+# Размер пула потоков для async-чтения под ASGI (см. api.async_views)
+ASYNC_READ_WORKERS = int(os.getenv('DJANGO_ASYNC_READ_WORKERS', 16))
+
 
 # Database
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # django.db.backends.sqlite3 с поддержкой transaction_mode
+        'ENGINE': 'api.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Сколько секунд ждать снятия блокировки записи
+            'timeout': int(os.getenv('DJANGO_DB_TIMEOUT', 20)),
+            # Блокировка записи берётся в начале transaction.atomic
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# PRAGMA, которые выполняются на каждом новом подключении к SQLite
+# (см. api.signals.set_sqlite_pragmas).
+# WAL: чтение не блокируется записью, писатели ждут друг друга по timeout
+SQLITE_PRAGMAS = dict(journal_mode='WAL')
+
+if PRODUCTION:
+    DATABASES['default'].update(
+        # Подключение переиспользуется между запросами, секунды
+        CONN_MAX_AGE=int(os.getenv('DJANGO_CONN_MAX_AGE', 600)),
+    )
+    # В режиме WAL fsync нужен только на контрольных точках
+    SQLITE_PRAGMAS['synchronous'] = 'NORMAL'
+
+# Реплики только для чтения: DJANGO_DB_REPLICAS — пути к копиям основной
+# базы через запятую. Копии обновляются командой sync_replica
+for number, name in enumerate(
+    filter(None, os.getenv('DJANGO_DB_REPLICAS', '').split(',')), start=1
+):
+    DATABASES[f'replica{number}'] = dict(
+        DATABASES['default'],
+        NAME=name.strip(),
+        # В тестах реплика — та же база, что и основная
+        TEST=dict(MIRROR='default'),
+    )
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['api.db_router.ReplicaRouter']
+# Сколько секунд после записи клиент читает с основной базы
+REPLICA_PIN_SECONDS = int(os.getenv('DJANGO_REPLICA_PIN_SECONDS', 5))
+
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'DJANGO_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', 'yamdb'),
+        'TIMEOUT': int(os.getenv('DJANGO_CACHE_TIMEOUT', 300)),
+    },
+    'compression': {
+        'BACKEND': os.getenv(
+            'DJANGO_COMPRESSION_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv(
+            'DJANGO_COMPRESSION_CACHE_LOCATION', 'yamdb-compression'
+        ),
+        'TIMEOUT': COMPRESSION_CACHE_TIMEOUT,
+    },
+}
+
 AUTH_USER_MODEL = 'users.CustomUser'
 
 # Password validation
@@ -112,6 +257,14 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
+STATIC_ROOT = BASE_DIR / 'collected_static'
+
+if PRODUCTION:
+    # Имена файлов с хэшем содержимого: их можно кэшировать навсегда
+    STATICFILES_STORAGE = (
+        'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+    )
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -126,6 +279,12 @@ REST_FRAMEWORK = {
     ],
 }
 
+if PRODUCTION:
+    # Browsable API рендерит HTML-формы на каждый запрос
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+        'rest_framework.renderers.JSONRenderer',
+    ]
+
 
 # Email
 
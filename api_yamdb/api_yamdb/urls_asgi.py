@@ -0,0 +1,12 @@
+from django.urls import include, path
+
+from api.urls import async_urlpatterns
+from api_yamdb.urls import urlpatterns as wsgi_urlpatterns
+
+# Те же маршруты, что и в api_yamdb/urls.py, но API — с async-чтением
+urlpatterns = [
+    pattern for pattern in wsgi_urlpatterns
+    if str(pattern.pattern) != 'api/'
+] + [
+    path('api/', include(async_urlpatterns)),
+]
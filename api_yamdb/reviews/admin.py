@@ -1,12 +1,19 @@
 from django.contrib import admin
 from django.contrib.auth.models import Group
 
-from reviews.models import Category, Comment, Genre, Title, Review
+from reviews.models import (Category, Comment, DeletionJob, Genre, Review,
+                            Title)
 
 admin.site.unregister(Group)
 
 admin.site.register(Category)
 admin.site.register(Genre)
 admin.site.register(Title)
-admin.site.register(Review)
 admin.site.register(Comment)
+admin.site.register(DeletionJob)
+
+
+@admin.register(Review)
+class ReviewAdmin(admin.ModelAdmin):
+    # Review.__str__ обращается к произведению и автору
+    list_select_related = ('title', 'author')
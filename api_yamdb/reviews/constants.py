@@ -2,3 +2,7 @@ MAX_NAME_LENGTH = 256
 MAX_SLUG_LENGTH = 50
 MIN_SCORE = 1
 MAX_SCORE = 10
+
+# Вес отзыва и комментария в популярности (см. reviews.trending)
+TRENDING_REVIEW_WEIGHT = 1.0
+TRENDING_COMMENT_WEIGHT = 0.5
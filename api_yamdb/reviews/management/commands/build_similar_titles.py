@@ -0,0 +1,88 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from reviews.models import Review, SimilarTitle
+from reviews.similarity import NEIGHBOURS, RatingMatrix
+
+BATCH_SIZE = 1000
+
+
+def changed_titles(since):
+    """Произведения, получившие отзывы после since."""
+    return set(Review.objects.filter(pub_date__gte=since).values_list(
+        'title_id', flat=True
+    ).distinct())
+
+
+class Command(BaseCommand):
+    """
+    Команда для расчёта похожих произведений («оценившие это
+    произведение высоко оценили и ...»). Строит разреженную матрицу
+    оценок из отзывов и сохраняет для каждого произведения соседей
+    по скорректированному косинусу (см. reviews.similarity).
+    Примеры:
+      1) Пересчитать всё:
+         python manage.py build_similar_titles
+      2) Пересчитать списки произведений с новыми отзывами:
+         python manage.py build_similar_titles --incremental
+    """
+
+    help = 'Расчёт похожих произведений по оценкам пользователей'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help=(
+                'Пересчитать только произведения с отзывами после '
+                'прошлого расчёта. Изменённые оценки и влияние новых '
+                'отзывов на списки других произведений учитывает '
+                'полный расчёт'
+            ),
+        )
+        parser.add_argument(
+            '--neighbours',
+            type=int,
+            default=NEIGHBOURS,
+            help='Сколько похожих хранить для произведения',
+        )
+
+    def handle(self, *args, **options):
+        if options['neighbours'] < 1:
+            raise CommandError('Нужен хотя бы один похожий.')
+        started = perf_counter()
+        computed = timezone.now()
+        title_ids = None
+        if options['incremental']:
+            last = SimilarTitle.objects.aggregate(last=Max('computed'))
+            if last['last'] is not None:
+                title_ids = changed_titles(last['last'])
+                if not title_ids:
+                    self.stdout.write('Новых отзывов нет.')
+                    return
+        matrix = RatingMatrix.from_reviews()
+        rows = [
+            SimilarTitle(
+                title_id=title_id, similar_id=similar_id,
+                score=score, computed=computed,
+            )
+            for title_id, similar in matrix.neighbours(
+                title_ids, options['neighbours']
+            )
+            for similar_id, score in similar
+        ]
+        with transaction.atomic():
+            stale = SimilarTitle.objects.all()
+            if title_ids is not None:
+                stale = stale.filter(title_id__in=title_ids)
+            stale.delete()
+            SimilarTitle.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+        count = len(matrix.titles) if title_ids is None else len(title_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f'Похожие для {count} произведений: {len(rows)} записей '
+            f'за {perf_counter() - started:.2f} с'
+        ))
@@ -0,0 +1,341 @@
+import csv
+import itertools
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import reset_queries, transaction
+from django.db.models import Max
+
+from reviews import constants as cr
+from reviews.management.commands.import_csv import (
+    BATCH_SIZE, CSV_FILES, MODEL_MAP, chunked, clean_row, save_chunk
+)
+from reviews.models import Title
+
+# Колонки CSV-файлов — те же, что и в static/data,
+# чтобы результат можно было загрузить через import_csv
+CSV_COLUMNS = {
+    'user': ('id', 'username', 'email', 'role', 'bio', 'first_name',
+             'last_name'),
+    'category': ('id', 'name', 'slug'),
+    'genre': ('id', 'name', 'slug'),
+    'title': ('id', 'name', 'year', 'category'),
+    'review': ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    'comment': ('id', 'review_id', 'text', 'author', 'pub_date'),
+    'reviews_title_genre': ('id', 'title_id', 'genre_id'),
+}
+
+# Словарь, из которого собираются названия и тексты
+WORDS = (
+    'тень ветер город море ночь песня дорога свет время память огонь '
+    'сердце звезда река лес дом письмо мечта зима осень весна лето '
+    'путь небо голос остров тайна война мир любовь история человек '
+    'последний первый тихий старый новый далёкий белый чёрный золотой '
+    'забытый вечный странный одинокий большой маленький северный '
+    'the of night city star road dream light shadow river last blue'
+).split()
+
+CATEGORY_NAMES = ('Фильм', 'Книга', 'Музыка', 'Сериал', 'Игра',
+                  'Спектакль', 'Комикс', 'Подкаст')
+GENRE_NAMES = ('Драма', 'Комедия', 'Триллер', 'Фантастика', 'Детектив',
+               'Ужасы', 'Мелодрама', 'Приключения', 'Рок', 'Джаз',
+               'Классика', 'Фэнтези', 'Документальный', 'Сказка')
+
+# Оценки смещены к высоким, как в реальных каталогах
+SCORE_WEIGHTS = (1, 1, 2, 2, 4, 6, 10, 14, 12, 8)
+
+# Период, на который равномерно распределяются даты публикации
+PUB_DATE_SPAN = timedelta(days=3 * 365)
+
+
+def zipf_counts(total, size, exponent, cap):
+    """
+    Распределяет total объектов по size позициям по закону Ципфа.
+
+    Позиция с рангом r получает долю, пропорциональную 1 / r**exponent,
+    но не больше cap. Остаток от округления и от ограничения cap
+    раздаётся по порядку тем позициям, где ещё есть место.
+    """
+    weights = [1 / rank ** exponent for rank in range(1, size + 1)]
+    scale = total / sum(weights)
+    counts = [min(int(weight * scale), cap) for weight in weights]
+    rest = min(total, cap * size) - sum(counts)
+    position = 0
+    while rest > 0:
+        if counts[position] < cap:
+            counts[position] += 1
+            rest -= 1
+        position = (position + 1) % size
+    return counts
+
+
+class DatasetGenerator:
+    """
+    Детерминированный генератор синтетических данных.
+
+    Каждый метод rows_<модель> возвращает генератор строк в формате
+    CSV-файлов import_csv. Одинаковые параметры и seed дают одинаковые
+    данные; id начинаются с переданных смещений.
+    """
+
+    def __init__(self, options, id_offsets):
+        self.rng = random.Random(options['seed'])
+        self.options = options
+        self.offsets = id_offsets
+        self.now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        self.review_count = 0
+
+    def id(self, model_name, index):
+        return self.offsets[model_name] + index + 1
+
+    def words(self, count):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(count))
+
+    def text(self):
+        """Текст с длинным хвостом: обычно короткий, изредка очень длинный."""
+        count = min(int(self.rng.paretovariate(1.2) * 8), 2000)
+        return self.words(count).capitalize() + '.'
+
+    def pub_date(self):
+        offset = self.rng.random() * PUB_DATE_SPAN
+        return (self.now - offset).isoformat().replace('+00:00', 'Z')
+
+    def rows_user(self):
+        roles = ('user',) * 48 + ('moderator',) * 1 + ('admin',) * 1
+        for index in range(self.options['users']):
+            pk = self.id('user', index)
+            yield dict(
+                id=pk,
+                username=f'user{pk}',
+                email=f'user{pk}@yamdb.fake',
+                role=self.rng.choice(roles),
+                bio=self.words(self.rng.randint(0, 12)),
+                first_name='',
+                last_name='',
+            )
+
+    def rows_dictionary(self, model_name, names):
+        for index in range(self.options[f'{model_name}_count']):
+            pk = self.id(model_name, index)
+            # Названия уникальны: pk в названии не даёт им совпасть
+            # с уже загруженными, когда id сдвинуты get_id_offsets
+            yield dict(
+                id=pk,
+                name=f'{names[index % len(names)]} {pk}',
+                slug=f'{model_name}-{pk}',
+            )
+
+    def rows_category(self):
+        return self.rows_dictionary('category', CATEGORY_NAMES)
+
+    def rows_genre(self):
+        return self.rows_dictionary('genre', GENRE_NAMES)
+
+    def rows_title(self):
+        categories = self.options['category_count']
+        current_year = self.now.year
+        for index in range(self.options['titles']):
+            # Большинство произведений новые, старых — длинный хвост
+            year = max(current_year - int(self.rng.expovariate(1 / 15)),
+                       1900)
+            yield dict(
+                id=self.id('title', index),
+                name=self.words(self.rng.randint(1, 4)).capitalize()[
+                    :cr.MAX_NAME_LENGTH
+                ],
+                year=year,
+                category=self.id('category', self.rng.randrange(categories)),
+            )
+
+    def rows_reviews_title_genre(self):
+        genres = self.options['genre_count']
+        max_genres = min(self.options['genres_per_title'], genres)
+        links = itertools.count(1)
+        for index in range(self.options['titles']):
+            count = self.rng.randint(1, max_genres)
+            for genre in sorted(self.rng.sample(range(genres), count)):
+                yield dict(
+                    id=next(links),
+                    title_id=self.id('title', index),
+                    genre_id=self.id('genre', genre),
+                )
+
+    def rows_review(self):
+        """
+        Отзывы с распределением по Ципфу: немногие произведения
+        собирают большую часть отзывов, у хвоста — единицы или ноль.
+        """
+        users = self.options['users']
+        titles = list(range(self.options['titles']))
+        self.rng.shuffle(titles)
+        counts = zipf_counts(
+            self.options['reviews'], len(titles), self.options['zipf'], users
+        )
+        index = 0
+        for title, count in zip(titles, counts):
+            # Один пользователь — один отзыв на произведение
+            for author in self.rng.sample(range(users), count):
+                yield dict(
+                    id=self.id('review', index),
+                    title_id=self.id('title', title),
+                    text=self.text(),
+                    author=self.id('user', author),
+                    score=self.rng.choices(
+                        range(cr.MIN_SCORE, cr.MAX_SCORE + 1),
+                        weights=SCORE_WEIGHTS,
+                    )[0],
+                    pub_date=self.pub_date(),
+                )
+                index += 1
+        self.review_count = index
+
+    def rows_comment(self):
+        """Комментарии, тоже сосредоточенные на немногих отзывах."""
+        if not self.review_count:
+            return
+        reviews = list(range(self.review_count))
+        self.rng.shuffle(reviews)
+        cum_weights = list(itertools.accumulate(
+            1 / rank ** self.options['zipf']
+            for rank in range(1, len(reviews) + 1)
+        ))
+        users = self.options['users']
+        total = self.options['comments']
+        for start in range(0, total, BATCH_SIZE):
+            picked = self.rng.choices(
+                reviews, cum_weights=cum_weights,
+                k=min(BATCH_SIZE, total - start),
+            )
+            for offset, review in enumerate(picked):
+                yield dict(
+                    id=self.id('comment', start + offset),
+                    review_id=self.id('review', review),
+                    text=self.text(),
+                    author=self.id('user', self.rng.randrange(users)),
+                    pub_date=self.pub_date(),
+                )
+
+
+class Command(BaseCommand):
+    """
+    Команда для генерации синтетических данных для нагрузочных тестов.
+    Примеры:
+      1) Записать данные сразу в базу через bulk_create:
+         python manage.py generate_dataset --titles 10000 --reviews 200000
+      2) Сохранить CSV-файлы, совместимые с import_csv:
+         python manage.py generate_dataset --output /tmp/dataset
+         python manage.py import_csv all --base_dir /tmp/dataset
+    """
+
+    help = 'Генерация синтетических данных для нагрузочного тестирования'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000,
+                            help='Число пользователей')
+        parser.add_argument('--categories', type=int, default=8,
+                            dest='category_count', help='Число категорий')
+        parser.add_argument('--genres', type=int, default=30,
+                            dest='genre_count', help='Число жанров')
+        parser.add_argument('--titles', type=int, default=5000,
+                            help='Число произведений')
+        parser.add_argument('--genres_per_title', type=int, default=3,
+                            help='Максимум жанров у произведения')
+        parser.add_argument('--reviews', type=int, default=50000,
+                            help='Число отзывов')
+        parser.add_argument('--comments', type=int, default=100000,
+                            help='Число комментариев')
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.1,
+            help='Показатель распределения Ципфа для отзывов и комментариев',
+        )
+        parser.add_argument('--seed', type=int, default=42,
+                            help='Seed генератора случайных чисел')
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Папка для CSV-файлов. Без неё данные пишутся в базу',
+        )
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            default=BATCH_SIZE,
+            help=f'Размер пачки для записи в базу. По умолчанию: {BATCH_SIZE}',
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['category_count'] < 1 or (
+            options['genre_count'] < 1
+        ):
+            raise CommandError(
+                'Нужен хотя бы один пользователь, категория и жанр.'
+            )
+        output = options['output']
+        generator = DatasetGenerator(
+            options, self.get_id_offsets(to_database=output is None)
+        )
+        if output is not None:
+            os.makedirs(output, exist_ok=True)
+
+        for model_name in CSV_COLUMNS:
+            rows = getattr(generator, f'rows_{model_name}')()
+            if output is None:
+                written = self.write_database(
+                    model_name, rows, options['batch_size']
+                )
+            else:
+                written = self.write_csv(
+                    model_name, rows,
+                    os.path.join(output, CSV_FILES[model_name]),
+                )
+            self.stdout.write(f'  {model_name}: {written}')
+        self.stdout.write(self.style.SUCCESS('Данные сгенерированы!'))
+
+    @staticmethod
+    def get_id_offsets(to_database):
+        """
+        Смещения id: при записи в базу новые записи идут после
+        существующих, для CSV нумерация начинается с 1.
+        """
+        offsets = dict.fromkeys(CSV_COLUMNS, 0)
+        if to_database:
+            for model_name, model_class in MODEL_MAP.items():
+                offsets[model_name] = model_class.objects.aggregate(
+                    max_id=Max('id')
+                )['max_id'] or 0
+        return offsets
+
+    @staticmethod
+    def write_csv(model_name, rows, file_path):
+        written = 0
+        with open(file_path, 'w', encoding='utf-8', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, CSV_COLUMNS[model_name])
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                written += 1
+        return written
+
+    @staticmethod
+    def write_database(model_name, rows, batch_size):
+        written = 0
+        if model_name == 'reviews_title_genre':
+            through = Title.genre.through
+            for chunk in chunked(rows, batch_size):
+                through.objects.bulk_create([
+                    through(title_id=row['title_id'], genre_id=row['genre_id'])
+                    for row in chunk
+                ])
+                written += len(chunk)
+            return written
+        model_class = MODEL_MAP[model_name]
+        cleaned = (clean_row(model_class, row) for row in rows)
+        for chunk in chunked(cleaned, batch_size):
+            with transaction.atomic():
+                save_chunk(chunk, model_class)
+            written += len(chunk)
+            reset_queries()
+        return written
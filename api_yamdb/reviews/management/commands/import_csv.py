@@ -1,9 +1,20 @@
 import csv
+import itertools
+import json
 import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
 
+import django
 from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.core.management.base import BaseCommand, CommandError
+from django.db import (connection, connections, reset_queries,
+                       transaction)
 
+from api.dictionaries import invalidate_dictionaries
 from reviews.models import Category, Comment, Genre, Review, Title
 
 CustomUser = get_user_model()
@@ -11,6 +22,16 @@ CustomUser = get_user_model()
 # Константа указывающая, где по умолчанию лежат все CSV-файлы
 DEFAULT_BASE_DIR = 'static/data'
 
+# Размер пачки для bulk_create
+BATCH_SIZE = 1000
+
+# Сколько пачек на процесс пула (--jobs) разбирается одновременно:
+# в памяти не больше jobs x PARSE_AHEAD x batch_size строк
+PARSE_AHEAD = 2
+
+# Суффикс файла контрольной точки для продолжения импорта (--resume)
+CHECKPOINT_SUFFIX = '.checkpoint'
+
 # Словарь для автоматического определения,
 # какие файлы относятся к каким моделям
 # Ключ: имя, передаваемое в "python manage.py import_csv <model>"
@@ -39,7 +60,7 @@ MODEL_MAP = {
 }
 
 # Словарь, в котором описаны поля (FK) и соответствующие модели
-# чтобы автоматически превращать ID в объекты
+# чтобы автоматически проверять существование ID
 FK_FIELDS = {
     Comment: {'author': CustomUser, 'review': Review},
     Title: {'category': Category},
@@ -47,49 +68,436 @@ FK_FIELDS = {
     # Category, Genre, CustomUser - без внешних ключей к другим моделям
 }
 
+# Режимы повторного импорта (--mode):
+# fail — любая существующая запись вызывает ошибку (как раньше),
+# skip — существующие записи не трогаем, создаём только новые,
+# upsert — создаём новые и обновляем только изменившиеся записи
+IMPORT_MODES = ('fail', 'skip', 'upsert')
+
+# Настройки SQLite на время быстрой загрузки (--fast): журнал в памяти,
+# без fsync, большой страничный кэш и временные данные в памяти.
+# После загрузки восстанавливаются прежние значения.
+FAST_LOAD_PRAGMAS = {
+    'journal_mode': 'MEMORY',
+    'synchronous': 'OFF',
+    'cache_size': -262144,  # в КиБ, то есть 256 МиБ
+    'temp_store': 'MEMORY',
+}
+
+# Уникальные поля, по которым ищется существующая запись,
+# если в CSV нет колонки id
+NATURAL_KEYS = {
+    CustomUser: 'username',
+    Category: 'slug',
+    Genre: 'slug',
+}
+
+
+@contextmanager
+def sqlite_bulk_load(drop_indexes=False):
+    """
+    Быстрая загрузка в SQLite одной транзакцией.
+
+    На время загрузки включаются FAST_LOAD_PRAGMAS, а с drop_indexes=True
+    неуникальные индексы импортируемых таблиц удаляются и создаются
+    заново после загрузки, после чего выполняется ANALYZE. Для других
+    СУБД менеджер просто открывает общую транзакцию.
+    """
+    if connection.vendor != 'sqlite':
+        with transaction.atomic():
+            yield
+        return
+
+    # PRAGMA journal_mode и synchronous нельзя менять внутри транзакции
+    with connection.cursor() as cursor:
+        saved = {}
+        for name, value in FAST_LOAD_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name}')
+            saved[name] = cursor.fetchone()[0]
+            cursor.execute(f'PRAGMA {name} = {value}')
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            indexes = drop_secondary_indexes(cursor) if drop_indexes else []
+            yield
+            for sql in indexes:
+                cursor.execute(sql)
+        if indexes:
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+    finally:
+        with connection.cursor() as cursor:
+            for name, value in saved.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def drop_secondary_indexes(cursor):
+    """
+    Удаляет неуникальные индексы импортируемых таблиц.
+
+    Возвращает SQL для их пересоздания. Индексы ограничений
+    (первичные ключи, UNIQUE) остаются, чтобы проверки целостности
+    продолжали работать во время загрузки.
+    """
+    tables = [model._meta.db_table for model in MODEL_MAP.values()]
+    tables.append(Title.genre.through._meta.db_table)
+    cursor.execute(
+        'SELECT name, sql FROM sqlite_master WHERE type = %s '
+        'AND sql IS NOT NULL AND sql NOT LIKE %s AND tbl_name IN '
+        f'({", ".join(["%s"] * len(tables))})',
+        ['index', 'CREATE UNIQUE%', *tables],
+    )
+    indexes = cursor.fetchall()
+    for name, _ in indexes:
+        cursor.execute(f'DROP INDEX "{name}"')
+    return [sql for _, sql in indexes]
+
+
+def build_dependency_graph():
+    """
+    Строит граф зависимостей импорта по FK_FIELDS.
+
+    Ключ — имя из CSV_FILES, значение — множество имён,
+    которые должны быть импортированы раньше.
+    """
+    names = {model: name for name, model in MODEL_MAP.items()}
+    graph = {name: set() for name in CSV_FILES}
+    for model, fk_map in FK_FIELDS.items():
+        graph[names[model]].update(names[fk] for fk in fk_map.values())
+    # Связи Title <-> Genre можно загружать только после обеих моделей
+    graph['reviews_title_genre'].update((names[Title], names[Genre]))
+    return graph
+
+
+def dependency_order(graph):
+    """
+    Топологическая сортировка графа зависимостей.
+
+    Модели без взаимных зависимостей идут в порядке CSV_FILES.
+    """
+    order = []
+    while len(order) < len(graph):
+        ready = [
+            name for name, depends_on in graph.items()
+            if name not in order and depends_on <= set(order)
+        ]
+        if not ready:
+            raise CommandError('Циклическая зависимость между моделями.')
+        order.extend(ready)
+    return order
+
+
+def read_rows(file_path, skip=0):
+    """Построчно читает CSV-файл, пропуская первые skip строк."""
+    with open(file_path, encoding='utf-8', newline='') as csvfile:
+        yield from itertools.islice(csv.DictReader(csvfile), skip, None)
+
+
+def chunked(iterable, size):
+    """Разбивает итерируемый объект на списки длиной не более size."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_checkpoint(file_path):
+    """Возвращает состояние импорта файла из контрольной точки."""
+    try:
+        with open(f'{file_path}{CHECKPOINT_SUFFIX}', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return dict(rows=0, complete=False)
+
+
+def write_checkpoint(file_path, rows, complete=False):
+    """Атомарно сохраняет число уже импортированных строк файла."""
+    checkpoint = f'{file_path}{CHECKPOINT_SUFFIX}'
+    with open(f'{checkpoint}.tmp', 'w', encoding='utf-8') as f:
+        json.dump(dict(rows=rows, complete=complete), f)
+    os.replace(f'{checkpoint}.tmp', checkpoint)
+
+
+def remove_checkpoint(file_path):
+    """Удаляет контрольную точку после успешного импорта."""
+    try:
+        os.remove(f'{file_path}{CHECKPOINT_SUFFIX}')
+    except FileNotFoundError:
+        pass
+
+
+def clean_row(model_class, row):
+    """
+    Приводит значения строки CSV к типам полей модели.
+
+    Колонка внешнего ключа может называться как "author", так и
+    "review_id": в обоих случаях значение попадает в <поле>_id.
+    """
+    cleaned = {}
+    for column, value in row.items():
+        try:
+            field = model_class._meta.get_field(column)
+        except FieldDoesNotExist:
+            raise CommandError(
+                f'У модели {model_class.__name__} нет поля "{column}".'
+            )
+        if value == '' and field.null:
+            value = None
+        if value is not None:
+            value = field.to_python(value)
+        cleaned[field.attname] = value
+    return cleaned
+
+
+def parse_rows(file_path, model_class, skip=0):
+    """Генератор строк CSV, приведённых к типам полей модели."""
+    return clean_rows(read_rows(file_path, skip=skip), model_class, skip + 1)
+
+
+def clean_rows(rows, model_class, first_number=1):
+    """
+    Генератор строк, приведённых к типам полей модели; first_number —
+    номер первой строки в файле для текста ошибки.
+    """
+    for number, row in enumerate(rows, start=first_number):
+        try:
+            yield clean_row(model_class, row)
+        except ValidationError as e:
+            raise CommandError(
+                f'Строка {number}: {"; ".join(e.messages)}'
+            )
+
+
+def check_foreign_keys(rows, model_class):
+    """
+    Проверяет внешние ключи пачки строк.
+
+    Существование ID проверяется одним запросом на поле для всей пачки;
+    в модель ключи передаются как <поле>_id, без загрузки объектов.
+    """
+    for field_name, fk_model in FK_FIELDS.get(model_class, {}).items():
+        attname = f'{field_name}_id'
+        fk_ids = {row[attname] for row in rows} - {None}
+        existing = set(
+            fk_model.objects.filter(id__in=fk_ids).values_list(
+                'id', flat=True
+            )
+        )
+        missing = fk_ids - existing
+        if missing:
+            raise CommandError(
+                f'{fk_model.__name__} с id='
+                f'{", ".join(map(str, sorted(missing)))} не найден.'
+            )
+
+
+def get_import_key(model_class, row):
+    """Поле, по которому строка CSV сопоставляется с записью в базе."""
+    if 'id' in row:
+        return 'id'
+    if model_class in NATURAL_KEYS:
+        return NATURAL_KEYS[model_class]
+    raise CommandError(
+        f'Для повторного импорта {model_class.__name__} нужна колонка id.'
+    )
+
+
+def get_compared_fields(model_class, row, key):
+    """
+    Поля строки, которые сравниваются с базой и обновляются.
 
-def import_csv(file_path, model_class):
-    """Импорт CSV для модели."""
-    fk_map = FK_FIELDS.get(model_class, {})
-    instances = []
-
-    with open(file_path, encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            # Преобразуем внешние ключи (ID -> объекты)
-            for field_name, fk_model in fk_map.items():
-                fk_id = row.pop(field_name, None)
-                if fk_id not in (None, ''):
-                    try:
-                        row[field_name] = fk_model.objects.get(id=fk_id)
-                    except fk_model.DoesNotExist:
-                        raise CommandError(
-                            f'{fk_model.__name__} с id={fk_id} не найден.'
-                        )
-            instances.append(model_class(**row))
-    model_class.objects.bulk_create(instances)
-
-
-def import_title_genre_links(file_path):
-    """Импорт ManyToMany-связей для Title <-> Genre."""
-    with open(file_path, encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            title_id = row.get('title_id')
-            genre_id = row.get('genre_id')
-            if not title_id or not genre_id:
-                continue
-            try:
-                title = Title.objects.get(id=title_id)
-            except Title.DoesNotExist:
-                raise CommandError(f'Произведение с id={title_id} не найдено.')
-
-            try:
-                genre = Genre.objects.get(id=genre_id)
-            except Genre.DoesNotExist:
-                raise CommandError(f'Жанр с id={genre_id} не найден.')
-
-            title.genre.add(genre)
+    Даты с auto_now/auto_now_add Django заполняет сам,
+    поэтому они не участвуют в сравнении.
+    """
+    fields = []
+    for attname in row:
+        field = model_class._meta.get_field(attname)
+        if attname == key or field.primary_key:
+            continue
+        if getattr(field, 'auto_now', False) or getattr(
+            field, 'auto_now_add', False
+        ):
+            continue
+        fields.append(field.name)
+    return fields
+
+
+def save_chunk(rows, model_class, mode='fail'):
+    """
+    Записывает пачку строк в базу в выбранном режиме.
+
+    В режимах skip и upsert существующие записи загружаются одним
+    запросом по ключу, новые создаются через bulk_create, а в upsert
+    изменившиеся обновляются через bulk_update. Возвращает число
+    созданных, обновлённых и неизменённых записей.
+    """
+    check_foreign_keys(rows, model_class)
+    if model_class in (Category, Genre):
+        # bulk_create и bulk_update не посылают сигналов,
+        # сбрасывающих кэш справочников
+        invalidate_dictionaries()
+    if mode == 'fail':
+        model_class.objects.bulk_create(
+            [model_class(**row) for row in rows]
+        )
+        return len(rows), 0, 0
+
+    key = get_import_key(model_class, rows[0])
+    fields = get_compared_fields(model_class, rows[0], key)
+    attnames = [model_class._meta.get_field(name).attname for name in fields]
+    existing = {
+        values[key]: values
+        for values in model_class.objects.filter(
+            **{f'{key}__in': [row[key] for row in rows]}
+        ).values('pk', key, *attnames)
+    }
+    to_create, to_update = [], []
+    for row in rows:
+        current = existing.get(row[key])
+        if current is None:
+            to_create.append(model_class(**row))
+        elif mode == 'upsert' and any(
+            row[attname] != current[attname] for attname in attnames
+        ):
+            to_update.append(model_class(**row, pk=current['pk']))
+    model_class.objects.bulk_create(to_create)
+    if to_update:
+        model_class.objects.bulk_update(to_update, fields)
+    unchanged = len(rows) - len(to_create) - len(to_update)
+    return len(to_create), len(to_update), unchanged
+
+
+def import_csv(file_path, model_class, chunk_size=BATCH_SIZE, resume=False,
+               rows=None, mode='fail', checkpoint=True):
+    """
+    Потоковый импорт CSV для модели.
+
+    Строки читаются генератором и записываются пачками по chunk_size,
+    каждая пачка — в собственной транзакции, поэтому потребление памяти
+    не зависит от размера файла. После каждой пачки обновляется
+    контрольная точка, и с resume=True импорт продолжается с первой
+    незаписанной строки. Уже разобранные строки можно передать в rows,
+    тогда файл повторно не читается. Режим mode описан в IMPORT_MODES.
+    С checkpoint=False контрольные точки не пишутся: это нужно, когда
+    весь импорт идёт в одной внешней транзакции и может откатиться целиком.
+    Возвращает сводку: всего строк, создано, обновлено, без изменений.
+    """
+    state = read_checkpoint(file_path) if resume else dict(
+        rows=0, complete=False
+    )
+    summary = dict(rows=state['rows'], created=0, updated=0, unchanged=0)
+    if state['complete']:
+        return summary
+    if rows is None:
+        rows = parse_rows(file_path, model_class, skip=summary['rows'])
+    else:
+        rows = itertools.islice(rows, summary['rows'], None)
+    for chunk in chunked(rows, chunk_size):
+        with transaction.atomic():
+            created, updated, unchanged = save_chunk(chunk, model_class, mode)
+        summary['rows'] += len(chunk)
+        summary['created'] += created
+        summary['updated'] += updated
+        summary['unchanged'] += unchanged
+        if checkpoint:
+            write_checkpoint(file_path, summary['rows'])
+        # При DEBUG=True Django копит тексты всех запросов в памяти
+        reset_queries()
+    if checkpoint:
+        write_checkpoint(file_path, summary['rows'], complete=True)
+    return summary
+
+
+def parse_chunk(model_name, rows, first_number):
+    """Приводит пачку строк CSV к типам полей в процессе пула (--jobs)."""
+    return list(clean_rows(rows, MODEL_MAP[model_name], first_number))
+
+
+def parse_in_pool(pool, model_name, file_path, chunk_size, ahead):
+    """
+    Генератор строк файла, разобранных в пуле процессов.
+
+    Файл читается в этом процессе пачками по chunk_size, и в пул
+    одновременно отдано не больше ahead пачек, поэтому потребление
+    памяти не зависит от размера файла.
+    """
+    pending = deque()
+    first_number = 1
+    for chunk in chunked(read_rows(file_path), chunk_size):
+        pending.append(
+            pool.submit(parse_chunk, model_name, chunk, first_number)
+        )
+        first_number += len(chunk)
+        if len(pending) >= ahead:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+
+def check_link(row, title_ids, genre_ids):
+    """
+    Проверяет строку genre_title.csv по множествам существующих ID.
+
+    Возвращает пару (title_id, genre_id) и текст ошибки; если нет
+    ни пары, ни ошибки, строка не заполнена и пропускается.
+    """
+    title_id = row.get('title_id')
+    genre_id = row.get('genre_id')
+    if not title_id or not genre_id:
+        return None, None
+    try:
+        title_id, genre_id = int(title_id), int(genre_id)
+    except ValueError:
+        return None, f'Некорректная пара id: {title_id}, {genre_id}.'
+    if title_id not in title_ids:
+        return None, f'Произведение с id={title_id} не найдено.'
+    if genre_id not in genre_ids:
+        return None, f'Жанр с id={genre_id} не найден.'
+    return (title_id, genre_id), None
+
+
+def import_title_genre_links(file_path, batch_size=BATCH_SIZE, rows=None):
+    """
+    Импорт ManyToMany-связей для Title <-> Genre.
+
+    ID проверяются по заранее загруженным множествам, а строки
+    промежуточной таблицы вставляются пачками через bulk_create.
+    Уже прочитанные строки файла можно передать в rows.
+    Возвращает сводку: созданные, пропущенные, дублирующиеся
+    и некорректные строки, а также тексты ошибок валидации.
+    """
+    through = Title.genre.through
+    title_ids = set(Title.objects.values_list('id', flat=True))
+    genre_ids = set(Genre.objects.values_list('id', flat=True))
+    summary = dict(created=0, skipped=0, duplicates=0, invalid=0, errors=[])
+    seen = set()
+
+    def valid_links(rows):
+        for row in rows:
+            link, error = check_link(row, title_ids, genre_ids)
+            if error:
+                summary['invalid'] += 1
+                summary['errors'].append(error)
+            elif link is None:
+                summary['skipped'] += 1
+            elif link in seen:
+                summary['duplicates'] += 1
+            else:
+                seen.add(link)
+                yield through(title_id=link[0], genre_id=link[1])
+
+    links_before = through.objects.count()
+    if rows is None:
+        rows = read_rows(file_path)
+    for batch in chunked(valid_links(rows), batch_size):
+        through.objects.bulk_create(batch, ignore_conflicts=True)
+    summary['created'] = through.objects.count() - links_before
+    # Связи, которые уже были в базе, тоже считаем дубликатами
+    summary['duplicates'] += len(seen) - summary['created']
+    return summary
 
 
 class Command(BaseCommand):
@@ -104,6 +512,14 @@ class Command(BaseCommand):
          python manage.py import_csv comment /path/to/comments.csv
       4) Переопределить базовую папку, если нужно
          добавьте parser.add_argument --base_dir.
+      5) Продолжить прерванный импорт с последней записанной пачки:
+         python manage.py import_csv all --resume
+      6) Разбирать файлы в 4 процессах, записывая их в порядке зависимостей:
+         python manage.py import_csv all --jobs 4
+      7) Повторно загрузить каталог, обновив только изменившиеся записи:
+         python manage.py import_csv all --mode upsert
+      8) Быстрая загрузка в SQLite одной транзакцией без fsync:
+         python manage.py import_csv all --fast --drop_indexes
     """
 
     help = 'Импорт данных из CSV в базу данных'
@@ -126,11 +542,64 @@ class Command(BaseCommand):
             default=DEFAULT_BASE_DIR,
             help=f'Папка, где лежат файлы. По умолчанию: {DEFAULT_BASE_DIR}',
         )
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            default=BATCH_SIZE,
+            help=f'Размер пачки для записи в базу. По умолчанию: {BATCH_SIZE}',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Продолжить импорт с контрольной точки после сбоя',
+        )
+        parser.add_argument(
+            '--mode',
+            choices=IMPORT_MODES,
+            default='fail',
+            help=(
+                'Что делать с записями, которые уже есть в базе: '
+                'fail — ошибка, skip — пропустить, upsert — обновить '
+                'изменившиеся. По умолчанию: fail'
+            ),
+        )
+        parser.add_argument(
+            '--fast',
+            action='store_true',
+            help=(
+                'Загрузить всё одной транзакцией с ускоряющими PRAGMA '
+                'SQLite (журнал в памяти, без fsync)'
+            ),
+        )
+        parser.add_argument(
+            '--drop_indexes',
+            action='store_true',
+            help=(
+                'Вместе с --fast: удалить неуникальные индексы на время '
+                'загрузки и пересоздать их после, с ANALYZE'
+            ),
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help=(
+                'Число процессов для разбора CSV при импорте "all". '
+                'Файлы отдаются в пул пачками по --batch_size, запись '
+                'в базу всё равно идёт последовательно.'
+            ),
+        )
 
     def handle(self, *args, **options):
         model_name = options['model'].lower()
         file_path = options.get('file_path')
         base_dir = options['base_dir']
+        self.batch_size = options['batch_size']
+        self.resume = options['resume']
+        self.jobs = options['jobs']
+        self.mode = options['mode']
+        self.fast = options['fast']
+        self.drop_indexes = options['drop_indexes']
 
         # Если "all", то идём по списку CSV_FILES
         if model_name == 'all':
@@ -152,13 +621,9 @@ class Command(BaseCommand):
             file_path = os.path.join(base_dir, filename)
 
         try:
-            if model_name == 'reviews_title_genre':
-                # Специальная обработка ManyToMany
-                import_title_genre_links(file_path)
-            else:
-                model_class = MODEL_MAP[model_name]
-                import_csv(file_path, model_class)
-
+            with self.bulk_load():
+                self.import_model(model_name, file_path)
+            remove_checkpoint(file_path)
             self.stdout.write(
                 self.style.SUCCESS(
                     'Успешно импортированы данные ' f'для "{model_name}".'
@@ -170,29 +635,106 @@ class Command(BaseCommand):
             )
 
     def import_all(self, base_dir):
-        """Импортировать все модели по очереди."""
-        # Список в каком порядке стоит импортировать (если нужно).
-        import_order = [
-            'user',
-            'category',
-            'genre',
-            'title',
-            'review',
-            'comment',
-            'reviews_title_genre',
-        ]
+        """
+        Импортировать все модели в порядке их зависимостей.
 
-        for model_name in import_order:
-            filename = CSV_FILES[model_name]
-            full_path = os.path.join(base_dir, filename)
+        С --jobs N пачки строк каждого файла разбираются и проверяются
+        параллельно в пуле процессов, а запись в базу идёт в этом
+        процессе строго в порядке зависимостей, пока пул разбирает
+        следующие пачки.
+        """
+        import_order = dependency_order(build_dependency_graph())
+        paths = {
+            model_name: os.path.join(base_dir, CSV_FILES[model_name])
+            for model_name in import_order
+        }
+        started = time.perf_counter()
+        pool = None
+        if self.jobs > 1:
+            # Дочерние процессы не должны наследовать открытые соединения,
+            # поэтому пул создаётся до начала транзакции --fast
+            connections.close_all()
+            pool = ProcessPoolExecutor(
+                max_workers=self.jobs, initializer=django.setup
+            )
+        try:
+            with self.bulk_load():
+                for model_name in import_order:
+                    self.import_stage(model_name, paths[model_name], pool)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
 
-            self.stdout.write(f'Импорт {model_name} из {full_path}...')
-            if model_name == 'reviews_title_genre':
-                import_title_genre_links(full_path)
-            else:
-                model_class = MODEL_MAP[model_name]
-                import_csv(full_path, model_class)
+        # Контрольные точки удаляем только после импорта всех моделей,
+        # чтобы --resume не загружал повторно уже импортированные файлы
+        for path in paths.values():
+            remove_checkpoint(path)
+        self.stdout.write(self.style.SUCCESS(
+            'Все модели импортированы '
+            f'за {time.perf_counter() - started:.2f} с!'
+        ))
+
+    def import_stage(self, model_name, file_path, pool=None):
+        """Импортировать одну модель в import_all и вывести время этапа."""
+        self.stdout.write(f'Импорт {model_name} из {file_path}...')
+        stage_started = time.perf_counter()
+        rows = None
+        # Связи проверяются по множествам id, разбирать в пуле их незачем
+        if pool is not None and model_name in MODEL_MAP:
+            rows = parse_in_pool(
+                pool, model_name, file_path, self.batch_size,
+                self.jobs * PARSE_AHEAD,
+            )
+        self.import_model(model_name, file_path, rows)
+        self.stdout.write(self.style.SUCCESS(
+            f'  => OK: {model_name} '
+            f'({time.perf_counter() - stage_started:.2f} с)'
+        ))
+
+    def bulk_load(self):
+        """Контекст быстрой загрузки для --fast или пустой контекст."""
+        if not self.fast:
+            return nullcontext()
+        if connection.vendor != 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                'PRAGMA для --fast применяются только к SQLite, '
+                'импорт просто пройдёт одной транзакцией.'
+            ))
+        return sqlite_bulk_load(drop_indexes=self.drop_indexes)
 
-            self.stdout.write(self.style.SUCCESS(f'  => OK: {model_name}'))
+    def import_model(self, model_name, file_path, rows=None):
+        """Импортировать одну модель или связи Title <-> Genre."""
+        if model_name == 'reviews_title_genre':
+            # Специальная обработка ManyToMany: повторный импорт связей
+            # безопасен, поэтому контрольная точка для них не нужна
+            self.import_links(file_path, rows)
+            return
+        summary = import_csv(
+            file_path,
+            MODEL_MAP[model_name],
+            chunk_size=self.batch_size,
+            resume=self.resume,
+            rows=rows,
+            mode=self.mode,
+            # В режиме --fast всё откатывается одной транзакцией,
+            # поэтому контрольные точки там были бы неверными
+            checkpoint=not self.fast,
+        )
+        self.stdout.write(
+            f'  Строк обработано: {summary["rows"]}, '
+            f'создано: {summary["created"]}, '
+            f'обновлено: {summary["updated"]}, '
+            f'без изменений: {summary["unchanged"]}'
+        )
 
-        self.stdout.write(self.style.SUCCESS('Все модели импортированы!'))
+    def import_links(self, file_path, rows=None):
+        """Импортировать связи Title <-> Genre и вывести сводку."""
+        summary = import_title_genre_links(file_path, self.batch_size, rows)
+        for error in summary['errors']:
+            self.stdout.write(self.style.WARNING(f'  {error}'))
+        self.stdout.write(
+            f'  Связей создано: {summary["created"]}, '
+            f'пропущено: {summary["skipped"]}, '
+            f'дубликатов: {summary["duplicates"]}, '
+            f'некорректных: {summary["invalid"]}'
+        )
@@ -0,0 +1,27 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from reviews.trending import rebuild
+
+
+class Command(BaseCommand):
+    """
+    Команда для пересчёта популярности произведений по всем отзывам
+    и комментариям (см. reviews.trending). Обычно популярность
+    обновляется при каждом новом отзыве или комментарии; пересчёт
+    нужен после import_csv и generate_dataset (они пишут в обход
+    сигналов) и после смены TRENDING_HALF_LIFE_HOURS.
+    Пример:
+      python manage.py rebuild_trending
+    """
+
+    help = 'Пересчёт популярности произведений'
+
+    def handle(self, *args, **options):
+        started = perf_counter()
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Популярность {count} произведений пересчитана '
+            f'за {perf_counter() - started:.2f} с'
+        ))
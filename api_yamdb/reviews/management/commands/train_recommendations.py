@@ -0,0 +1,91 @@
+import tracemalloc
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.recommendations import invalidate_recommendations
+from reviews.factorization import ALS, FACTORS, ITERATIONS, REGULARIZATION
+from reviews.models import TitleEmbedding, UserEmbedding
+from reviews.similarity import load_scores
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    """
+    Команда для обучения рекомендаций «для вас». Раскладывает матрицу
+    оценок из отзывов на векторы пользователей и произведений (ALS, см.
+    reviews.factorization) и сохраняет их как float32.
+    Обучение занимает одно ядро: поэлементные операции NumPy (einsum,
+    reduceat) не распараллеливаются, а BLAS в ALS не участвует.
+    Примеры:
+      1) Обучить с параметрами по умолчанию:
+         python manage.py train_recommendations
+      2) Больше факторов и итераций, RMSE по итерациям:
+         python manage.py train_recommendations --factors 64 \\
+             --iterations 20 -v 2
+    """
+
+    help = (
+        'Обучение векторов пользователей и произведений для рекомендаций. '
+        'Обучение идёт на одном ядре процессора.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--factors', type=int, default=FACTORS,
+                            help='Размерность векторов')
+        parser.add_argument('--iterations', type=int, default=ITERATIONS,
+                            help='Число итераций ALS')
+        parser.add_argument('--regularization', type=float,
+                            default=REGULARIZATION,
+                            help='Коэффициент регуляризации')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed начальных векторов')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('Нужна хотя бы одна итерация.')
+        started = perf_counter()
+        title_ids, user_ids, scores = load_scores()
+        if not len(scores):
+            raise CommandError('Нет отзывов с оценками.')
+        loaded = perf_counter()
+        # tracemalloc видит и буферы массивов NumPy
+        tracemalloc.start()
+        model = ALS(
+            factors=options['factors'],
+            iterations=options['iterations'],
+            regularization=options['regularization'],
+            seed=options['seed'],
+        ).fit(title_ids, user_ids, scores)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        trained = perf_counter()
+        if options['verbosity'] > 1:
+            for number, rmse in enumerate(model.history, 1):
+                self.stdout.write(f'  итерация {number}: RMSE {rmse:.4f}')
+        self.save(model)
+        self.stdout.write(self.style.SUCCESS(
+            f'Оценок: {len(scores)}, пользователей: {len(model.users)}, '
+            f'произведений: {len(model.titles)}.\n'
+            f'Чтение: {loaded - started:.2f} с, '
+            f'обучение: {trained - loaded:.2f} с '
+            f'(пик памяти {peak / 2 ** 20:.1f} МиБ), '
+            f'сохранение: {perf_counter() - trained:.2f} с. '
+            f'RMSE: {model.history[-1]:.4f}'
+        ))
+
+    def save(self, model):
+        with transaction.atomic():
+            TitleEmbedding.objects.all().delete()
+            UserEmbedding.objects.all().delete()
+            TitleEmbedding.objects.bulk_create((
+                TitleEmbedding(title_id=int(pk), vector=vector.tobytes())
+                for pk, vector in zip(model.titles, model.title_vectors)
+            ), batch_size=BATCH_SIZE)
+            UserEmbedding.objects.bulk_create((
+                UserEmbedding(user_id=int(pk), vector=vector.tobytes())
+                for pk, vector in zip(model.users, model.user_vectors)
+            ), batch_size=BATCH_SIZE)
+            invalidate_recommendations()
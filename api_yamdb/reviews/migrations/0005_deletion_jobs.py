@@ -0,0 +1,42 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target', models.CharField(choices=[('title', 'Произведение'), ('category', 'Категория'), ('user', 'Пользователь')], max_length=16, verbose_name='объект')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='id объекта')),
+                ('object_repr', models.CharField(max_length=256, verbose_name='объект')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('done', 'Завершено'), ('failed', 'Ошибка')], db_index=True, default='pending', max_length=16, verbose_name='статус')),
+                ('total', models.PositiveIntegerField(default=0, help_text='Оценка при постановке в очередь', verbose_name='зависимых записей')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='обработано записей')),
+                ('error', models.TextField(blank=True, verbose_name='ошибка')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='создано')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='обновлено')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='завершено')),
+            ],
+            options={
+                'verbose_name': 'Фоновое удаление',
+                'verbose_name_plural': 'Фоновые удаления',
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='is_hidden',
+            field=models.BooleanField(db_index=True, default=False, help_text='Скрыта до фонового удаления (см. api.deletion)', verbose_name='скрыта'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='is_hidden',
+            field=models.BooleanField(db_index=True, default=False, help_text='Скрыто до фонового удаления (см. api.deletion)', verbose_name='скрыто'),
+        ),
+    ]
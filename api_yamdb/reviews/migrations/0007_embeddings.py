@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reviews', '0006_similar_titles'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleEmbedding',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='embedding', serialize=False, to='reviews.title', verbose_name='произведение')),
+                ('vector', models.BinaryField(verbose_name='вектор')),
+            ],
+            options={
+                'verbose_name': 'Вектор произведения',
+                'verbose_name_plural': 'Векторы произведений',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserEmbedding',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='embedding', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='пользователь')),
+                ('vector', models.BinaryField(verbose_name='вектор')),
+            ],
+            options={
+                'verbose_name': 'Вектор пользователя',
+                'verbose_name_plural': 'Векторы пользователей',
+            },
+        ),
+    ]
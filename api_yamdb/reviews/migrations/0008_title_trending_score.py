@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_embeddings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='trending_score',
+            field=models.FloatField(blank=True, help_text='log2 затухающей активности (см. reviews.trending)', null=True, verbose_name='популярность'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-trending_score'], name='title_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-trending_score'], name='title_category_trending_idx'),
+        ),
+    ]
@@ -54,6 +54,13 @@ class RCBase(models.Model):
 class Category(BaseCategoryGenre):
     """Модель для категорий произведений."""
 
+    is_hidden = models.BooleanField(
+        'скрыта',
+        default=False,
+        db_index=True,
+        help_text='Скрыта до фонового удаления (см. api.deletion)',
+    )
+
     class Meta(BaseCategoryGenre.Meta):
         verbose_name = 'Категория'
         verbose_name_plural = 'Категории'
@@ -94,18 +101,63 @@ class Title(models.Model):
         verbose_name='Категория',
     )
     genre = models.ManyToManyField(
-        Genre, related_name='titles', verbose_name='Жанры'
+        Genre,
+        through='TitleGenre',
+        related_name='titles',
+        verbose_name='Жанры',
+    )
+    is_hidden = models.BooleanField(
+        'скрыто',
+        default=False,
+        db_index=True,
+        help_text='Скрыто до фонового удаления (см. api.deletion)',
+    )
+    trending_score = models.FloatField(
+        'популярность',
+        null=True,
+        blank=True,
+        help_text='log2 затухающей активности (см. reviews.trending)',
     )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ['name']
+        # Популярные — первые строки индекса, в том числе в категории
+        indexes = [
+            models.Index(fields=['-trending_score'],
+                         name='title_trending_idx'),
+            models.Index(fields=['category', '-trending_score'],
+                         name='title_category_trending_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class TitleGenre(models.Model):
+    """
+    Связь произведения с жанром.
+
+    Явная модель для таблицы, которую раньше создавал ManyToManyField:
+    к ней нужен индекс (genre, title) для фильтра по жанру.
+    """
+
+    title = models.ForeignKey(Title, on_delete=models.CASCADE)
+    genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
+
+    class Meta:
+        db_table = 'reviews_title_genre'
+        unique_together = [['title', 'genre']]
+        indexes = [
+            models.Index(fields=['genre', 'title'],
+                         name='title_genre_genre_title_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.title_id} — {self.genre_id}'
+
+
 class Review(RCBase):
     """Модель для отзывов."""
 
@@ -135,6 +187,14 @@ class Review(RCBase):
                 name='unique_review',
             )
         ]
+        # Вложенные списки фильтруют по произведению или автору
+        # и сортируют по дате
+        indexes = [
+            models.Index(fields=['title', '-pub_date'],
+                         name='review_title_pub_date_idx'),
+            models.Index(fields=['author', '-pub_date'],
+                         name='review_author_pub_date_idx'),
+        ]
 
     def __str__(self):
         return f'Отзыв для {self.title.name} от {self.author.username}'
@@ -153,3 +213,139 @@ class Comment(RCBase):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(fields=['review', '-pub_date'],
+                         name='comment_review_pub_date_idx'),
+            models.Index(fields=['author', '-pub_date'],
+                         name='comment_author_pub_date_idx'),
+        ]
+
+
+class SimilarTitle(models.Model):
+    """
+    Похожее произведение, предрассчитанное командой build_similar_titles
+    по оценкам пользователей (см. reviews.similarity).
+    """
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='similar_set',
+        verbose_name='произведение',
+    )
+    similar = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='похожее произведение',
+    )
+    score = models.FloatField('сходство')
+    computed = models.DateTimeField(
+        'рассчитано',
+        help_text='Начало расчёта, по которому построен список',
+    )
+
+    class Meta:
+        verbose_name = 'Похожее произведение'
+        verbose_name_plural = 'Похожие произведения'
+        unique_together = [['title', 'similar']]
+        # Список похожих читается одним запросом по индексу
+        indexes = [
+            models.Index(fields=['title', '-score'],
+                         name='similar_title_score_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.title_id} ~ {self.similar_id}: {self.score:.3f}'
+
+
+class TitleEmbedding(models.Model):
+    """
+    Вектор произведения для рекомендаций (команда train_recommendations).
+
+    float32 [факторы..., средняя оценка + смещение произведения, 1]:
+    скалярное произведение с вектором пользователя — прогноз оценки.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='embedding',
+        verbose_name='произведение',
+    )
+    vector = models.BinaryField('вектор')
+
+    class Meta:
+        verbose_name = 'Вектор произведения'
+        verbose_name_plural = 'Векторы произведений'
+
+
+class UserEmbedding(models.Model):
+    """
+    Вектор пользователя для рекомендаций.
+
+    float32 [факторы..., 1, смещение пользователя].
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='embedding',
+        verbose_name='пользователь',
+    )
+    vector = models.BinaryField('вектор')
+
+    class Meta:
+        verbose_name = 'Вектор пользователя'
+        verbose_name_plural = 'Векторы пользователей'
+
+
+class DeletionJob(models.Model):
+    """
+    Фоновое удаление объекта с зависимыми записями (см. api.deletion).
+
+    Объект скрывается сразу, а воркер process_deletions удаляет
+    зависимые записи пачками и сохраняет прогресс.
+    """
+
+    class Target(models.TextChoices):
+        TITLE = 'title', 'Произведение'
+        CATEGORY = 'category', 'Категория'
+        USER = 'user', 'Пользователь'
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Завершено'
+        FAILED = 'failed', 'Ошибка'
+
+    target = models.CharField('объект', max_length=16, choices=Target.choices)
+    object_id = models.PositiveBigIntegerField('id объекта')
+    object_repr = models.CharField('объект', max_length=256)
+    status = models.CharField(
+        'статус',
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        db_index=True,
+    )
+    total = models.PositiveIntegerField(
+        'зависимых записей',
+        default=0,
+        help_text='Оценка при постановке в очередь',
+    )
+    processed = models.PositiveIntegerField('обработано записей', default=0)
+    error = models.TextField('ошибка', blank=True)
+    created = models.DateTimeField('создано', auto_now_add=True)
+    updated = models.DateTimeField('обновлено', auto_now=True)
+    finished = models.DateTimeField('завершено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Фоновое удаление'
+        verbose_name_plural = 'Фоновые удаления'
+        ordering = ['-created']
+
+    def __str__(self):
+        return f'{self.get_target_display()} {self.object_repr}'
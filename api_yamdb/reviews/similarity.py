@@ -0,0 +1,151 @@
+"""
+Похожие произведения: item-to-item по скорректированному косинусу.
+
+Матрица «пользователь x произведение» из оценок хранится разреженно
+(CSR по произведениям и по пользователям на массивах NumPy), из оценок
+вычитается средняя оценка пользователя. Сходство считается блоками
+строк: для блока произведений плотна только матрица блок x все
+произведения, поэтому память не зависит от квадрата их числа.
+"""
+import itertools
+
+import numpy as np
+
+from reviews.models import Review
+
+# Сколько соседей хранить для произведения
+NEIGHBOURS = 20
+# Минимум пользователей, оценивших оба произведения: сходство
+# по одной общей оценке случайно
+MIN_COMMON_USERS = 2
+# Строк матрицы сходства в блоке: блок x произведения float32
+BLOCK_SIZE = 256
+# Строк отзывов за одно чтение из базы
+LOAD_CHUNK_SIZE = 10000
+
+
+def load_scores():
+    """
+    Оценки из отзывов: массивы id произведений, id авторов и оценок.
+    Строки читаются потоком, без списка кортежей в памяти.
+    """
+    rows = Review.objects.filter(score__isnull=False).values_list(
+        'title_id', 'author_id', 'score'
+    ).iterator(chunk_size=LOAD_CHUNK_SIZE)
+    scores = np.fromiter(
+        itertools.chain.from_iterable(rows), dtype=np.int64
+    ).reshape(-1, 3)
+    return scores[:, 0], scores[:, 1], scores[:, 2]
+
+
+class RatingMatrix:
+    """
+    Разреженная матрица скорректированных оценок.
+
+    Произведения и пользователи перенумерованы подряд: titles[i] —
+    id произведения строки i. Для каждой строки (и для каждого
+    пользователя) записи лежат подряд: indptr — начала отрезков.
+    """
+
+    def __init__(self, title_ids, user_ids, scores):
+        self.titles, title_index = np.unique(title_ids, return_inverse=True)
+        users, user_index = np.unique(user_ids, return_inverse=True)
+        scores = scores.astype(np.float32)
+        # Скорректированный косинус: отклонение от средней оценки
+        # пользователя, а не сама оценка
+        user_means = (
+            np.bincount(user_index, weights=scores)
+            / np.bincount(user_index)
+        ).astype(np.float32)
+        values = scores - user_means[user_index]
+
+        by_title = np.argsort(title_index, kind='stable')
+        self.title_users = user_index[by_title]
+        self.title_values = values[by_title]
+        self.title_indptr = self.indptr(title_index, len(self.titles))
+
+        by_user = np.argsort(user_index, kind='stable')
+        self.user_titles = title_index[by_user]
+        self.user_values = values[by_user]
+        self.user_indptr = self.indptr(user_index, len(users))
+
+        self.norms = np.sqrt(np.bincount(
+            title_index, weights=values.astype(np.float64) ** 2,
+            minlength=len(self.titles),
+        )).astype(np.float32)
+
+    @classmethod
+    def from_reviews(cls):
+        return cls(*load_scores())
+
+    @staticmethod
+    def indptr(index, size):
+        indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(index, minlength=size), out=indptr[1:])
+        return indptr
+
+    @staticmethod
+    def expand(indptr, rows):
+        """Позиции всех записей строк rows (с повторами) одним массивом."""
+        starts = indptr[rows]
+        lengths = indptr[rows + 1] - starts
+        offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        positions = np.arange(lengths.sum()) - offsets
+        return np.repeat(starts, lengths) + positions, lengths
+
+    def similarity_block(self, rows):
+        """
+        Сходство произведений rows со всеми: (len(rows), titles) и число
+        общих пользователей той же формы.
+
+        Произведение разреженных матриц без SciPy: каждая оценка (u, i)
+        блока умножается на все оценки (u, j) пользователя u, суммы
+        по (i, j) собираются bincount.
+        """
+        count = len(self.titles)
+        entries, lengths = self.expand(self.title_indptr, rows)
+        block_rows = np.repeat(np.arange(len(rows)), lengths)
+        users = self.title_users[entries]
+        values = self.title_values[entries]
+
+        pairs, user_lengths = self.expand(self.user_indptr, users)
+        cells = (
+            np.repeat(block_rows, user_lengths) * count
+            + self.user_titles[pairs]
+        )
+        size = len(rows) * count
+        dot = np.bincount(
+            cells,
+            weights=np.repeat(values, user_lengths) * self.user_values[pairs],
+            minlength=size,
+        ).reshape(len(rows), count)
+        common = np.bincount(cells, minlength=size).reshape(len(rows), count)
+        norms = np.outer(self.norms[rows], self.norms)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            similarity = np.where(norms > 0, dot / norms, 0).astype(np.float32)
+        return similarity, common
+
+    def neighbours(self, title_ids=None, count=NEIGHBOURS):
+        """
+        Генератор (id произведения, [(id похожего, сходство), ...])
+        для title_ids (по умолчанию — для всех). Похожие отсортированы
+        по убыванию сходства; в список попадают только сходные (> 0).
+        """
+        rows = np.arange(len(self.titles))
+        if title_ids is not None:
+            rows = rows[np.isin(self.titles, list(title_ids))]
+        for start in range(0, len(rows), BLOCK_SIZE):
+            block = rows[start:start + BLOCK_SIZE]
+            similarity, common = self.similarity_block(block)
+            similarity[common < MIN_COMMON_USERS] = 0
+            similarity[np.arange(len(block)), block] = 0
+            top = min(count, similarity.shape[1])
+            best = np.argpartition(-similarity, top - 1, axis=1)[:, :top]
+            for index, (row, columns) in enumerate(zip(block, best)):
+                scores = similarity[index, columns]
+                order = np.argsort(-scores, kind='stable')
+                yield int(self.titles[row]), [
+                    (int(self.titles[column]), float(score))
+                    for column, score in zip(columns[order], scores[order])
+                    if score > 0
+                ]
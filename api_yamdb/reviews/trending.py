@@ -0,0 +1,91 @@
+"""
+Популярность произведений: активность с экспоненциальным затуханием.
+
+Каждый отзыв или комментарий весом w, написанный в момент t, к моменту
+T весит w * 2 ** (-(T - t) / H), где H — период полураспада. В
+Title.trending_score хранится log2 суммы w * 2 ** (t / H) с отсчётом t
+от EPOCH. Текущая популярность — 2 ** (trending_score - T / H): множитель
+2 ** (-T / H) общий для всех произведений, поэтому порядок по
+trending_score в любой момент — порядок по текущей популярности, и
+список строится по индексу без пересчёта. Новая активность добавляется
+одним UPDATE без чтения строки и без переполнения: в степень
+возводится только разность с текущим моментом.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Coalesce, Log, Power
+from django.utils import timezone
+
+from reviews import constants as cr
+from reviews.models import Comment, Review, Title
+
+EPOCH = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+# Показатель степени для произведения без активности: 2 ** -1000 — ноль
+NO_ACTIVITY = -1000.0
+BATCH_SIZE = 1000
+
+
+def half_lives(when):
+    """Время от EPOCH в периодах полураспада."""
+    return (when - EPOCH).total_seconds() / (
+        settings.TRENDING_HALF_LIFE_HOURS * 3600
+    )
+
+
+def current_score(trending_score, now=None):
+    """Текущая популярность по сохранённому значению."""
+    if trending_score is None:
+        return 0.0
+    return 2 ** (trending_score - half_lives(now or timezone.now()))
+
+
+def record_activity(title_id, weight, when=None):
+    """Добавляет активность произведению за O(1): один UPDATE."""
+    now = half_lives(when or timezone.now())
+    current = Coalesce(
+        F('trending_score') - now, Value(NO_ACTIVITY),
+        output_field=FloatField(),
+    )
+    Title.objects.filter(pk=title_id).update(
+        trending_score=Value(now) + Log(
+            Value(2.0), Power(Value(2.0), current) + Value(weight)
+        )
+    )
+
+
+def rebuild():
+    """
+    Пересчитывает популярность всех произведений по отзывам и
+    комментариям: после импорта в обход сигналов или смены
+    TRENDING_HALF_LIFE_HOURS. Возвращает число произведений
+    с активностью.
+    """
+    title_ids, keys = [], []
+    sources = (
+        (Review.objects.values_list('title_id', 'pub_date'),
+         cr.TRENDING_REVIEW_WEIGHT),
+        (Comment.objects.values_list('review__title_id', 'pub_date'),
+         cr.TRENDING_COMMENT_WEIGHT),
+    )
+    for rows, weight in sources:
+        for title_id, pub_date in rows.iterator():
+            title_ids.append(title_id)
+            keys.append(half_lives(pub_date) + np.log2(weight))
+    titles, index = np.unique(
+        np.array(title_ids, dtype=np.int64), return_inverse=True
+    )
+    scores = np.full(len(titles), -np.inf)
+    # log2(2 ** a + 2 ** b) без переполнения
+    np.logaddexp2.at(scores, index, np.array(keys))
+    with transaction.atomic():
+        Title.objects.update(trending_score=None)
+        Title.objects.bulk_update(
+            [Title(pk=int(pk), trending_score=float(score))
+             for pk, score in zip(titles, scores)],
+            ['trending_score'], batch_size=BATCH_SIZE,
+        )
+    return len(titles)
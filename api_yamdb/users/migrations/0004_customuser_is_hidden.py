@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_alter_customuser_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='is_hidden',
+            field=models.BooleanField(db_index=True, default=False, help_text='Скрыт до фонового удаления (см. api.deletion)', verbose_name='скрыт'),
+        ),
+    ]
@@ -78,6 +78,12 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     confirmation_code = models.CharField(max_length=36, blank=True, null=True)
     validity_code = models.DateTimeField(blank=True, null=True)
     is_active = models.BooleanField(default=False)
+    is_hidden = models.BooleanField(
+        'скрыт',
+        default=False,
+        db_index=True,
+        help_text='Скрыт до фонового удаления (см. api.deletion)',
+    )
     is_superuser = models.BooleanField(default=False)
     is_staff = models.BooleanField(default=False)
     date_joined = models.DateTimeField(auto_now_add=True)
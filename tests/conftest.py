@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +34,16 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Тесты с маркером benchmark сравнивают время и зависят от загрузки
+    машины, поэтому по умолчанию пропускаются: BENCHMARK_TIMING=1.
+    """
+    if os.getenv('BENCHMARK_TIMING'):
+        return
+    skip = pytest.mark.skip(reason='замер по времени: BENCHMARK_TIMING=1')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,216 @@
+import itertools
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+
+from reviews.management.commands.import_csv import (
+    build_dependency_graph, dependency_order, import_csv,
+    import_title_genre_links, parse_in_pool, read_checkpoint
+)
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.mark.django_db
+class Test08ImportCSV:
+
+    @staticmethod
+    def write_csv(tmp_path, name, content):
+        path = tmp_path / name
+        path.write_text(content, encoding='utf-8')
+        return str(path)
+
+    @pytest.fixture
+    def catalog(self):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        genres = [
+            Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+            for i in range(2)
+        ]
+        title = Title.objects.create(name='Фильм', year=2000,
+                                     category=category)
+        return title, genres
+
+    def test_01_title_genre_links_summary(self, tmp_path, catalog):
+        title, genres = catalog
+        title.genre.add(genres[0])
+        file_path = self.write_csv(
+            tmp_path,
+            'genre_title.csv',
+            'id,title_id,genre_id\n'
+            f'1,{title.id},{genres[0].id}\n'
+            f'2,{title.id},{genres[1].id}\n'
+            f'3,{title.id},{genres[1].id}\n'
+            f'4,{title.id + 100},{genres[0].id}\n'
+            f'5,{title.id},\n'
+        )
+
+        summary = import_title_genre_links(file_path, batch_size=1)
+
+        assert set(title.genre.all()) == set(genres), (
+            'Проверьте, что импорт связей Title <-> Genre создаёт '
+            'недостающие связи.'
+        )
+        assert summary['created'] == 1
+        assert summary['duplicates'] == 2, (
+            'Проверьте, что повторяющиеся строки и уже существующие связи '
+            'учитываются как дубликаты.'
+        )
+        assert summary['skipped'] == 1
+        assert summary['invalid'] == 1
+        assert summary['errors'] == [
+            f'Произведение с id={title.id + 100} не найдено.'
+        ]
+
+    def test_02_import_resumes_from_checkpoint(self, tmp_path):
+        file_path = self.write_csv(
+            tmp_path,
+            'category.csv',
+            'id,name,slug\n'
+            '1,Фильм,movie\n'
+            '2,Книга,book\n'
+            '3,Музыка,music\n'
+            '4,Фильм,movie\n'
+        )
+
+        with pytest.raises(Exception):
+            import_csv(file_path, Category, chunk_size=2)
+        assert Category.objects.count() == 2, (
+            'Проверьте, что каждая пачка строк сохраняется в собственной '
+            'транзакции и ошибка не откатывает уже записанные пачки.'
+        )
+        assert read_checkpoint(file_path) == dict(rows=2, complete=False)
+
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(
+                'id,name,slug\n1,Фильм,movie\n2,Книга,book\n'
+                '3,Музыка,music\n4,Игры,games\n'
+            )
+        summary = import_csv(file_path, Category, chunk_size=2, resume=True)
+        assert summary['rows'] == 4
+        assert Category.objects.count() == 4, (
+            'Проверьте, что с resume=True импорт продолжается '
+            'с первой незаписанной строки.'
+        )
+
+    def test_03_import_checks_foreign_keys(self, tmp_path, catalog):
+        file_path = self.write_csv(
+            tmp_path,
+            'titles.csv',
+            'id,name,year,category\n'
+            '10,Книга,1990,\n'
+            '11,Фильм,1990,999\n'
+        )
+
+        with pytest.raises(CommandError, match='Category с id=999'):
+            import_csv(file_path, Title)
+
+    def test_04_upsert_updates_only_changed_rows(self, tmp_path):
+        Category.objects.create(name='Фильм', slug='movie')
+        Category.objects.create(name='Книга', slug='book')
+        file_path = self.write_csv(
+            tmp_path,
+            'category.csv',
+            'name,slug\nФильм,movie\nКниги,book\nМузыка,music\n'
+        )
+
+        summary = import_csv(file_path, Category, mode='upsert')
+
+        assert (summary['created'], summary['updated'],
+                summary['unchanged']) == (1, 1, 1), (
+            'Проверьте, что в режиме upsert создаются только новые записи, '
+            'а обновляются только изменившиеся.'
+        )
+        assert Category.objects.get(slug='book').name == 'Книги'
+
+        summary = import_csv(file_path, Category, mode='skip')
+        assert summary['unchanged'] == 3
+        with pytest.raises(Exception):
+            import_csv(file_path, Category, mode='fail')
+
+    def test_05_dependency_order(self):
+        order = dependency_order(build_dependency_graph())
+        for model, depends_on in (
+            ('title', ('category',)),
+            ('review', ('user', 'title')),
+            ('comment', ('user', 'review')),
+            ('reviews_title_genre', ('title', 'genre')),
+        ):
+            for dependency in depends_on:
+                assert order.index(dependency) < order.index(model), (
+                    f'Проверьте, что `{model}` импортируется '
+                    f'после `{dependency}`.'
+                )
+        with pytest.raises(CommandError):
+            dependency_order({'a': {'b'}, 'b': {'a'}})
+
+    def test_06_import_all_in_process_pool(self, tmp_path):
+        base_dir = tmp_path / 'data'
+        shutil.copytree(settings.BASE_DIR / 'static/data', base_dir)
+
+        call_command('import_csv', 'all', '--jobs', '2',
+                     '--base_dir', str(base_dir), stdout=StringIO())
+
+        assert Title.objects.count() == 32
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        assert Title.genre.through.objects.count() == 42
+        assert not list(base_dir.glob('*.checkpoint')), (
+            'Проверьте, что после успешного импорта контрольные точки '
+            'удаляются.'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_fast_load_restores_sqlite_settings(self, tmp_path):
+        base_dir = tmp_path / 'data'
+        shutil.copytree(settings.BASE_DIR / 'static/data', base_dir)
+
+        def sqlite_state():
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA synchronous')
+                synchronous = cursor.fetchone()[0]
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'"
+                )
+                return synchronous, sorted(cursor.fetchall())
+
+        state_before = sqlite_state()
+        call_command('import_csv', 'all', '--fast', '--drop_indexes',
+                     '--base_dir', str(base_dir), stdout=StringIO())
+
+        assert Review.objects.count() == 72
+        assert sqlite_state() == state_before, (
+            'Проверьте, что после импорта с --fast восстанавливаются '
+            'PRAGMA SQLite и пересоздаются удалённые индексы.'
+        )
+        assert not list(base_dir.glob('*.checkpoint'))
+
+    def test_08_pool_parses_file_in_chunks(self, tmp_path):
+        file_path = self.write_csv(
+            tmp_path, 'category.csv', 'id,name,slug\n' + ''.join(
+                f'{i},Категория {i},category-{i}\n' for i in range(1, 11)
+            ) + 'x,Ошибка,error\n'
+        )
+        submitted = []
+
+        class Pool(ThreadPoolExecutor):
+            def submit(self, fn, model_name, rows, first_number):
+                submitted.append(len(rows))
+                return super().submit(fn, model_name, rows, first_number)
+
+        with Pool(1) as pool:
+            rows = parse_in_pool(pool, 'category', file_path, 3, 2)
+            for consumed, row in enumerate(itertools.islice(rows, 9), 1):
+                assert sum(submitted) - consumed < 3 * 2, (
+                    'Проверьте, что с --jobs файл отдаётся в пул пачками, '
+                    'а не читается целиком.'
+                )
+            assert row['slug'] == 'category-9'
+            with pytest.raises(CommandError, match='Строка 11'):
+                list(rows)
+        assert submitted == [3, 3, 3, 2]
@@ -0,0 +1,60 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+DATASET_OPTIONS = (
+    '--users', '20', '--categories', '3', '--genres', '5',
+    '--titles', '50', '--reviews', '300', '--comments', '200',
+)
+
+
+@pytest.mark.django_db
+class Test09GenerateDataset:
+
+    def test_01_dataset_in_database(self):
+        call_command('generate_dataset', *DATASET_OPTIONS, stdout=StringIO())
+
+        assert Title.objects.count() == 50
+        assert Review.objects.count() == 300
+        assert Comment.objects.count() == 200
+        counts = list(
+            Title.objects.annotate(count=Count('reviews_set'))
+            .order_by('-count').values_list('count', flat=True)
+        )
+        assert counts[0] >= 5 * counts[len(counts) // 2], (
+            'Проверьте, что число отзывов на произведение распределено '
+            'неравномерно (по закону Ципфа).'
+        )
+
+    def test_02_dataset_into_filled_database(self):
+        call_command('generate_dataset', *DATASET_OPTIONS, stdout=StringIO())
+        call_command('generate_dataset', *DATASET_OPTIONS, stdout=StringIO())
+        assert Category.objects.count() == 6, (
+            'Проверьте, что набор данных добавляется в базу, '
+            'где уже есть категории и жанры с теми же названиями.'
+        )
+        assert Genre.objects.count() == 10
+        assert Title.objects.count() == 100
+        assert Review.objects.count() == 600
+
+    def test_03_csv_output_is_deterministic(self, tmp_path):
+        for name in ('first', 'second'):
+            call_command('generate_dataset', *DATASET_OPTIONS,
+                         '--output', str(tmp_path / name), stdout=StringIO())
+        for path in (tmp_path / 'first').iterdir():
+            assert path.read_bytes() == (
+                tmp_path / 'second' / path.name
+            ).read_bytes(), (
+                'Проверьте, что при одинаковом seed генерируются '
+                'одинаковые данные.'
+            )
+
+        call_command('import_csv', 'all', '--base_dir',
+                     str(tmp_path / 'first'), stdout=StringIO())
+        assert Review.objects.count() == 300, (
+            'Проверьте, что CSV-файлы совместимы с командой import_csv.'
+        )
@@ -0,0 +1,262 @@
+import gc
+import json
+import os
+import tracemalloc
+from collections import namedtuple
+from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
+from time import perf_counter
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+
+from api import autocomplete
+from reviews.models import Category, DeletionJob, Genre, Review, Title
+
+# Бюджеты эндпоинтов: число запросов к БД, p95 задержки и пик памяти.
+# Перезаписать по текущим замерам:
+# BENCHMARK_TIMING=1 BENCHMARK_UPDATE=1 pytest tests/test_10*
+BASELINE_PATH = Path(__file__).with_name('benchmark_baseline.json')
+ITERATIONS = int(os.getenv('BENCHMARK_ITERATIONS', 20))
+# Задержка и память зависят от машины, поэтому сравниваются с запасом
+# (для быстрых эндпоинтов ещё и с абсолютным, на паузы GC и планировщика)
+# и только при BENCHMARK_TIMING=1; число запросов детерминировано
+# и сравнивается строго всегда
+LATENCY_TOLERANCE = float(os.getenv('BENCHMARK_LATENCY_TOLERANCE', 3))
+LATENCY_SLACK_MS = float(os.getenv('BENCHMARK_LATENCY_SLACK_MS', 25))
+MEMORY_SAMPLES = 3
+MEMORY_TOLERANCE = float(os.getenv('BENCHMARK_MEMORY_TOLERANCE', 1.5))
+REPORT_PATH = os.getenv('BENCHMARK_REPORT')
+
+DATASET_OPTIONS = (
+    '--users', '50', '--categories', '5', '--genres', '12',
+    '--titles', '300', '--reviews', '3000', '--comments', '3000',
+)
+
+# build() вызывается перед каждым запросом вне замера времени
+# и возвращает URL и тело запроса
+Endpoint = namedtuple('Endpoint', 'name method build expected_status')
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[round(fraction * (len(ordered) - 1))]
+
+
+def measure(client, endpoint, timing=True):
+    """
+    Замеряет запросы к БД, а с timing=True — ещё пик памяти
+    и задержку эндпоинта.
+    """
+    def send():
+        url, data = endpoint.build()
+        request = getattr(client, endpoint.method)
+        started = perf_counter()
+        response = request(url, data=data, format='json')
+        elapsed = (perf_counter() - started) * 1000
+        assert response.status_code == endpoint.expected_status, (
+            f'Эндпоинт `{url}` вернул {response.status_code} вместо '
+            f'{endpoint.expected_status}.'
+        )
+        return elapsed
+
+    send()  # прогрев: кэши шаблонов, сериализаторов и т.п.
+    with CaptureQueriesContext(connection) as context:
+        send()
+    # Каждый запрос клиента очищает connection.queries, поэтому
+    # число запросов фиксируем сразу
+    queries = len(context)
+    if not timing:
+        return dict(queries=queries)
+    # Пик памяти одного запроса шумит (GC, ленивые кэши), берём минимум
+    peaks = []
+    for _ in range(MEMORY_SAMPLES):
+        gc.collect()
+        tracemalloc.start()
+        send()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    timings = [send() for _ in range(ITERATIONS)]
+    return dict(
+        queries=queries,
+        p50_ms=round(percentile(timings, 0.5), 2),
+        p95_ms=round(percentile(timings, 0.95), 2),
+        memory_kb=round(min(peaks) / 1024, 1),
+    )
+
+
+def build_endpoints(admin):
+    title = Title.objects.annotate(
+        count=Count('reviews_set')
+    ).order_by('-count').first()
+    review = Review.objects.filter(title=title).annotate(
+        count=Count('comments')
+    ).order_by('-count').first()
+    comment = review.comments.first()
+    genre = Genre.objects.first()
+    category = Category.objects.first()
+    username = Review.objects.filter(title=title).first().author.username
+    signups = iter(range(10 ** 6))
+    # Задача без воркера и без скрытия объекта: замеряется только
+    # чтение статуса, а данные остальных эндпоинтов не меняются
+    job = DeletionJob.objects.create(
+        target=DeletionJob.Target.TITLE, object_id=title.id,
+        object_repr=str(title), total=title.count,
+    )
+
+    def get(url):
+        return lambda: (url, None)
+
+    def signup():
+        number = next(signups)
+        return '/api/v1/auth/signup/', dict(
+            username=f'bench{number}', email=f'bench{number}@yamdb.fake'
+        )
+
+    def token():
+        admin.generate_code()
+        admin.save()
+        return '/api/v1/auth/token/', dict(
+            username=admin.username,
+            confirmation_code=admin.confirmation_code,
+        )
+
+    titles = '/api/v1/titles/'
+    reviews = f'{titles}{title.id}/reviews/'
+    comments = f'{reviews}{review.id}/comments/'
+    ok = HTTPStatus.OK
+    return (
+        Endpoint('categories-list', 'get', get('/api/v1/categories/'), ok),
+        Endpoint('categories-search', 'get',
+                 get(f'/api/v1/categories/?search={category.name}'), ok),
+        Endpoint('genres-list', 'get', get('/api/v1/genres/'), ok),
+        Endpoint('genres-search', 'get',
+                 get(f'/api/v1/genres/?search={genre.name}'), ok),
+        Endpoint('titles-list', 'get', get(titles), ok),
+        Endpoint('titles-filter-genre', 'get',
+                 get(f'{titles}?genre={genre.slug}'), ok),
+        Endpoint('titles-filter-category', 'get',
+                 get(f'{titles}?category={category.slug}'), ok),
+        Endpoint('titles-filter-year', 'get',
+                 get(f'{titles}?year={title.year}'), ok),
+        Endpoint('titles-filter-name', 'get',
+                 get(f'{titles}?name={title.name[:3]}'), ok),
+        Endpoint('titles-detail', 'get', get(f'{titles}{title.id}/'), ok),
+        Endpoint('reviews-list', 'get', get(reviews), ok),
+        Endpoint('reviews-detail', 'get', get(f'{reviews}{review.id}/'), ok),
+        Endpoint('comments-list', 'get', get(comments), ok),
+        Endpoint('comments-detail', 'get',
+                 get(f'{comments}{comment.id}/'), ok),
+        Endpoint('users-list', 'get', get('/api/v1/users/'), ok),
+        Endpoint('users-search', 'get',
+                 get(f'/api/v1/users/?search={username[:5]}'), ok),
+        Endpoint('users-detail', 'get', get(f'/api/v1/users/{username}/'), ok),
+        Endpoint('users-me', 'get', get('/api/v1/users/me/'), ok),
+        Endpoint('auth-signup', 'post', signup, ok),
+        Endpoint('auth-token', 'post', token, ok),
+        Endpoint('metrics', 'get', get('/api/v1/metrics/'), ok),
+        Endpoint('profiles-list', 'get', get('/api/v1/profiles/'), ok),
+        Endpoint('deletions-detail', 'get',
+                 get(f'/api/v1/deletions/{job.id}/'), ok),
+        Endpoint('titles-similar', 'get',
+                 get(f'{titles}{title.id}/similar/'), ok),
+        Endpoint('users-me-recommendations', 'get',
+                 get('/api/v1/users/me/recommendations/'), ok),
+        Endpoint('titles-trending', 'get', get(f'{titles}trending/'), ok),
+        Endpoint('titles-trending-category', 'get',
+                 get(f'{titles}trending/?category={category.slug}'), ok),
+        Endpoint('titles-autocomplete', 'get',
+                 get(f'{titles}autocomplete/?q={title.name[:3]}'), ok),
+        # Название с опечаткой: пропущена вторая буква
+        Endpoint('titles-search', 'get',
+                 get(f'{titles}?search={title.name[0] + title.name[2:]}'),
+                 ok),
+    )
+
+
+def check_budget(name, result, budget):
+    """
+    Возвращает список нарушений бюджета эндпоинта по замерам,
+    которые есть в result.
+    """
+    if budget is None:
+        return [f'{name}: нет бюджета в {BASELINE_PATH.name}']
+    errors = []
+    if result['queries'] > budget['queries']:
+        errors.append(
+            f'{name}: {result["queries"]} запросов к БД '
+            f'(бюджет {budget["queries"]})'
+        )
+    if 'p95_ms' not in result:
+        return errors
+    if result['p95_ms'] > (
+        budget['p95_ms'] * LATENCY_TOLERANCE + LATENCY_SLACK_MS
+    ):
+        errors.append(
+            f'{name}: p95 {result["p95_ms"]} мс (бюджет {budget["p95_ms"]} '
+            f'мс x{LATENCY_TOLERANCE} + {LATENCY_SLACK_MS} мс)'
+        )
+    if result['memory_kb'] > budget['memory_kb'] * MEMORY_TOLERANCE:
+        errors.append(
+            f'{name}: {result["memory_kb"]} КиБ памяти '
+            f'(бюджет {budget["memory_kb"]} КиБ x{MEMORY_TOLERANCE})'
+        )
+    return errors
+
+
+@pytest.mark.django_db
+class Test10Benchmarks:
+
+    @pytest.fixture
+    def endpoints(self, admin):
+        call_command('generate_dataset', *DATASET_OPTIONS, stdout=StringIO())
+        # Оценки администратора: рекомендации замеряются для
+        # пользователя с вектором, а не для нового
+        for title in Title.objects.annotate(
+            count=Count('reviews_set')
+        ).order_by('count')[:5]:
+            Review.objects.create(title=title, author=admin,
+                                  text='Отзыв', score=8)
+        # Данные, которые в проде готовят команды по расписанию
+        call_command('build_similar_titles', stdout=StringIO())
+        call_command('train_recommendations', stdout=StringIO())
+        call_command('rebuild_trending', stdout=StringIO())
+        # Индексы названий строятся заново по сгенерированным данным
+        autocomplete._snapshots.clear()
+        return build_endpoints(admin)
+
+    def check_budgets(self, results):
+        baseline = json.loads(BASELINE_PATH.read_text())
+        errors = []
+        for name, result in results.items():
+            errors.extend(check_budget(name, result, baseline.get(name)))
+        assert not errors, (
+            'Превышены бюджеты производительности:\n' + '\n'.join(errors)
+        )
+
+    def test_01_query_budgets(self, endpoints, admin_client):
+        self.check_budgets({
+            endpoint.name: measure(admin_client, endpoint, timing=False)
+            for endpoint in endpoints
+        })
+
+    @pytest.mark.benchmark
+    def test_02_timing_budgets(self, endpoints, admin_client):
+        results = {
+            endpoint.name: measure(admin_client, endpoint)
+            for endpoint in endpoints
+        }
+        if REPORT_PATH:
+            Path(REPORT_PATH).write_text(
+                json.dumps(results, indent=2, ensure_ascii=False)
+            )
+        if os.getenv('BENCHMARK_UPDATE'):
+            BASELINE_PATH.write_text(
+                json.dumps(results, indent=2, ensure_ascii=False) + '\n'
+            )
+            return
+        self.check_budgets(results)
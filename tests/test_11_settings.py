@@ -0,0 +1,61 @@
+import pytest
+from django.core.checks import run_checks
+from django.db import connections
+from django.test import override_settings
+
+
+@pytest.mark.django_db
+class Test11Settings:
+
+    def test_01_performance_check_in_production(self):
+        with override_settings(SETTINGS_PROFILE='development', DEBUG=True):
+            ids = {message.id for message in run_checks()}
+        assert 'api.W001' not in ids, (
+            'Проверьте, что в профиле development предупреждения '
+            'о производительности не выводятся.'
+        )
+
+        with override_settings(SETTINGS_PROFILE='production', DEBUG=True,
+                               SQLITE_PRAGMAS={}):
+            ids = {message.id for message in run_checks()}
+        assert {'api.W001', 'api.W003'} <= ids, (
+            'Проверьте, что в профиле production проверка предупреждает '
+            'о DEBUG и SQLite без WAL.'
+        )
+
+    def test_02_process_local_cache_in_production(self, tmp_path):
+        local = dict(default=dict(
+            BACKEND='django.core.cache.backends.locmem.LocMemCache'
+        ))
+        shared = dict(default=dict(
+            BACKEND='django.core.cache.backends.filebased.FileBasedCache',
+            LOCATION=str(tmp_path),
+        ))
+        with override_settings(SETTINGS_PROFILE='production', CACHES=local):
+            ids = {message.id for message in run_checks()}
+        assert 'api.W007' in ids, (
+            'Проверьте, что в профиле production проверка предупреждает '
+            'о кэше в памяти процесса.'
+        )
+        with override_settings(SETTINGS_PROFILE='production', CACHES=shared):
+            ids = {message.id for message in run_checks()}
+        assert 'api.W007' not in ids
+
+    def test_03_sqlite_pragmas_on_new_connection(self, tmp_path):
+        default = connections['default']
+        wrapper = default.__class__(
+            dict(default.settings_dict, NAME=str(tmp_path / 'db.sqlite3')),
+            alias='default',
+        )
+        pragmas = dict(journal_mode='WAL', synchronous='NORMAL')
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            with wrapper.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                journal_mode = cursor.fetchone()[0]
+                cursor.execute('PRAGMA synchronous')
+                synchronous = cursor.fetchone()[0]
+        wrapper.close()
+        assert (journal_mode, synchronous) == ('wal', 1), (
+            'Проверьте, что SQLITE_PRAGMAS выполняются '
+            'на каждом новом подключении к SQLite.'
+        )
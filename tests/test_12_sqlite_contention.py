@@ -0,0 +1,86 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+import pytest
+from django.db import OperationalError, connections
+from django.test import override_settings
+
+from api.utils import retry_on_lock
+from reviews.models import Category
+
+ALIAS = 'stress'
+THREADS = 8
+WRITES_PER_THREAD = 25
+# Минимальная пропускная способность записи, транзакций в секунду
+TARGET_WRITE_RATE = float(os.getenv('STRESS_TARGET_WRITE_RATE', 50))
+
+
+@pytest.fixture
+def stress_database(tmp_path):
+    """Отдельная файловая база: in-memory база тестов не даёт блокировок."""
+    connections.databases[ALIAS] = dict(
+        connections.databases['default'],
+        NAME=str(tmp_path / 'stress.sqlite3'),
+        # Короткий busy timeout, чтобы до повторов действительно доходило
+        OPTIONS=dict(timeout=0.05, transaction_mode='IMMEDIATE'),
+        TEST=dict(),
+    )
+    with override_settings(SQLITE_PRAGMAS=dict(journal_mode='WAL')):
+        with connections[ALIAS].schema_editor() as editor:
+            editor.create_model(Category)
+        yield
+    connections[ALIAS].close()
+    del connections.databases[ALIAS]
+    delattr(connections._connections, ALIAS)
+
+
+@retry_on_lock(attempts=50, using=ALIAS)
+def write_category(worker, number):
+    # Чтение перед записью: в режиме DEFERRED именно такие транзакции
+    # получают "database is locked" без ожидания
+    categories = Category.objects.using(ALIAS)
+    categories.filter(slug__startswith=f'w{worker}-').count()
+    categories.create(name=f'{worker}-{number}', slug=f'w{worker}-{number}')
+
+
+def writer(worker):
+    errors = 0
+    for number in range(WRITES_PER_THREAD):
+        try:
+            write_category(worker, number)
+        except OperationalError:
+            errors += 1
+    connections[ALIAS].close()
+    return errors
+
+
+def run_writers():
+    """Запускает конкурирующих писателей: (число ошибок, транзакций/с)."""
+    started = perf_counter()
+    with ThreadPoolExecutor(THREADS) as executor:
+        errors = sum(executor.map(writer, range(THREADS)))
+    return errors, THREADS * WRITES_PER_THREAD / (perf_counter() - started)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12SQLiteContention:
+
+    def test_01_concurrent_writes_without_lock_errors(self, stress_database):
+        errors, _ = run_writers()
+        assert errors == 0, (
+            'Проверьте, что конкурирующие транзакции записи ждут блокировку '
+            'и повторяются, а не падают с "database is locked".'
+        )
+        assert Category.objects.using(ALIAS).count() == (
+            THREADS * WRITES_PER_THREAD
+        )
+
+    @pytest.mark.benchmark
+    def test_02_write_rate(self, stress_database):
+        _, rate = run_writers()
+        print(f'\nЗапись при {THREADS} потоках: {rate:.0f} транзакций/с')
+        assert rate >= TARGET_WRITE_RATE, (
+            f'Пропускная способность записи {rate:.0f} транзакций/с '
+            f'ниже целевой {TARGET_WRITE_RATE:.0f}.'
+        )
@@ -0,0 +1,85 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from reviews.models import Category
+
+ALIAS = 'replica'
+
+
+@pytest.fixture
+def replica(tmp_path):
+    """Реплика в отдельном файле, чтобы отличать её данные от основных."""
+    connections.databases[ALIAS] = dict(
+        connections.databases['default'],
+        NAME=str(tmp_path / 'replica.sqlite3'),
+        TEST=dict(),
+    )
+    with override_settings(DATABASE_REPLICAS=[ALIAS]):
+        yield ALIAS
+    connections[ALIAS].close()
+    del connections.databases[ALIAS]
+    delattr(connections._connections, ALIAS)
+
+
+class Test13ReplicaRouter:
+
+    @pytest.mark.django_db
+    def test_01_reads_go_to_replica_until_write(self, replica, admin_client):
+        with connections[replica].schema_editor() as editor:
+            editor.create_model(Category)
+        Category.objects.using(replica).create(name='Реплика', slug='replica')
+        Category.objects.create(name='Основная', slug='primary')
+
+        response = APIClient().get('/api/v1/categories/')
+        assert [item['slug'] for item in response.json()['results']] == [
+            'replica'
+        ], 'Проверьте, что GET-запросы к API читают данные с реплики.'
+
+        response = admin_client.post(
+            '/api/v1/categories/', data=dict(name='Новая', slug='new')
+        )
+        assert response.status_code == 201
+        assert float(response['X-Primary-Until']) > 0, (
+            'Проверьте, что после записи клиент получает время, '
+            'до которого его чтение идёт с основной базы.'
+        )
+        response = admin_client.get('/api/v1/categories/')
+        assert {item['slug'] for item in response.json()['results']} == {
+            'primary', 'new'
+        }, (
+            'Проверьте, что чтение после записи в течение '
+            'REPLICA_PIN_SECONDS идёт с основной базы.'
+        )
+        response = APIClient().get(
+            '/api/v1/categories/', HTTP_X_READ_PRIMARY='1'
+        )
+        assert len(response.json()['results']) == 2
+
+    @pytest.mark.django_db
+    def test_02_no_pin_without_replicas(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/categories/', data=dict(name='Новая', slug='new')
+        )
+        assert response.status_code == 201
+        assert 'X-Primary-Until' not in response, (
+            'Проверьте, что без реплик ответы на запись не получают '
+            'заголовок и cookie привязки к основной базе.'
+        )
+        assert 'primary_until' not in response.cookies
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_sync_replica(self, replica):
+        Category.objects.create(name='Основная', slug='primary')
+
+        call_command('sync_replica', stdout=StringIO())
+
+        assert Category.objects.using(replica).filter(
+            slug='primary'
+        ).exists(), (
+            'Проверьте, что sync_replica копирует основную базу в реплики.'
+        )
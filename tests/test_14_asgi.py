@@ -0,0 +1,123 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from itertools import cycle, islice
+
+import pytest
+from django.core.management import call_command
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client, override_settings
+
+from reviews.models import Category, Title
+
+ASGI_URLCONF = 'api_yamdb.urls_asgi'
+DATASET_OPTIONS = (
+    '--users', '20', '--categories', '3', '--genres', '5',
+    '--titles', '30', '--reviews', '200', '--comments', '0',
+)
+
+# Нагрузочное сравнение: WSGI_WORKERS синхронных воркеров против одного
+# ASGI-процесса. Задержка каждого SQL-запроса имитирует медленную сетевую
+# БД: без неё на одном ядре обе схемы упираются в процессор
+LOAD_REQUESTS = int(os.getenv('ASGI_LOAD_REQUESTS', 96))
+WSGI_WORKERS = int(os.getenv('ASGI_LOAD_WSGI_WORKERS', 4))
+DB_LATENCY = float(os.getenv('ASGI_LOAD_DB_LATENCY_MS', 20)) / 1000
+
+
+def read_urls():
+    title = Title.objects.filter(reviews_set__isnull=False).first()
+    return (
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+        f'/api/v1/titles/{title.id}/',
+        f'/api/v1/titles/{title.id}/reviews/',
+    )
+
+
+def slow_query(execute, sql, params, many, context):
+    time.sleep(DB_LATENCY)
+    return execute(sql, params, many, context)
+
+
+def add_latency(sender, connection, **kwargs):
+    connection.execute_wrappers.append(slow_query)
+
+
+def run_wsgi(urls):
+    def worker(chunk):
+        client = Client()
+        for url in chunk:
+            assert client.get(url).status_code == 200
+
+    with ThreadPoolExecutor(WSGI_WORKERS) as executor:
+        list(executor.map(worker, [
+            urls[index::WSGI_WORKERS] for index in range(WSGI_WORKERS)
+        ]))
+
+
+async def run_asgi(urls):
+    client = AsyncClient()
+    responses = await asyncio.gather(*(client.get(url) for url in urls))
+    assert all(response.status_code == 200 for response in responses)
+
+
+def throughput(run, urls):
+    started = time.perf_counter()
+    run(urls)
+    return len(urls) / (time.perf_counter() - started)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ASGI:
+
+    @pytest.fixture
+    def dataset(self):
+        call_command('generate_dataset', *DATASET_OPTIONS, stdout=StringIO())
+
+    def test_01_async_views_match_sync_views(self, dataset, token_admin):
+        urls = read_urls() + ('/api/v1/titles/?genre=genre-1',)
+        expected = [Client().get(url).json() for url in urls]
+
+        async def fetch():
+            client = AsyncClient()
+            return [(await client.get(url)).json() for url in urls]
+
+        with override_settings(ROOT_URLCONF=ASGI_URLCONF):
+            assert asyncio.run(fetch()) == expected, (
+                'Проверьте, что async-представления для чтения возвращают '
+                'то же, что и синхронные.'
+            )
+
+            async def create():
+                return await AsyncClient().post(
+                    '/api/v1/categories/',
+                    dict(name='Новая', slug='new'),
+                    content_type='application/json',
+                    authorization=f'Bearer {token_admin["access"]}',
+                )
+            response = asyncio.run(create())
+        assert response.status_code == 201
+        assert Category.objects.filter(slug='new').exists(), (
+            'Проверьте, что запись через ASGI-маршруты работает.'
+        )
+
+    @pytest.mark.benchmark
+    def test_02_asgi_throughput_under_concurrency(self, dataset):
+        urls = list(islice(cycle(read_urls()), LOAD_REQUESTS))
+        connection_created.connect(add_latency)
+        try:
+            wsgi_rate = throughput(run_wsgi, urls)
+            with override_settings(ROOT_URLCONF=ASGI_URLCONF):
+                asgi_rate = throughput(
+                    lambda urls: asyncio.run(run_asgi(urls)), urls
+                )
+        finally:
+            connection_created.disconnect(add_latency)
+        print(f'\nWSGI ({WSGI_WORKERS} воркера): {wsgi_rate:.0f} запросов/с, '
+              f'ASGI: {asgi_rate:.0f} запросов/с')
+        assert asgi_rate > wsgi_rate, (
+            'Проверьте, что при высокой конкурентности один ASGI-процесс '
+            'обслуживает больше запросов, чем WSGI-воркеры.'
+        )
@@ -0,0 +1,86 @@
+import os
+from time import perf_counter
+
+import pytest
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, override_settings
+
+ITERATIONS = int(os.getenv('MIDDLEWARE_BENCH_ITERATIONS', 2000))
+
+BROWSER_MIDDLEWARE_PATH = 'api.middleware.BrowserMiddleware'
+
+
+def full_middleware():
+    """Стек middleware без разделения на API и браузерную часть."""
+    position = settings.MIDDLEWARE.index(BROWSER_MIDDLEWARE_PATH)
+    return (
+        settings.MIDDLEWARE[:position]
+        + settings.BROWSER_MIDDLEWARE
+        + settings.MIDDLEWARE[position + 1:]
+    )
+
+
+def middleware_overhead(middleware, request):
+    """Среднее время прохода запроса через middleware, микросекунды."""
+    handler = BaseHandler()
+    # Пустое представление: измеряется только стоимость middleware
+    handler._get_response = lambda request: HttpResponse()
+    with override_settings(MIDDLEWARE=middleware):
+        handler.load_middleware()
+    chain = handler._middleware_chain
+    started = perf_counter()
+    for _ in range(ITERATIONS):
+        chain(request)
+    return (perf_counter() - started) / ITERATIONS * 10 ** 6
+
+
+@pytest.mark.django_db
+class Test15Middleware:
+
+    def test_01_api_skips_browser_middleware(self, admin_client, settings):
+        # В профиле production манифест статики есть только после
+        # collectstatic
+        settings.STATICFILES_STORAGE = (
+            'django.contrib.staticfiles.storage.StaticFilesStorage'
+        )
+        response = admin_client.get('/api/v1/categories/')
+        assert response.status_code == 200
+        assert 'X-Frame-Options' not in response, (
+            'Проверьте, что запросы к API не проходят через '
+            'BROWSER_MIDDLEWARE.'
+        )
+
+        response = Client().get('/admin/login/')
+        assert response.status_code == 200
+        assert response['X-Frame-Options'] == 'DENY'
+        assert 'csrftoken' in response.cookies, (
+            'Проверьте, что админка по-прежнему получает сессии и CSRF.'
+        )
+
+    def test_02_csrf_enforced_on_browser_pages(self):
+        client = Client(enforce_csrf_checks=True)
+        response = client.post('/redoc/')
+        assert response.status_code == 403, (
+            'Проверьте, что CSRF проверяется на страницах для браузера, '
+            'а не только в админке.'
+        )
+        response = client.post('/api/v1/auth/signup/', data=dict(
+            username='csrf', email='csrf@yamdb.fake'
+        ))
+        assert response.status_code != 403, (
+            'Проверьте, что запросы к API не проверяют CSRF.'
+        )
+
+    @pytest.mark.benchmark
+    def test_03_api_middleware_overhead(self):
+        request = RequestFactory().get('/api/v1/titles/')
+        full = middleware_overhead(full_middleware(), request)
+        lean = middleware_overhead(settings.MIDDLEWARE, request)
+        print(f'\nMiddleware на запрос к API: {full:.1f} мкс -> '
+              f'{lean:.1f} мкс (экономия {full - lean:.1f} мкс)')
+        assert lean < full, (
+            'Проверьте, что запросы к API проходят через более '
+            'короткую цепочку middleware.'
+        )
@@ -0,0 +1,151 @@
+import asyncio
+import gzip
+import os
+import random
+import threading
+from io import StringIO
+from time import perf_counter
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.test import AsyncClient, override_settings
+
+from api.compression import CODECS, compress, negotiate_encoding
+from reviews.management.commands.generate_dataset import WORDS
+from reviews.models import Title
+
+ITERATIONS = int(os.getenv('COMPRESSION_BENCH_ITERATIONS', 50))
+DATASET_OPTIONS = (
+    '--users', '20', '--categories', '3', '--genres', '8',
+    '--titles', '30', '--reviews', '0', '--comments', '0',
+)
+
+
+def description(rng):
+    # Описания в пару килобайт из случайных слов, как у реальных
+    # произведений: повторяющийся текст сжимается неправдоподобно хорошо
+    return ' '.join(rng.choice(WORDS) for _ in range(300))
+
+
+def average_ms(func, *args):
+    started = perf_counter()
+    for _ in range(ITERATIONS):
+        func(*args)
+    return (perf_counter() - started) / ITERATIONS * 1000
+
+
+@pytest.mark.django_db
+class Test16Compression:
+
+    @pytest.fixture
+    def titles_page(self, client):
+        call_command('generate_dataset', *DATASET_OPTIONS, stdout=StringIO())
+        rng = random.Random(0)
+        for title in Title.objects.all():
+            title.description = description(rng)
+            title.save()
+        cache.clear()
+        caches[settings.COMPRESSION_CACHE_ALIAS].clear()
+        return client.get('/api/v1/titles/').content
+
+    @pytest.fixture
+    def gzip_calls(self, monkeypatch):
+        calls = []
+
+        compress_gzip = CODECS['gzip']
+
+        def counted(data):
+            calls.append(threading.get_ident())
+            return compress_gzip(data)
+
+        monkeypatch.setitem(CODECS, 'gzip', counted)
+        return calls
+
+    def test_01_negotiated_compression(self, client, titles_page):
+        response = client.get(
+            '/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что большие ответы API сжимаются gzip, '
+            'если клиент его принимает.'
+        )
+        assert 'Accept-Encoding' in response['Vary']
+        assert gzip.decompress(response.content) == titles_page
+
+        response = client.get(
+            '/api/v1/genres/?search=none', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что ответы меньше COMPRESSION_MIN_SIZE не сжимаются.'
+        )
+        assert negotiate_encoding('identity') is None
+        assert negotiate_encoding('gzip;q=1, *;q=0') == 'gzip'
+        with override_settings(COMPRESSION_CODECS=('gzip',)):
+            assert negotiate_encoding('br, gzip;q=0.5') == 'gzip'
+
+    def test_02_compression_ratio_and_cache(self, titles_page, monkeypatch):
+        for codec, compress_codec in CODECS.items():
+            calls = []
+
+            def counted(data, compress_codec=compress_codec, calls=calls):
+                calls.append(data)
+                return compress_codec(data)
+
+            monkeypatch.setitem(CODECS, codec, counted)
+            compressed = compress(titles_page, codec, cached=True)
+            assert len(compressed) < len(titles_page) / 2, (
+                f'Проверьте, что {codec} сжимает JSON хотя бы вдвое.'
+            )
+            assert compress(titles_page, codec, cached=True) == compressed
+            assert len(calls) == 1, (
+                'Проверьте, что повторное сжатие той же страницы '
+                'берётся из кэша.'
+            )
+
+    def test_03_only_shared_responses_cached(self, client, titles_page,
+                                             gzip_calls, admin_client,
+                                             user_client):
+        for _ in range(2):
+            client.get('/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip')
+        assert len(gzip_calls) == 1, (
+            'Проверьте, что сжатые анонимные ответы берутся из кэша.'
+        )
+        for _ in range(2):
+            user_client.get('/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip')
+            admin_client.get('/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip')
+        assert len(gzip_calls) == 5, (
+            'Проверьте, что личные ответы не попадают в кэш сжатия.'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_asgi_compression_off_event_loop(self, titles_page,
+                                                gzip_calls):
+        async def fetch():
+            loop_thread = threading.get_ident()
+            response = await AsyncClient().get(
+                '/api/v1/titles/', accept_encoding='gzip'
+            )
+            return loop_thread, response
+
+        loop_thread, response = asyncio.run(fetch())
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.content) == titles_page
+        assert gzip_calls and loop_thread not in gzip_calls, (
+            'Проверьте, что под ASGI ответы сжимаются не в цикле событий.'
+        )
+
+    @pytest.mark.benchmark
+    def test_05_compression_benchmark(self, titles_page):
+        print(f'\nСтраница произведений: {len(titles_page)} байт')
+        for codec, compress_codec in CODECS.items():
+            compressed = compress(titles_page, codec, True)
+            fresh_ms = average_ms(compress_codec, titles_page)
+            cached_ms = average_ms(compress, titles_page, codec, True)
+            print(f'  {codec}: {len(compressed)} байт '
+                  f'({1 - len(compressed) / len(titles_page):.0%} экономии), '
+                  f'сжатие {fresh_ms:.3f} мс, из кэша {cached_ms:.3f} мс')
+            assert cached_ms < fresh_ms, (
+                'Проверьте, что сжатие из кэша быстрее повторного.'
+            )
@@ -0,0 +1,89 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from api.metrics import record_query, registry
+from reviews.models import Category
+
+METRICS_URL = '/api/v1/metrics/'
+SERVER_TIMING_PATTERN = re.compile(
+    r'db;dur=[\d.]+;desc="(\d+) queries", serialize;dur=[\d.]+, '
+    r'render;dur=[\d.]+, total;dur=[\d.]+'
+)
+
+
+@pytest.mark.django_db
+class Test17Metrics:
+
+    @pytest.fixture(autouse=True)
+    def server_timing(self, settings):
+        settings.SERVER_TIMING = True
+        return settings
+
+    @pytest.fixture
+    def category(self):
+        return Category.objects.create(name='Фильм', slug='movie')
+
+    def test_01_server_timing_header(self, client, category,
+                                     server_timing):
+        response = client.get('/api/v1/categories/')
+        match = SERVER_TIMING_PATTERN.fullmatch(
+            response.get('Server-Timing', '')
+        )
+        assert match, (
+            'Проверьте, что ответ содержит заголовок Server-Timing '
+            'с временем SQL, сериализации и рендеринга.'
+        )
+        assert int(match.group(1)) == 2, (
+            'Проверьте, что в Server-Timing учитываются все SQL-запросы.'
+        )
+        server_timing.SERVER_TIMING = False
+        response = client.get('/api/v1/categories/')
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что заголовок Server-Timing отключается '
+            'настройкой SERVER_TIMING.'
+        )
+
+    def test_02_metrics_endpoint(self, client, user_client, admin_client,
+                                 category):
+        registry.clear()
+        client.get('/api/v1/categories/')
+        client.get('/api/v1/categories/')
+
+        assert client.get(METRICS_URL).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(METRICS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        ), 'Проверьте, что метрики доступны только администратору.'
+        response = admin_client.get(METRICS_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        labels = 'route="category-list",method="GET"'
+        for line in (
+            '# TYPE yamdb_request_duration_seconds histogram',
+            f'yamdb_request_duration_seconds_count{{{labels}}} 2',
+            f'yamdb_db_duration_seconds_bucket{{{labels},le="+Inf"}} 2',
+            f'yamdb_db_queries_total{{{labels}}} 4',
+        ):
+            assert line in text.splitlines(), (
+                f'Проверьте, что метрики содержат строку `{line}`.'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_reconnect_keeps_one_recorder(self, client, category):
+        counts = []
+        for _ in range(3):
+            # Как при CONN_MAX_AGE=0: новое подключение на каждый запрос
+            connection.close()
+            connection.connect()
+            match = SERVER_TIMING_PATTERN.fullmatch(
+                client.get('/api/v1/categories/')['Server-Timing']
+            )
+            counts.append(int(match.group(1)))
+        assert counts == [2, 2, 2], (
+            'Проверьте, что учёт запросов не подключается повторно '
+            'при переподключении к базе.'
+        )
+        assert connection.execute_wrappers.count(record_query) == 1
@@ -0,0 +1,92 @@
+import logging
+
+import pytest
+
+from api.query_inspection import QueryBudgetExceeded, fingerprint
+from api.views import TitleViewSet
+from reviews.models import Category, Genre, Title
+
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.mark.django_db
+class Test18QueryInspection:
+
+    @pytest.fixture(autouse=True)
+    def inspection(self, settings):
+        settings.QUERY_INSPECTION = True
+        settings.SLOW_QUERY_MS = None
+        return settings
+
+    @pytest.fixture
+    def titles(self):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        for number in range(5):
+            title = Title.objects.create(
+                name=f'Фильм {number}', year=2000, category=category
+            )
+            title.genre.add(genre)
+
+    @pytest.fixture
+    def without_prefetch(self, monkeypatch):
+        """Возвращает TitleViewSet к запросу с N+1 по жанрам."""
+        monkeypatch.setattr(
+            TitleViewSet,
+            'get_queryset',
+            lambda self: Title.objects.order_by('name'),
+        )
+
+    def test_01_fingerprint(self):
+        assert fingerprint(
+            'SELECT * FROM t WHERE id IN (%s, %s, %s) AND x = 5'
+        ) == fingerprint(
+            "SELECT  *  FROM t WHERE id IN (%s,%s) AND x = 7"
+        ), (
+            'Проверьте, что запросы, отличающиеся только значениями, '
+            'дают одинаковый отпечаток.'
+        )
+
+    def test_02_no_warnings_for_optimized_views(self, admin_client, titles,
+                                                caplog):
+        with caplog.at_level(logging.WARNING, logger='api.queries'):
+            response = admin_client.get(TITLES_URL)
+        assert response.status_code == 200
+        assert not caplog.records, (
+            'Проверьте, что список произведений укладывается в бюджет '
+            'запросов и не содержит N+1.'
+        )
+
+    def test_03_n_plus_one_is_reported(self, admin_client, titles,
+                                       without_prefetch, inspection, caplog):
+        inspection.QUERY_BUDGET_ACTION = 'log'
+        with caplog.at_level(logging.WARNING, logger='api.queries'):
+            admin_client.get(TITLES_URL)
+        messages = [record.getMessage() for record in caplog.records]
+        assert any(
+            'N+1 во view title-list' in message for message in messages
+        ), 'Проверьте, что повторяющиеся запросы отмечаются как N+1.'
+        assert any(
+            'TitleViewSet.list' in message and 'бюджете 4' in message
+            for message in messages
+        ), 'Проверьте, что превышение бюджета запросов пишется в лог.'
+
+    def test_04_query_budget_raises(self, admin_client, titles,
+                                    without_prefetch, inspection):
+        inspection.QUERY_BUDGET_ACTION = 'raise'
+        with pytest.raises(QueryBudgetExceeded):
+            admin_client.get(TITLES_URL)
+
+    def test_05_slow_queries_are_logged(self, admin_client, titles,
+                                        inspection, caplog):
+        inspection.SLOW_QUERY_MS = 0
+        with caplog.at_level(logging.WARNING, logger='api.queries'):
+            admin_client.get(TITLES_URL)
+        assert any(
+            'Медленный запрос' in record.getMessage()
+            and 'title-list' in record.getMessage()
+            for record in caplog.records
+        ), (
+            'Проверьте, что запросы дольше SLOW_QUERY_MS пишутся в лог '
+            'с именем представления.'
+        )
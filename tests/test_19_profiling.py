@@ -0,0 +1,106 @@
+import asyncio
+import pstats
+import time
+from http import HTTPStatus
+
+import pytest
+from django.test import AsyncClient
+
+from api.profiling import PROFILE_RESPONSE_HEADER, list_profiles
+from reviews.models import Category
+
+PROFILES_URL = '/api/v1/profiles/'
+
+
+@pytest.mark.django_db
+class Test19Profiling:
+
+    @pytest.fixture(autouse=True)
+    def profiles_dir(self, settings, tmp_path):
+        settings.PROFILES_DIR = tmp_path
+        return tmp_path
+
+    @pytest.fixture
+    def category(self):
+        return Category.objects.create(name='Фильм', slug='movie')
+
+    def test_01_admin_request_is_profiled(self, admin_client, category,
+                                          tmp_path):
+        response = admin_client.get('/api/v1/categories/?profile=1')
+        assert response.status_code == HTTPStatus.OK
+        name = response.get(PROFILE_RESPONSE_HEADER)
+        assert name, (
+            'Проверьте, что запрос администратора с ?profile получает '
+            f'заголовок {PROFILE_RESPONSE_HEADER}.'
+        )
+
+        response = admin_client.get(PROFILES_URL)
+        assert response.status_code == HTTPStatus.OK
+        meta = response.json()[0]
+        assert (meta['name'], meta['path'], meta['status']) == (
+            name, '/api/v1/categories/?profile=1', HTTPStatus.OK
+        ), 'Проверьте, что профиль попадает в список с метаданными запроса.'
+
+        response = admin_client.get(f'{PROFILES_URL}{name}/')
+        assert response.status_code == HTTPStatus.OK
+        path = tmp_path / 'downloaded.prof'
+        path.write_bytes(b''.join(response.streaming_content))
+        functions = pstats.Stats(str(path)).stats
+        assert any(func[2] == 'list' for func in functions), (
+            'Проверьте, что профиль содержит вызовы представления.'
+        )
+        response = admin_client.get(f'{PROFILES_URL}../settings/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_profile_only_for_admin(self, client, user_client,
+                                       admin_client, category, tmp_path):
+        response = user_client.get(
+            '/api/v1/categories/', HTTP_X_PROFILE='1'
+        )
+        assert PROFILE_RESPONSE_HEADER not in response
+        assert client.get(
+            '/api/v1/categories/?profile=1'
+        ).status_code == HTTPStatus.OK
+        assert not list(tmp_path.iterdir()), (
+            'Проверьте, что запросы не администраторов не профилируются.'
+        )
+        assert user_client.get(PROFILES_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        response = admin_client.get('/api/v1/categories/')
+        assert PROFILE_RESPONSE_HEADER not in response
+
+    def test_03_retention(self, settings, admin_client, category):
+        settings.PROFILE_RETENTION_COUNT = 2
+        names = [
+            admin_client.get(
+                '/api/v1/categories/', HTTP_X_PROFILE='1'
+            )[PROFILE_RESPONSE_HEADER]
+            for _ in range(3)
+        ]
+        assert [meta['name'] for meta in list_profiles()] == names[:0:-1], (
+            'Проверьте, что хранится не больше PROFILE_RETENTION_COUNT '
+            'последних профилей.'
+        )
+
+        settings.PROFILE_RETENTION_DAYS = 0
+        time.sleep(0.01)
+        admin_client.get('/api/v1/categories/?profile=1')
+        assert list_profiles() == [], (
+            'Проверьте, что профили старше PROFILE_RETENTION_DAYS удаляются.'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_asgi_read_is_profiled(self, settings, token_admin, category):
+        settings.ROOT_URLCONF = 'api_yamdb.urls_asgi'
+
+        async def fetch():
+            return await AsyncClient().get(
+                '/api/v1/categories/?profile=1',
+                authorization=f'Bearer {token_admin["access"]}',
+            )
+        response = asyncio.run(fetch())
+        assert response.status_code == HTTPStatus.OK
+        assert [meta['name'] for meta in list_profiles()] == [
+            response[PROFILE_RESPONSE_HEADER]
+        ], 'Проверьте, что под ASGI чтение профилируется в потоке пула.'
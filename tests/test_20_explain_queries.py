@@ -0,0 +1,62 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+
+from api.management.commands.explain_queries import FULL_SCAN
+
+DATASET_OPTIONS = (
+    '--users', '20', '--categories', '3', '--genres', '5',
+    '--titles', '30', '--reviews', '200', '--comments', '100',
+)
+
+
+@pytest.mark.django_db
+class Test20ExplainQueries:
+
+    @pytest.fixture
+    def dataset(self):
+        call_command('generate_dataset', *DATASET_OPTIONS, stdout=StringIO())
+
+    def test_01_full_scan_pattern(self):
+        for detail in ('SCAN reviews_title', 'SCAN TABLE reviews_title',
+                       'SCAN reviews_title AS T3'):
+            assert FULL_SCAN.match(detail).group(1) == 'reviews_title'
+        for detail in (
+            'SCAN reviews_title USING INDEX reviews_title_name_386c2341',
+            'SCAN reviews_genre USING COVERING INDEX genre_slug',
+            'SEARCH reviews_review USING INDEX review_title_pub_date_idx '
+            '(title_id=?)',
+            'SCAN CONSTANT ROW',
+        ):
+            assert FULL_SCAN.match(detail) is None, (
+                f'Проверьте, что `{detail}` не считается полным обходом.'
+            )
+
+    def test_02_list_queries_use_indexes(self, dataset):
+        stdout = StringIO()
+        call_command('explain_queries', verbosity=2, stdout=stdout)
+        output = stdout.getvalue()
+        for index in ('review_title_pub_date_idx',
+                      'comment_review_pub_date_idx',
+                      'title_genre_genre_title_idx', 'title_trending_idx',
+                      'title_category_trending_idx'):
+            assert index in output, (
+                f'Проверьте, что списки API используют индекс `{index}`.'
+            )
+
+    def test_03_fails_on_full_scan(self, dataset):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' "
+                "AND tbl_name = 'reviews_comment' AND sql LIKE '%review_id%'"
+            )
+            for (name,) in cursor.fetchall():
+                cursor.execute(f'DROP INDEX "{name}"')
+
+        with pytest.raises(CommandError, match='reviews_comment'):
+            call_command('explain_queries', stdout=StringIO())
+        call_command('explain_queries', '--allow', 'reviews_comment',
+                     stdout=StringIO())
@@ -0,0 +1,115 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from api.dictionaries import bump_version, get_dictionary
+from reviews.models import Category, Genre, Title
+from tests.utils import QueryCollector
+
+TITLES_URL = '/api/v1/titles/'
+DICTIONARY_TABLES = ('"reviews_category"', '"reviews_genre"')
+SLUG_LOOKUPS = ('"reviews_category"."slug" =', '"reviews_genre"."slug" IN',
+                '"reviews_genre"."slug" =')
+
+
+@pytest.mark.django_db
+class Test21Dictionaries:
+
+    @pytest.fixture
+    def catalog(self):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        genres = [
+            Genre.objects.create(name=name, slug=slug)
+            for name, slug in (('Драма', 'drama'), ('Комедия', 'comedy'))
+        ]
+        title = Title.objects.create(name='Фильм', year=2000,
+                                     category=category)
+        title.genre.set(genres)
+        return title
+
+    def request(self, method, url, **kwargs):
+        collector = QueryCollector()
+        with connection.execute_wrapper(collector):
+            response = method(url, **kwargs)
+        return response, collector
+
+    def test_01_reads_without_dictionary_queries(self, client, catalog):
+        client.get(TITLES_URL)  # прогрев кэша справочников
+        for url in (TITLES_URL, f'{TITLES_URL}{catalog.id}/',
+                    f'{TITLES_URL}?genre=comedy',
+                    f'{TITLES_URL}?category=movie'):
+            response, collector = self.request(client.get, url)
+            assert response.status_code == HTTPStatus.OK
+            assert not collector.matching_any(*DICTIONARY_TABLES), (
+                f'Проверьте, что `{url}` берёт категории и жанры из кэша '
+                'справочников без запросов к их таблицам.'
+            )
+        data = client.get(f'{TITLES_URL}{catalog.id}/').json()
+        assert data['category'] == dict(name='Фильм', slug='movie')
+        assert data['genre'] == [
+            dict(name='Драма', slug='drama'),
+            dict(name='Комедия', slug='comedy'),
+        ]
+        assert client.get(
+            f'{TITLES_URL}?genre=unknown'
+        ).json()['count'] == 0
+
+    def test_02_write_resolves_slugs_from_cache(self, admin_client, catalog):
+        admin_client.get(TITLES_URL)
+        response, collector = self.request(
+            admin_client.post, TITLES_URL,
+            data=dict(name='Новый', year=2001, category='movie',
+                      genre=['drama']),
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert not collector.matching_any(*SLUG_LOOKUPS), (
+            'Проверьте, что slug категории и жанров при записи '
+            'ищутся в кэше справочников.'
+        )
+        title = Title.objects.get(name='Новый')
+        assert title.category.slug == 'movie'
+        assert list(title.genre.values_list('slug', flat=True)) == ['drama']
+
+        response = admin_client.post(TITLES_URL, data=dict(
+            name='Ещё', year=2001, category='unknown', genre=['drama']
+        ), format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_invalidation(self, admin_client, catalog):
+        url = f'{TITLES_URL}{catalog.id}/'
+        admin_client.get(url)
+        category = Category.objects.get(slug='movie')
+        category.name = 'Кино'
+        category.save()
+        assert admin_client.get(url).json()['category']['name'] == 'Кино', (
+            'Проверьте, что изменение категории сбрасывает кэш справочников.'
+        )
+
+        response = admin_client.delete('/api/v1/genres/comedy/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert admin_client.get(
+            f'{TITLES_URL}?genre=comedy'
+        ).json()['count'] == 0
+        assert [genre['slug'] for genre in admin_client.get(url).json()[
+            'genre'
+        ]] == ['drama']
+
+    def test_04_stale_snapshot(self, admin_client, catalog):
+        dictionary = get_dictionary(Genre)
+        bump_version()
+        assert get_dictionary(Genre) is not dictionary, (
+            'Проверьте, что смена общей версии перечитывает справочник.'
+        )
+
+        # bulk_create не посылает сигналов: новый slug ищется в базе
+        Genre.objects.bulk_create([Genre(name='Ужасы', slug='horror')])
+        response = admin_client.patch(
+            f'{TITLES_URL}{catalog.id}/', data=dict(genre=['horror']),
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['genre'] == [
+            dict(name='Ужасы', slug='horror')
+        ], 'Проверьте, что кэш справочников обновляется при промахе.'
@@ -0,0 +1,98 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from api.dictionaries import Dictionary
+from reviews.models import Category, Genre, Title, TitleGenre
+from tests.utils import QueryCollector
+
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.mark.django_db
+class Test22TitleGenres:
+
+    @pytest.fixture
+    def genres(self):
+        Category.objects.create(name='Фильм', slug='movie')
+        return [
+            Genre.objects.create(name=f'Жанр {number}', slug=f'genre-{number}')
+            for number in range(10)
+        ]
+
+    def request(self, method, url, data):
+        collector = QueryCollector()
+        with connection.execute_wrapper(collector):
+            response = method(url, data=data, format='json')
+        return response, collector
+
+    def test_01_create_with_many_genres(self, admin_client, genres):
+        slugs = [genre.slug for genre in genres]
+        response, collector = self.request(
+            admin_client.post, TITLES_URL,
+            dict(name='Фильм', year=2000, category='movie', genre=slugs),
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(response.json()['genre']) == 10
+        assert not collector.matching('"reviews_genre"."slug" ='), (
+            'Проверьте, что slug жанров не ищутся по одному.'
+        )
+        assert len(collector.matching(
+            'INSERT INTO "reviews_title_genre"'
+        )) == 1, 'Проверьте, что связи с жанрами создаются одним запросом.'
+
+    def test_02_unknown_slugs_reported_at_once(self, admin_client, genres):
+        dictionary = Dictionary(Genre, version=0)
+        collector = QueryCollector()
+        with connection.execute_wrapper(collector):
+            ids, unknown = dictionary.get_ids(
+                ['genre-1', 'unknown-1', 'genre-1', 'unknown-2']
+            )
+        assert (ids, unknown) == (
+            [genres[1].pk], ['unknown-1', 'unknown-2']
+        )
+        assert len(collector.queries) == 1, (
+            'Проверьте, что неизвестные slug проверяются одним запросом.'
+        )
+
+        response = admin_client.post(TITLES_URL, data=dict(
+            name='Фильм', year=2000, category='movie',
+            genre=['genre-1', 'unknown-1', 'unknown-2'],
+        ), format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()['genre']
+        assert len(errors) == 2 and 'unknown-1' in errors[0] and (
+            'unknown-2' in errors[1]
+        ), 'Проверьте, что в ответе перечислены все неизвестные slug.'
+
+    def test_03_patch_changes_only_diff(self, admin_client, genres):
+        title = Title.objects.create(name='Фильм', year=2000)
+        title.genre.set(genres[:3])
+        kept = dict(TitleGenre.objects.filter(
+            genre__in=genres[1:3]
+        ).values_list('genre_id', 'id'))
+
+        response, collector = self.request(
+            admin_client.patch, f'{TITLES_URL}{title.id}/',
+            dict(genre=[genre.slug for genre in genres[1:4]]),
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert set(title.genre.all()) == set(genres[1:4])
+        assert dict(TitleGenre.objects.filter(
+            genre__in=genres[1:3]
+        ).values_list('genre_id', 'id')) == kept, (
+            'Проверьте, что неизменившиеся связи с жанрами не пересоздаются.'
+        )
+        assert len(collector.matching('DELETE', 'reviews_title_genre')) == 1
+        assert len(collector.matching(
+            'INSERT INTO "reviews_title_genre"'
+        )) == 1
+
+        response, collector = self.request(
+            admin_client.patch, f'{TITLES_URL}{title.id}/', dict(year=2001)
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert not collector.matching('reviews_title_genre', 'DELETE'), (
+            'Проверьте, что PATCH без жанров не трогает связи.'
+        )
@@ -0,0 +1,168 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.deletion import STAGES
+from reviews.models import (Category, Comment, DeletionJob, Genre, Review,
+                            Title, TitleGenre)
+
+TITLES_URL = '/api/v1/titles/'
+
+
+def process_deletions(*args):
+    call_command('process_deletions', '--once', '--batch_size', '2', *args,
+                 stdout=StringIO(), stderr=StringIO())
+
+
+@pytest.mark.django_db
+class Test23Deletion:
+
+    @pytest.fixture
+    def title(self, admin, user, moderator):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(name='Фильм', year=2000,
+                                     category=category)
+        TitleGenre.objects.create(title=title, genre=genre)
+        for score, author in enumerate((admin, user, moderator), 1):
+            review = Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+            for _ in range(2):
+                Comment.objects.create(
+                    review=review, author=user, text='Комментарий'
+                )
+        return title
+
+    def delete(self, client, url):
+        response = client.delete(f'{url}?async=true')
+        assert response.status_code == HTTPStatus.ACCEPTED, (
+            'Проверьте, что DELETE с параметром `async=true` возвращает '
+            'статус 202.'
+        )
+        job = DeletionJob.objects.get(pk=response.json()['id'])
+        assert response['Location'] == f'/api/v1/deletions/{job.pk}/', (
+            'Проверьте, что ответ на фоновое удаление содержит адрес '
+            'задачи в заголовке `Location`.'
+        )
+        return job
+
+    def test_01_title_deleted_in_background(self, admin_client, title):
+        url = f'{TITLES_URL}{title.id}/'
+        job = self.delete(admin_client, url)
+        assert job.total == 3 + 6 + 1
+        assert admin_client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что произведение в очереди на удаление скрыто.'
+        )
+        assert not admin_client.get(TITLES_URL).json()['results']
+        assert Review.objects.filter(title=title).count() == 3, (
+            'Проверьте, что зависимые записи удаляет воркер, а не запрос.'
+        )
+
+        process_deletions()
+        job.refresh_from_db()
+        assert job.status == DeletionJob.Status.DONE
+        assert job.processed == job.total
+        assert not Title.objects.exists()
+        assert not Review.objects.exists()
+        assert not Comment.objects.exists()
+        assert not TitleGenre.objects.exists()
+        assert Genre.objects.exists()
+
+    def test_02_category_hidden_and_detached(self, admin_client, title):
+        job = self.delete(admin_client, '/api/v1/categories/movie/')
+        response = admin_client.get(f'{TITLES_URL}{title.id}/')
+        assert response.json()['category'] is None, (
+            'Проверьте, что скрытая категория не выводится у произведения.'
+        )
+        response = admin_client.post(TITLES_URL, data=dict(
+            name='Фильм', year=2000, category='movie', genre=['drama']
+        ), format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что скрытую категорию нельзя указать у произведения.'
+        )
+
+        process_deletions()
+        job.refresh_from_db()
+        assert job.status == DeletionJob.Status.DONE
+        assert not Category.objects.exists()
+        title.refresh_from_db()
+        assert title.category_id is None
+
+    def test_03_user_deactivated_and_deleted(self, admin_client, user_client,
+                                             user, title):
+        job = self.delete(admin_client, f'/api/v1/users/{user.username}/')
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что пользователь в очереди на удаление не входит.'
+
+        process_deletions()
+        job.refresh_from_db()
+        assert job.status == DeletionJob.Status.DONE
+        assert job.processed == job.total == 6 + 1
+        assert not Comment.objects.exists()
+        assert Review.objects.count() == 2
+        assert not Review.objects.filter(author_id=user.id).exists()
+
+    def test_04_hidden_user_content_not_listed(self, admin_client, admin,
+                                               user, title):
+        self.delete(admin_client, f'/api/v1/users/{user.username}/')
+        reviews_url = f'{TITLES_URL}{title.id}/reviews/'
+        response = admin_client.get(reviews_url)
+        assert response.json()['count'] == 2, (
+            'Проверьте, что отзывы пользователя в очереди на удаление '
+            'скрыты.'
+        )
+        review = Review.objects.get(author=user)
+        assert admin_client.get(
+            f'{reviews_url}{review.id}/'
+        ).status_code == HTTPStatus.NOT_FOUND
+        assert admin_client.get(
+            f'{reviews_url}{review.id}/comments/'
+        ).status_code == HTTPStatus.NOT_FOUND
+        review = Review.objects.get(author=admin)
+        response = admin_client.get(f'{reviews_url}{review.id}/comments/')
+        assert response.json()['count'] == 0, (
+            'Проверьте, что комментарии пользователя в очереди на удаление '
+            'скрыты.'
+        )
+
+    def test_05_job_status_for_admins_only(self, admin_client, user_client,
+                                           client, title):
+        job = self.delete(admin_client, f'{TITLES_URL}{title.id}/')
+        url = f'/api/v1/deletions/{job.pk}/'
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['status'] == DeletionJob.Status.PENDING
+
+        process_deletions()
+        assert admin_client.get(url).json()['status'] == (
+            DeletionJob.Status.DONE
+        )
+
+    def test_06_failed_job_can_be_retried(self, admin_client, title,
+                                          monkeypatch):
+        job = self.delete(admin_client, f'{TITLES_URL}{title.id}/')
+
+        def fail(queryset):
+            raise RuntimeError('ошибка')
+
+        monkeypatch.setitem(STAGES, DeletionJob.Target.TITLE, lambda pk: (
+            (Review.objects.filter(title_id=pk), fail),
+        ))
+        process_deletions()
+        job.refresh_from_db()
+        assert job.status == DeletionJob.Status.FAILED
+        assert 'ошибка' in job.error
+        monkeypatch.undo()
+
+        process_deletions('--job', str(job.pk))
+        job.refresh_from_db()
+        assert job.status == DeletionJob.Status.DONE, (
+            'Проверьте, что упавшую задачу можно повторить.'
+        )
+        assert not Title.objects.exists()
@@ -0,0 +1,135 @@
+from http import HTTPStatus
+from io import StringIO
+
+import numpy as np
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Review, SimilarTitle, Title
+from reviews.similarity import MIN_COMMON_USERS, RatingMatrix
+
+User = get_user_model()
+
+TITLES_URL = '/api/v1/titles/'
+
+# Оценки пользователей: «Дюна» и «Солярис» нравятся одним и тем же,
+# «Комедия» — наоборот
+SCORES = {
+    'Дюна': (10, 9, 2, 8),
+    'Солярис': (9, 10, 1, 7),
+    'Комедия': (2, 1, 10, 3),
+}
+
+
+def build(*args):
+    call_command('build_similar_titles', *args, stdout=StringIO())
+
+
+def dense_similarity():
+    """Скорректированный косинус по плотной матрице — для сверки."""
+    rows = list(Review.objects.values_list('title_id', 'author_id', 'score'))
+    titles = sorted({row[0] for row in rows})
+    users = sorted({row[1] for row in rows})
+    scores = np.full((len(users), len(titles)), np.nan)
+    for title_id, user_id, score in rows:
+        scores[users.index(user_id), titles.index(title_id)] = score
+    rated = ~np.isnan(scores)
+    centered = np.where(rated, scores - np.nanmean(scores, axis=1)[:, None], 0)
+    norms = np.sqrt((centered ** 2).sum(axis=0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        similarity = centered.T @ centered / np.outer(norms, norms)
+    common = rated.T.astype(int) @ rated.astype(int)
+    similarity[(common < MIN_COMMON_USERS) | np.isnan(similarity)] = 0
+    np.fill_diagonal(similarity, 0)
+    return titles, similarity
+
+
+@pytest.mark.django_db
+class Test24SimilarTitles:
+
+    @pytest.fixture
+    def titles(self):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        users = [
+            User.objects.create(username=f'critic{number}',
+                                email=f'critic{number}@yamdb.fake')
+            for number in range(4)
+        ]
+        titles = {}
+        for name, scores in SCORES.items():
+            titles[name] = Title.objects.create(
+                name=name, year=2000, category=category
+            )
+            for user, score in zip(users, scores):
+                Review.objects.create(title=titles[name], author=user,
+                                      text='Отзыв', score=score)
+        return titles
+
+    def test_01_similar_titles_endpoint(self, client, titles):
+        build()
+        url = f'{TITLES_URL}{titles["Дюна"].id}/similar/'
+        client.get(url)  # прогрев кэша справочников
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert len(context) == 1, (
+            'Проверьте, что похожие произведения читаются одним запросом.'
+        )
+        data = response.json()
+        assert [item['name'] for item in data] == ['Солярис'], (
+            'Проверьте, что в похожие попадают только сходные произведения.'
+        )
+        assert data[0]['category'] == dict(name='Фильм', slug='movie')
+        assert 0.9 < data[0]['score'] <= 1
+
+        missing = client.get(f'{TITLES_URL}{titles["Дюна"].id + 100}/similar/')
+        assert missing.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_matches_dense_computation(self):
+        call_command('generate_dataset', '--users', '30', '--categories', '2',
+                     '--genres', '3', '--titles', '40', '--reviews', '400',
+                     '--comments', '0', stdout=StringIO())
+        matrix = RatingMatrix.from_reviews()
+        titles, expected = dense_similarity()
+        assert list(matrix.titles) == titles
+        neighbours = dict(matrix.neighbours(count=5))
+        for row, title_id in enumerate(titles):
+            top = sorted(expected[row][expected[row] > 0], reverse=True)[:5]
+            scores = [score for _, score in neighbours[title_id]]
+            assert np.allclose(scores, top, atol=1e-5), (
+                'Проверьте, что сходство совпадает со скорректированным '
+                'косинусом по плотной матрице.'
+            )
+
+    def test_03_incremental_refresh(self, titles):
+        build()
+        solaris = SimilarTitle.objects.get(title=titles['Солярис'])
+        drama = Title.objects.create(name='Драма', year=2001)
+        critics = User.objects.filter(username__startswith='critic')
+        for user, score in zip(critics, (10, 9, 1)):
+            Review.objects.create(title=drama, author=user,
+                                  text='Отзыв', score=score)
+
+        build('--incremental')
+        assert SimilarTitle.objects.filter(title=drama).exists(), (
+            'Проверьте, что --incremental рассчитывает похожие для '
+            'произведений с новыми отзывами.'
+        )
+        assert SimilarTitle.objects.get(
+            title=titles['Солярис']
+        ).computed == solaris.computed, (
+            'Проверьте, что --incremental не пересчитывает произведения '
+            'без новых отзывов.'
+        )
+
+        build()
+        assert SimilarTitle.objects.filter(
+            title=titles['Солярис'], similar=drama
+        ).exists(), 'Проверьте, что полный расчёт обновляет все списки.'
+
+    def test_04_neighbours_validated(self, titles):
+        with pytest.raises(CommandError):
+            build('--neighbours', '0')
@@ -0,0 +1,103 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title, TitleEmbedding, UserEmbedding
+
+User = get_user_model()
+
+URL = '/api/v1/users/me/recommendations/'
+FACTORS = 4
+
+
+def train():
+    call_command('train_recommendations', '--factors', str(FACTORS),
+                 '--iterations', '15', stdout=StringIO())
+
+
+@pytest.mark.django_db
+class Test25Recommendations:
+
+    @pytest.fixture
+    def titles(self, user):
+        """
+        Две группы зрителей: одни любят фантастику и не любят комедии,
+        другие наоборот. user из первой группы не видел «Фантастику 4»
+        и «Комедию 4».
+        """
+        titles = {
+            f'{genre} {number}': Title.objects.create(
+                name=f'{genre} {number}', year=2000
+            )
+            for genre in ('Фантастика', 'Комедия')
+            for number in range(1, 5)
+        }
+        for group, (liked, disliked) in enumerate(
+            (('Фантастика', 'Комедия'), ('Комедия', 'Фантастика'))
+        ):
+            for number in range(6):
+                fan = User.objects.create(
+                    username=f'fan{group}{number}',
+                    email=f'fan{group}{number}@yamdb.fake',
+                )
+                for name, title in titles.items():
+                    score = 9 + number % 2 if name.startswith(liked) else 2
+                    if name.startswith(disliked) and number % 3 == 0:
+                        continue
+                    Review.objects.create(title=title, author=fan,
+                                          text='Отзыв', score=score)
+        for number in range(1, 4):
+            Review.objects.create(title=titles[f'Фантастика {number}'],
+                                  author=user, text='Отзыв', score=10)
+            Review.objects.create(title=titles[f'Комедия {number}'],
+                                  author=user, text='Отзыв', score=1)
+        return titles
+
+    def test_01_recommendations_for_user(self, user_client, titles):
+        train()
+        assert len(TitleEmbedding.objects.first().vector) == (
+            (FACTORS + 2) * 4
+        ), 'Проверьте, что векторы хранятся как float32.'
+        user_client.get(URL)  # прогрев снимка векторов
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(URL)
+        assert response.status_code == HTTPStatus.OK
+        assert len(context) <= 4, (
+            'Проверьте, что рекомендации не читают векторы всех '
+            'произведений на каждый запрос.'
+        )
+        names = [item['name'] for item in response.json()]
+        assert names == ['Фантастика 4', 'Комедия 4'], (
+            'Проверьте, что рекомендации исключают оценённые произведения '
+            'и ставят выше близкие вкусу пользователя.'
+        )
+        scores = [item['score'] for item in response.json()]
+        assert scores[0] > 7 > 4 > scores[1], (
+            'Проверьте, что score — прогноз оценки пользователя.'
+        )
+
+    def test_02_user_without_vector(self, admin_client, titles):
+        train()
+        assert not UserEmbedding.objects.filter(
+            user__username='TestAdmin'
+        ).exists()
+        response = admin_client.get(URL)
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()) == len(titles), (
+            'Проверьте, что пользователю без оценок рекомендуются '
+            'произведения по средней оценке.'
+        )
+
+    def test_03_recommendations_require_auth(self, client, titles):
+        train()
+        assert client.get(URL).status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_04_iterations_validated(self, titles):
+        with pytest.raises(CommandError):
+            call_command('train_recommendations', '--iterations', '0',
+                         stdout=StringIO())
@@ -0,0 +1,93 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from reviews.trending import current_score, rebuild, record_activity
+
+URL = '/api/v1/titles/trending/'
+
+
+@pytest.mark.django_db
+class Test26Trending:
+
+    @pytest.fixture
+    def titles(self):
+        movie = Category.objects.create(name='Фильм', slug='movie')
+        book = Category.objects.create(name='Книга', slug='book')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        titles = dict(
+            old=Title.objects.create(name='Старый', year=2000,
+                                     category=movie),
+            new=Title.objects.create(name='Новый', year=2000,
+                                     category=movie),
+            book=Title.objects.create(name='Книга', year=2000,
+                                      category=book),
+            quiet=Title.objects.create(name='Тихий', year=2000),
+        )
+        TitleGenre.objects.create(title=titles['book'], genre=drama)
+        return titles
+
+    def test_01_recent_activity_ranks_higher(self, client, user_client,
+                                             titles):
+        # Три отзыва трёхдневной давности при полураспаде в сутки
+        # весят 3 / 8, один свежий — 1
+        three_days_ago = timezone.now() - timedelta(days=3)
+        for _ in range(3):
+            record_activity(titles['old'].id, 1.0, three_days_ago)
+        response = user_client.post(
+            f'/api/v1/titles/{titles["new"].id}/reviews/',
+            data=dict(text='Отзыв', score=8),
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
+        response = client.get(URL)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [item['name'] for item in data] == ['Новый', 'Старый'], (
+            'Проверьте, что популярные отсортированы по затухающей '
+            'активности и без произведений без активности.'
+        )
+        assert data[0]['trending'] == pytest.approx(1, abs=0.01)
+        assert data[1]['trending'] == pytest.approx(3 / 8, abs=0.01)
+
+    def test_02_incremental_matches_rebuild(self, admin, titles):
+        for title in titles.values():
+            review = Review.objects.create(title=title, author=admin,
+                                           text='Отзыв', score=5)
+            Comment.objects.create(review=review, author=admin,
+                                   text='Комментарий')
+        incremental = {
+            title.id: current_score(title.trending_score)
+            for title in Title.objects.all()
+        }
+        assert rebuild() == len(titles)
+        for title in Title.objects.all():
+            assert current_score(title.trending_score) == pytest.approx(
+                incremental[title.id], rel=1e-6
+            ), 'Проверьте, что пересчёт совпадает с обновлениями.'
+            assert incremental[title.id] == pytest.approx(1.5, rel=1e-3)
+
+    def test_03_scoped_by_category_and_genre(self, client, titles):
+        now = timezone.now()
+        for weight, name in enumerate(('old', 'new', 'book', 'quiet'), 1):
+            record_activity(titles[name].id, weight, now)
+        names = [item['name'] for item in client.get(URL).json()]
+        assert names == ['Тихий', 'Книга', 'Новый', 'Старый']
+
+        response = client.get(f'{URL}?category=movie')
+        assert [item['name'] for item in response.json()] == [
+            'Новый', 'Старый'
+        ], 'Проверьте фильтр популярных по категории.'
+        response = client.get(f'{URL}?genre=drama')
+        assert [item['name'] for item in response.json()] == ['Книга'], (
+            'Проверьте фильтр популярных по жанру.'
+        )
+
+        Title.objects.filter(pk=titles['quiet'].id).update(is_hidden=True)
+        names = [item['name'] for item in client.get(URL).json()]
+        assert 'Тихий' not in names, (
+            'Проверьте, что скрытые произведения не попадают в популярные.'
+        )
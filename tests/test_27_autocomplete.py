@@ -0,0 +1,149 @@
+import sys
+import threading
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import autocomplete as ac
+from reviews.models import Title
+from reviews.trending import record_activity
+
+URL = '/api/v1/titles/autocomplete/'
+
+
+def names(client, query):
+    response = client.get(URL, data=dict(q=query))
+    assert response.status_code == HTTPStatus.OK
+    return [item['name'] for item in response.json()]
+
+
+@pytest.mark.django_db
+class Test27Autocomplete:
+
+    @pytest.fixture(autouse=True)
+    def clean_index(self):
+        ac._snapshots.clear()
+        cache.delete(ac.VERSION_KEY)
+        yield
+        ac._snapshots.clear()
+
+    @pytest.fixture
+    def titles(self):
+        return {
+            name: Title.objects.create(name=name, year=2000)
+            for name in ('Война и мир', 'Звёздные войны', 'Дом у дороги',
+                         'Amélie', 'Мир Дикого запада')
+        }
+
+    def test_01_prefix_of_any_word(self, client, titles):
+        assert sorted(names(client, 'вой')) == [
+            'Война и мир', 'Звёздные войны'
+        ], 'Проверьте, что подсказки ищут префикс любого слова названия.'
+        assert names(client, 'и ми') == ['Война и мир'], (
+            'Проверьте, что подсказки ищут по нескольким словам подряд.'
+        )
+        assert names(client, 'ЗВЕЗД') == ['Звёздные войны'], (
+            'Проверьте, что подсказки не зависят от регистра и ё.'
+        )
+        assert names(client, 'amel') == ['Amélie'], (
+            'Проверьте, что подсказки не зависят от диакритики.'
+        )
+        assert names(client, '') == []
+        assert names(client, 'xyz') == []
+
+    def test_02_wrong_keyboard_layout(self, client, titles):
+        assert names(client, 'ljv') == ['Дом у дороги'], (
+            'Проверьте, что запрос в другой раскладке тоже находит '
+            'подсказки.'
+        )
+
+    def test_03_ordered_by_popularity(self, client, titles):
+        record_activity(titles['Мир Дикого запада'].id, 2.0)
+        record_activity(titles['Война и мир'].id, 1.0)
+        ac._snapshots.clear()
+        assert names(client, 'мир') == ['Мир Дикого запада', 'Война и мир'], (
+            'Проверьте, что подсказки отсортированы по популярности.'
+        )
+
+    def test_04_no_queries_when_warm(self, client, titles):
+        names(client, 'вой')
+        with CaptureQueriesContext(connection) as context:
+            assert names(client, 'мир')
+        assert not [
+            query for query in context.captured_queries
+            if 'reviews_title' in query['sql']
+        ], 'Проверьте, что подсказки не читают произведения на запрос.'
+
+    def test_05_incremental_update(self, client, titles):
+        names(client, 'вой')
+        index = ac._snapshots[ac.PrefixIndex]
+        title = Title.objects.create(name='Войско', year=2000)
+        assert 'Войско' in names(client, 'войс')
+        title.name = 'Армия'
+        title.save()
+        assert names(client, 'войс') == []
+        assert names(client, 'арм') == ['Армия']
+        titles['Дом у дороги'].is_hidden = True
+        titles['Дом у дороги'].save()
+        assert names(client, 'дом') == []
+        titles['Война и мир'].delete()
+        assert names(client, 'вой') == ['Звёздные войны']
+        assert ac._snapshots[ac.PrefixIndex] is index, (
+            'Проверьте, что изменения произведений обновляют индекс '
+            'без полного перечитывания.'
+        )
+
+    def test_06_changes_from_other_processes(self, client, titles):
+        names(client, 'вой')
+        index = ac._snapshots[ac.PrefixIndex]
+        # Изменение в другом процессе: в индексе этого процесса его нет
+        Title.objects.filter(pk=titles['Дом у дороги'].id).update(
+            name='Домик в деревне'
+        )
+        ac.publish_change(titles['Дом у дороги'].id)
+        assert names(client, 'доми') == ['Домик в деревне'], (
+            'Проверьте, что индекс применяет изменения из журнала в кэше.'
+        )
+        assert ac._snapshots[ac.PrefixIndex] is index
+
+    def test_07_search_during_updates(self, titles):
+        pks = [
+            Title.objects.create(name=f'Война и мир {number}', year=2000).id
+            for number in range(20)
+        ]
+        ac.autocomplete('вой')
+        index = ac._snapshots[ac.PrefixIndex]
+        errors = []
+        done = threading.Event()
+
+        def search():
+            while not done.is_set():
+                try:
+                    ac.autocomplete('вой')
+                    ac.autocomplete('мир')
+                except Exception as error:
+                    errors.append(error)
+                    return
+
+        readers = [threading.Thread(target=search) for _ in range(4)]
+        interval = sys.getswitchinterval()
+        # Частые переключения потоков внутри изменения индекса
+        sys.setswitchinterval(1e-6)
+        try:
+            for reader in readers:
+                reader.start()
+            for number in range(3000):
+                index.update(
+                    pks[number % len(pks)], 'Война и мир', number % 2 == 0
+                )
+        finally:
+            done.set()
+            for reader in readers:
+                reader.join()
+            sys.setswitchinterval(interval)
+        assert not errors, (
+            'Проверьте, что поиск не видит индекс посреди изменения.'
+        )
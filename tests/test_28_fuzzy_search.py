@@ -0,0 +1,147 @@
+import os
+import random
+from http import HTTPStatus
+from time import perf_counter
+
+import pytest
+from django.core.cache import cache
+
+from api import autocomplete as ac
+from api.fuzzy import TrigramIndex, search_titles
+from reviews.management.commands.generate_dataset import WORDS
+from reviews.models import Category, Title
+
+URL = '/api/v1/titles/'
+BENCH_TITLES = int(os.getenv('FUZZY_BENCH_TITLES', 20000))
+ITERATIONS = int(os.getenv('FUZZY_BENCH_ITERATIONS', 20))
+SYLLABLES = [
+    consonant + vowel for consonant in 'бвгдзклмнпрстфхцчш'
+    for vowel in 'аеиоуыя'
+] + ['ст', 'ор', 'ан', 'ин', 'ер']
+
+
+def names(client, **params):
+    response = client.get(URL, data=params)
+    assert response.status_code == HTTPStatus.OK
+    return [item['name'] for item in response.json()['results']]
+
+
+def word(rng):
+    # Словарь реальных названий велик: слова из случайных слогов,
+    # а не из 60 слов generate_dataset, у которых общие все триграммы
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4)))
+
+
+def typo(rng, text):
+    # Одна опечатка: пропуск, замена или перестановка соседних букв
+    position = rng.randrange(len(text) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return text[:position] + text[position + 1:]
+    if kind == 1:
+        return text[:position] + 'о' + text[position + 1:]
+    return (text[:position] + text[position + 1] + text[position]
+            + text[position + 2:])
+
+
+def average_ms(client, queries, **params):
+    started = perf_counter()
+    for query in queries:
+        client.get(URL, data={key: query for key in params})
+    return (perf_counter() - started) / len(queries) * 1000
+
+
+@pytest.mark.django_db
+class Test28FuzzySearch:
+
+    @pytest.fixture(autouse=True)
+    def clean_index(self):
+        ac._snapshots.clear()
+        cache.delete(ac.VERSION_KEY)
+        yield
+        ac._snapshots.clear()
+
+    @pytest.fixture
+    def titles(self):
+        movie = Category.objects.create(name='Фильм', slug='movie')
+        return {
+            name: Title.objects.create(name=name, year=2000, category=movie)
+            for name in ('Война и мир', 'Властелин колец', 'Матрица',
+                         'Мастер и Маргарита', 'Звёздные войны')
+        } | dict(book=Title.objects.create(name='Матрица', year=1999))
+
+    def test_01_misspelled_titles_are_found(self, client, titles):
+        assert names(client, name='Матрца') == [], (
+            'Проверка предусловия: icontains не находит название с опечаткой.'
+        )
+        assert names(client, search='Матрца') == ['Матрица', 'Матрица']
+        assert names(client, search='войан и мир')[0] == 'Война и мир', (
+            'Проверьте, что поиск находит названия с опечатками.'
+        )
+        assert names(client, search='Властилин калец') == [
+            'Властелин колец'
+        ]
+        assert names(
+            client, search='мастер и маргаритта', category='movie'
+        ) == ['Мастер и Маргарита'], (
+            'Проверьте, что поиск сочетается с остальными фильтрами.'
+        )
+        assert names(client, search='Кот') == []
+
+    def test_02_ranked_by_similarity(self, titles):
+        found = search_titles('мастер и маргарита')
+        assert found[0] == (titles['Мастер и Маргарита'].id, 1.0)
+        scores = [score for _, score in search_titles('матрица мастер')]
+        assert scores == sorted(scores, reverse=True), (
+            'Проверьте, что результаты отсортированы по сходству.'
+        )
+
+    def test_03_index_follows_changes(self, client, titles):
+        assert names(client, search='Матрца')
+        index = ac._snapshots[TrigramIndex]
+        titles['Матрица'].name = 'Терминатор'
+        titles['Матрица'].save()
+        titles['book'].delete()
+        assert names(client, search='Матрца') == []
+        assert names(client, search='Терменатор') == ['Терминатор']
+        assert ac._snapshots[TrigramIndex] is index, (
+            'Проверьте, что индекс триграмм обновляется без перестроения.'
+        )
+        # Изменение в обход сигналов находит сверка с базой
+        Title.objects.filter(pk=titles['Война и мир'].id).update(
+            name='Мир и война'
+        )
+        index.loaded -= ac.MAX_AGE
+        assert names(client, search='мир и вайна') == ['Мир и война']
+
+    @pytest.mark.benchmark
+    def test_04_search_benchmark(self, client):
+        rng = random.Random(0)
+        Title.objects.bulk_create((
+            Title(name=' '.join(
+                [rng.choice(WORDS)]
+                + [word(rng) for _ in range(rng.randint(0, 3))]
+            ), year=2000)
+            for _ in range(BENCH_TITLES)
+        ), batch_size=1000)
+        sample = rng.sample(
+            list(Title.objects.values_list('name', flat=True)), ITERATIONS
+        )
+        started = perf_counter()
+        search_titles('')
+        build = perf_counter() - started
+        exact_ms = average_ms(client, sample, name=True)
+        fuzzy_ms = average_ms(
+            client, [typo(rng, name) for name in sample], search=True
+        )
+        started = perf_counter()
+        for name in sample:
+            search_titles(typo(rng, name))
+        index_ms = (perf_counter() - started) / ITERATIONS * 1000
+        print(f'\nПроизведений: {BENCH_TITLES}, построение индекса '
+              f'{build:.2f} с\n  icontains: {exact_ms:.1f} мс на запрос\n'
+              f'  поиск с опечаткой: {fuzzy_ms:.1f} мс на запрос, '
+              f'из них индекс {index_ms:.2f} мс')
+        assert fuzzy_ms < exact_ms * 3, (
+            'Проверьте, что поиск с опечатками не обходит все названия.'
+        )
@@ -305,3 +305,28 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+class QueryCollector:
+    """Обёртка execute (connection.execute_wrapper), запоминающая SQL."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def matching(self, *parts):
+        """Запросы, содержащие все части parts."""
+        return [
+            sql for sql in self.queries
+            if all(part in sql for part in parts)
+        ]
+
+    def matching_any(self, *parts):
+        """Запросы, содержащие хотя бы одну из частей parts."""
+        return [
+            sql for sql in self.queries
+            if any(part in sql for part in parts)
+        ]